@@ -1,8 +1,10 @@
-from flask import Flask, send_from_directory, render_template
+from flask import Flask, send_from_directory, render_template, request, abort
 from flask_cors import CORS
 from flask_socketio import SocketIO
+import socketio_init
 from socketio_init import socketio
 from datetime import timedelta
+import hmac
 
 from flask import Flask, send_from_directory, render_template
 
@@ -12,14 +14,22 @@ from routes.posts import posts_bp
 from routes.social import social_bp
 from routes.profile import profile_bp
 from routes.explore import explore_bp
-from routes.reels import reels_bp, init_reels_db
+from routes.reels import reels_bp
 from routes.create import create_bp
 from routes.editor import editor_bp
 from routes.stories import stories_bp
 from routes.messages_socket import messages_bp
 from routes.call_socket import call_bp
+from routes.media import media_bp
+from routes.images import images_bp
 from routes.auth import oauth
 import auth_backend
+import db
+import migrations
+import sweeper
+import jobs
+import counters
+from routes import blobs, explore_grid, follow_graph, story_store, trending, username_index
 import routes.call_socket
 
 app = Flask(__name__)
@@ -40,14 +50,21 @@ import os
 app.config["GOOGLE_CLIENT_ID"] = os.environ.get("GOOGLE_CLIENT_ID")
 app.config["GOOGLE_CLIENT_SECRET"] = os.environ.get("GOOGLE_CLIENT_SECRET")
 
-socketio.init_app(app)
+socketio_init.init_app(app)   # SOCKETIO_MESSAGE_QUEUE -> emits har worker tak
 
 # DATABASE INIT
 auth_backend.init_users_db()
 auth_backend.init_posts_db()
 auth_backend.init_posts_extras()
 auth_backend.init_notifications_db()
-init_reels_db()
+migrations.ensure_schema()   # database.db migrate + self-check, ek baar per process
+story_store.import_legacy_json()   # one-shot: data/stories.json -> SQLite
+sweeper.start_background(socketio)   # expiry kaam request se bahar (ek leader per host)
+jobs.start_workers(socketio)   # ffmpeg thumbnails / probes (JOBS=off -> alag `python jobs.py`)
+counters.start_background(socketio)   # reel views / shares batch me flush (COUNTERS=off -> write-through)
+username_index.load()   # check_username / autocomplete memory se (register / rename pe update)
+explore_grid.load()   # explore tiles memory me (publish / delete hooks)
+follow_graph.build()   # follows -> CSR, suggestions memory se (follow hooks)
 oauth.init_app(app)
 
 # BLUEPRINTS
@@ -63,6 +80,8 @@ app.register_blueprint(editor_bp)
 app.register_blueprint(stories_bp, url_prefix="/stories")
 app.register_blueprint(messages_bp)
 app.register_blueprint(call_bp)
+app.register_blueprint(media_bp)   # /static/uploads/* (range, etag, sendfile)
+app.register_blueprint(images_bp)  # /img/<size>/... + |img / |srcset filters
 
 @app.route("/")
 def home():
@@ -80,5 +99,72 @@ def service_worker():
         mimetype='application/javascript'
     )
 
+# ===============================
+# 📊 INTERNAL STATS (/_internal/*)
+# ===============================
+# Default band (404). INTERNAL_STATS_TOKEN set karo aur request me
+# header X-Internal-Token bhejo:
+#   curl -H "X-Internal-Token: $INTERNAL_STATS_TOKEN" host/_internal/jobs
+INTERNAL_STATS_TOKEN = os.environ.get("INTERNAL_STATS_TOKEN", "")
+
+@app.before_request
+def guard_internal_stats():
+    if not request.path.startswith("/_internal/"):
+        return None
+
+    token = request.headers.get("X-Internal-Token", "")
+    if not INTERNAL_STATS_TOKEN or not hmac.compare_digest(token, INTERNAL_STATS_TOKEN):
+        abort(404)
+
+# DB POOL STATS (connections created / reused / in use)
+@app.route("/_internal/db_pool")
+def db_pool_stats():
+    return db.pool_stats()
+
+# SWEEPER METRICS (items swept, lag)
+@app.route("/_internal/sweeper")
+def sweeper_stats():
+    return sweeper.metrics
+
+# JOB QUEUE (queued / running / done / failed)
+@app.route("/_internal/jobs")
+def job_stats():
+    return jobs.stats()
+
+# BLOB STORE (files, bytes, references)
+@app.route("/_internal/blobs")
+def blob_stats():
+    return blobs.stats()
+
+# WRITE-BEHIND COUNTERS (pending / flushed)
+@app.route("/_internal/counters")
+def counter_stats():
+    return counters.stats()
+
+# USERNAME INDEX (size, lookups, DB fallbacks)
+@app.route("/_internal/usernames")
+def username_index_stats():
+    return username_index.stats()
+
+# EXPLORE GRID CACHE (tiles, version)
+@app.route("/_internal/explore")
+def explore_grid_stats():
+    return explore_grid.stats()
+
+# TRENDING (hot items per kind)
+@app.route("/_internal/trending")
+def trending_stats():
+    return trending.stats()
+
+# FOLLOW GRAPH (CSR size, delta, suggestion cache)
+@app.route("/_internal/follow_graph")
+def follow_graph_stats():
+    return follow_graph.stats()
+
+# SOCKET.IO (message queue / async mode, is worker ka)
+@app.route("/_internal/socketio")
+def socketio_stats():
+    return socketio_init.stats()
+
 if __name__ == "__main__":
     socketio.run(app, host="0.0.0.0", port=5000, debug=True)
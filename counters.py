@@ -0,0 +1,223 @@
+# counters.py
+# ===============================
+# 🧮 WRITE-BEHIND COUNTERS (reel views / shares)
+# ===============================
+# Har reel impression pe /reels/view ek write transaction leta tha
+# (INSERT reel_views + UPDATE reels.views) — scroll speed pe poora app
+# SQLite ke single writer lock pe line me lag jata tha.
+#
+# Ab request sirf memory me event rakhta hai:
+#   counters.record_view(c, reel_id, user_id)   # (reel, user) dedupe
+#   counters.add_share(reel_id)
+#
+# Background flusher har FLUSH_INTERVAL ek hi transaction me
+#   INSERT OR IGNORE reel_views ... + UPDATE reels SET views = views + n
+# karta hai. Reads (view / share response, reels feed) pending delta
+# jodke dikhate hain.
+#
+# Crash pe loss bounded hai: max ek FLUSH_INTERVAL ya MAX_PENDING events
+# (usse zyada jama ho to request khud flush kar deta hai).
+#
+#   app.py -> counters.start_background(socketio)
+#   COUNTERS=off -> write-through (har event turant flush), CLI / debugging
+
+import atexit
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+
+import db
+from routes import trending
+from socketio_init import socketio
+
+FLUSH_INTERVAL = int(os.environ.get("COUNTER_FLUSH_MS", 250)) / 1000.0
+MAX_PENDING = 5000           # itne events jama -> turant flush
+RECENT_SIZE = 100_000        # DB me pakka maujood (reel, user) pairs ka LRU
+
+_lock = threading.Lock()
+
+_views = set()               # (reel_id, user_id) abhi flush nahi hue
+_view_delta = Counter()      # reel_id -> pending views (read merge ke liye)
+_shares = Counter()          # reel_id -> pending shares
+_recent = OrderedDict()      # (reel_id, user_id) -> None
+
+_write_through = os.environ.get("COUNTERS", "on") == "off"
+
+metrics = {
+    "flushes": 0,
+    "views_flushed": 0,
+    "shares_flushed": 0,
+    "errors": 0,
+    "last_flush_ms": 0,
+    "running": False,
+}
+
+
+def _remember(pair):
+    _recent[pair] = None
+    _recent.move_to_end(pair)
+    if len(_recent) > RECENT_SIZE:
+        _recent.popitem(last=False)
+
+
+def _pending_count():
+    return len(_views) + sum(_shares.values())
+
+
+# -------------------------
+# RECORD (request path, koi write nahi)
+# -------------------------
+def record_view(c, reel_id, user_id):
+    """True = naya view (flush pe count hoga). c sirf read ke liye."""
+    pair = (reel_id, user_id)
+
+    with _lock:
+        if pair in _views or pair in _recent:
+            return False
+
+    # WAL me read writer ko nahi rokta
+    c.execute("SELECT 1 FROM reel_views WHERE reel_id=? AND user_id=?", pair)
+    exists = c.fetchone() is not None
+
+    with _lock:
+        if exists:
+            _remember(pair)
+            return False
+        if pair in _views:
+            return False
+        _views.add(pair)
+        _view_delta[reel_id] += 1
+        full = _pending_count() >= MAX_PENDING
+
+    if _write_through or full:
+        flush()
+
+    return True
+
+
+def add_share(reel_id):
+    with _lock:
+        _shares[reel_id] += 1
+        full = _pending_count() >= MAX_PENDING
+
+    if _write_through or full:
+        flush()
+
+
+# -------------------------
+# READ MERGE
+# -------------------------
+def pending_views(reel_id):
+    with _lock:
+        return _view_delta.get(reel_id, 0)
+
+
+def pending_shares(reel_id):
+    with _lock:
+        return _shares.get(reel_id, 0)
+
+
+def merge_reels(reels):
+    """assemble_reels ke dicts me unflushed delta jodo."""
+    with _lock:
+        for r in reels:
+            r["views"] = (r["views"] or 0) + _view_delta.get(r["id"], 0)
+            r["shares"] = (r["shares"] or 0) + _shares.get(r["id"], 0)
+    return reels
+
+
+# -------------------------
+# FLUSH (ek transaction)
+# -------------------------
+def flush():
+    global _views, _view_delta, _shares
+
+    with _lock:
+        if not _views and not _shares:
+            return 0
+        views, view_delta, shares = _views, _view_delta, _shares
+        _views, _view_delta, _shares = set(), Counter(), Counter()
+
+    started = time.time()
+
+    conn = db.connect()
+    c = conn.cursor()
+
+    try:
+        # sirf naye rows count hote hain (dusre process ne pehle daal diya ho to nahi)
+        inserted = Counter()
+        for reel_id, user_id in views:
+            c.execute(
+                "INSERT OR IGNORE INTO reel_views (reel_id, user_id) VALUES (?, ?)",
+                (reel_id, user_id)
+            )
+            if c.rowcount:
+                inserted[reel_id] += 1
+
+        c.executemany(
+            "UPDATE reels SET views = views + ? WHERE id=?",
+            [(n, rid) for rid, n in inserted.items()]
+        )
+        c.executemany(
+            "UPDATE reels SET shares = shares + ? WHERE id=?",
+            [(n, rid) for rid, n in shares.items()]
+        )
+
+        # hot score bhi isi batch me (trending.py)
+        trending.bump_many(c, "reel", inserted, "view")
+        trending.bump_many(c, "reel", shares, "share")
+
+        conn.commit()
+
+    except Exception as e:
+        conn.rollback()
+        conn.close()
+
+        # wapas buffer me, agle tick pe retry
+        with _lock:
+            _views |= views
+            _view_delta.update(view_delta)
+            _shares.update(shares)
+            metrics["errors"] += 1
+
+        print("COUNTER FLUSH ERROR:", e)
+        return 0
+
+    conn.close()
+
+    with _lock:
+        for pair in views:
+            _remember(pair)
+        metrics["flushes"] += 1
+        metrics["views_flushed"] += sum(inserted.values())
+        metrics["shares_flushed"] += sum(shares.values())
+        metrics["last_flush_ms"] = int((time.time() - started) * 1000)
+
+    return len(views) + sum(shares.values())
+
+
+def _loop(sleep):
+    while True:
+        sleep(FLUSH_INTERVAL)
+        flush()
+
+
+def start_background(sio=socketio):
+    """Har web process apna buffer khud flush karta hai."""
+    if _write_through:
+        return False
+
+    metrics["running"] = True
+    sio.start_background_task(_loop, sio.sleep)
+    atexit.register(flush)
+    return True
+
+
+def stats():
+    with _lock:
+        pending = {
+            "pending_views": len(_views),
+            "pending_shares": sum(_shares.values()),
+        }
+    return {**metrics, **pending, "flush_interval_ms": int(FLUSH_INTERVAL * 1000)}
@@ -0,0 +1,150 @@
+import os
+import sqlite3
+import threading
+
+# ===============================
+# 🗄 SHARED SQLITE CONNECTION POOL
+# ===============================
+# Har request pe naya sqlite3.connect() karne ki jagah process-wide
+# idle list (LIFO, bounded) se connection reuse. threading.local nahi:
+# gevent monkey-patch ke baad woh greenlet-local ban jaata, aur har
+# request greenlet khaali pool se shuru karta (reuse kabhi nahi).
+# check_same_thread=False -> ek thread ka lautaya dusra utha sakta hai.
+#
+# journal_mode=WAL db file me persistent hai, migrations.migrate ek
+# baar set karta hai; yahan sirf per-connection PRAGMAs.
+#
+#   conn = db.connect()
+#   ...
+#   conn.close()      # asli close nahi, pool me wapas
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.join(BASE_DIR, os.environ.get("DATABASE_PATH", "database.db"))
+
+BUSY_TIMEOUT_MS = 5000
+CACHE_SIZE_KB = 16000              # PRAGMA cache_size (negative = KiB)
+MMAP_SIZE = 128 * 1024 * 1024
+STATEMENT_CACHE = 256              # prepared statements per connection
+MAX_IDLE = int(os.environ.get("DB_POOL_SIZE", 16))   # process me itne idle connections
+
+_pool_lock = threading.Lock()
+_pools = {}                        # path -> [idle connections]
+_pool_pid = os.getpid()            # fork ke baad parent ke connections use nahi karne
+
+_stats_lock = threading.Lock()
+_stats = {
+    "created": 0,
+    "reused": 0,
+    "released": 0,
+    "discarded": 0,
+    "in_use": 0,
+}
+
+
+def _bump(key, n=1):
+    with _stats_lock:
+        _stats[key] += n
+
+
+class PooledConnection(sqlite3.Connection):
+
+    # close() -> pool me wapas (uncommitted kaam rollback, jaise asli close)
+    def close(self):
+        _release(self)
+
+    def really_close(self):
+        sqlite3.Connection.close(self)
+
+
+def _idle(path):
+    # _pool_lock ke andar call karo
+    global _pools, _pool_pid
+
+    if _pool_pid != os.getpid():
+        _pools, _pool_pid = {}, os.getpid()
+
+    return _pools.setdefault(path, [])
+
+
+def _open(path):
+    conn = sqlite3.connect(
+        path,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        check_same_thread=False,
+        cached_statements=STATEMENT_CACHE,
+        factory=PooledConnection
+    )
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.pool_path = path
+    _bump("created")
+    return conn
+
+
+def connect(path=None):
+    path = path or DB_PATH
+
+    with _pool_lock:
+        idle = _idle(path)
+        conn = idle.pop() if idle else None
+
+    if conn is not None:
+        _bump("reused")
+    else:
+        conn = _open(path)
+
+    # pichle user ka row_factory leak na ho
+    conn.row_factory = None
+    conn.checked_out = True
+    _bump("in_use")
+    return conn
+
+
+def _release(conn):
+    # double close() se same connection do baar pool me na jaaye
+    if not getattr(conn, "checked_out", False):
+        return
+
+    conn.checked_out = False
+    _bump("in_use", -1)
+
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+    except sqlite3.Error:
+        conn.really_close()
+        _bump("discarded")
+        return
+
+    with _pool_lock:
+        idle = _idle(conn.pool_path)
+        keep = len(idle) < MAX_IDLE
+        if keep:
+            idle.append(conn)
+
+    if keep:
+        _bump("released")
+    else:
+        conn.really_close()
+        _bump("discarded")
+
+
+# -------------------------
+# DICT ROWS SHORTCUT
+# -------------------------
+def connect_rows(path=None):
+    conn = connect(path)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def pool_stats():
+    with _stats_lock:
+        stats = dict(_stats)
+    with _pool_lock:
+        stats["idle"] = sum(len(v) for v in _pools.values())
+    stats["max_idle"] = MAX_IDLE
+    return stats
@@ -0,0 +1,70 @@
+# gunicorn.conf.py
+# ===============================
+# 🚀 WEB WORKER PROFILE (Socket.IO)
+# ===============================
+# Socket.IO ke long-lived connections ke liye async worker chahiye;
+# sync worker har websocket pe ek process block kar deta hai.
+#
+#   gunicorn -c gunicorn.conf.py app:app
+#
+# GUNICORN_WORKER_CLASS
+#   gevent   (default) geventwebsocket.gunicorn.workers.GeventWebSocketWorker
+#   eventlet eventlet worker
+# WEB_CONCURRENCY          workers (default 1)
+# WORKER_CONNECTIONS       har worker ke max concurrent connections
+#
+# ===============================
+# 📌 MULTI-WORKER / MULTI-INSTANCE
+# ===============================
+# 1) Message queue: ek worker ka emit (chat, call, share) baaki workers ke
+#    clients tak sirf queue se pahunchta hai. workers > 1 bina queue ke
+#    start nahi hoga:
+#      SOCKETIO_MESSAGE_QUEUE=redis://host:6379/0   (kai instances)
+#      SOCKETIO_MESSAGE_QUEUE=sqlite                (ek host, chhota deploy)
+#
+# 2) Sticky sessions: Engine.IO ka long-polling har request ko usi worker
+#    pe chahta hai jisne sid banaya. Gunicorn apne workers me balance
+#    karta hai, sticky nahi -> polling multi-worker me toot jata hai.
+#    Isliye clients (base.html, messages.js, call.js, global_call.js)
+#    sirf websocket transport use karte hain: ek connection, ek worker,
+#    stickiness ki zarurat nahi.
+#    Polling fallback chahiye (purane proxy / network) to har worker alag
+#    port pe single-process chalao aur load balancer pe sticky routing:
+#      nginx:  upstream socketio { ip_hash; server 127.0.0.1:5001; server 127.0.0.1:5002; }
+#      render / heroku type platform: session affinity on
+#    Proxy pe websocket upgrade headers (Upgrade / Connection) pass hone chahiye.
+#
+# ===============================
+# 📌 MEDIA (routes/media.py)
+# ===============================
+# gevent pywsgi / eventlet worker wsgi.file_wrapper nahi dete, toh
+# /static/uploads Python ke read() loop se jaata hai (sync worker jaisa
+# os.sendfile nahi). Video heavy deploy me nginx ko bytes do:
+#   MEDIA_OFFLOAD=nginx  MEDIA_ACCEL_PREFIX=/_media/
+
+import os
+
+WORKER_CLASSES = {
+    "gevent": "geventwebsocket.gunicorn.workers.GeventWebSocketWorker",
+    "eventlet": "eventlet",
+}
+
+_kind = os.environ.get("GUNICORN_WORKER_CLASS", "gevent")
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+worker_class = WORKER_CLASSES.get(_kind, _kind)
+workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+worker_connections = int(os.environ.get("WORKER_CONNECTIONS", 1000))
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+
+# flask-socketio ka auto-detect gevent worker me bhi eventlet chun leta
+# (dono installed) -> worker class se match karo (socketio_init.init_app)
+os.environ.setdefault("SOCKETIO_ASYNC_MODE", "eventlet" if "eventlet" in worker_class else "gevent")
+
+if workers > 1 and not os.environ.get("SOCKETIO_MESSAGE_QUEUE"):
+    raise SystemExit(
+        f"WEB_CONCURRENCY={workers} needs SOCKETIO_MESSAGE_QUEUE "
+        "(redis://... or sqlite), warna emits sirf apne worker tak jayenge"
+    )
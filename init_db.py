@@ -1,61 +1,8 @@
 # init_db.py
-import sqlite3
+# database.db ka schema ab migrations.py own karta hai.
+# Ye script purane workflow ke liye hai: `python init_db.py`
+from migrations import migrate
 
-conn = sqlite3.connect("database.db")  # ya "inschat.db" jo tu use kar raha ho
-c = conn.cursor()
-
-# Users table
-c.execute("""
-CREATE TABLE IF NOT EXISTS users (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    username TEXT UNIQUE NOT NULL,
-    password TEXT NOT NULL
-)
-""")
-
-# Posts table
-c.execute("""
-CREATE TABLE IF NOT EXISTS posts (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    username TEXT NOT NULL,
-    caption TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-)
-""")
-
-# Post Images
-c.execute("""
-CREATE TABLE IF NOT EXISTS post_images (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    post_id INTEGER,
-    image_path TEXT,
-    FOREIGN KEY (post_id) REFERENCES posts (id) ON DELETE CASCADE
-)
-""")
-
-# Likes
-c.execute("""
-CREATE TABLE IF NOT EXISTS likes (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    post_id INTEGER,
-    username TEXT,
-    FOREIGN KEY (post_id) REFERENCES posts (id) ON DELETE CASCADE
-)
-""")
-
-# Comments
-c.execute("""
-CREATE TABLE IF NOT EXISTS comments (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    post_id INTEGER,
-    username TEXT,
-    comment TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (post_id) REFERENCES posts (id) ON DELETE CASCADE
-)
-""")
-
-conn.commit()
-conn.close()
+migrate(verbose=True)
 
 print("✅ Database initialized successfully!")
@@ -0,0 +1,282 @@
+# jobs.py
+# ===============================
+# 🧵 PERSISTENT JOB QUEUE (SQLite)
+# ===============================
+# Lamba kaam (ffmpeg thumbnail, probe, ...) request ke andar nahi.
+# Request sirf jobs table me row daalta hai (apne hi transaction me),
+# worker pool baad me uthata hai.
+#
+#   jobs.enqueue(c, "reel_media", {"reel_id": 7})   # caller commit karega
+#   jobs.register("reel_media", handler)             # handler(payload)
+#
+#   app.py -> jobs.start_workers(socketio)           # har web process me pool
+#   python jobs.py                                   # alag worker process
+#   python jobs.py --once
+#
+# Claim ek single UPDATE hai, isliye kai processes/workers ek saath chal
+# sakte hain; ek job ek hi worker ko milta hai.
+
+import json
+import os
+import sys
+import time
+import traceback
+import uuid
+
+import db
+from socketio_init import socketio
+
+WORKERS = int(os.environ.get("JOB_WORKERS", 2))
+POLL_INTERVAL = 1.0          # khaali queue pe kitna ruke (seconds)
+LOCK_TIMEOUT = 15 * 60       # itni der "running" = worker mar gaya, dobara queue (default)
+RETRY_BASE = 10              # retry backoff: 10s, 20s, 40s ...
+MAX_ATTEMPTS = 3
+
+HANDLERS = {}
+GIVE_UP = {}                 # kind -> fn(payload), aakhri attempt bhi fail
+LOCK_TIMEOUTS = {}           # kind -> seconds, LOCK_TIMEOUT se lamba kaam (HLS ladder)
+
+
+class RetryLater(Exception):
+    """Handler isse raise kare to job retry hoga (attempts ke andar)."""
+
+
+def now_ts():
+    return int(time.time())
+
+
+def register(kind, fn, on_give_up=None, lock_timeout=None):
+    HANDLERS[kind] = fn
+    if on_give_up:
+        GIVE_UP[kind] = on_give_up
+    if lock_timeout:
+        # handler ke poore worst case se lamba, warna chalte job ko dusra worker utha lega
+        LOCK_TIMEOUTS[kind] = lock_timeout
+
+
+# -------------------------
+# ENQUEUE (caller ke transaction me)
+# -------------------------
+def enqueue(c, kind, payload=None, delay=0, max_attempts=MAX_ATTEMPTS):
+    ts = now_ts()
+    c.execute("""
+        INSERT INTO jobs (kind, payload, status, max_attempts, run_after, created_at, updated_at)
+        VALUES (?, ?, 'queued', ?, ?, ?, ?)
+    """, (kind, json.dumps(payload or {}), max_attempts, ts + delay, ts, ts))
+    return c.lastrowid
+
+
+# -------------------------
+# CLAIM / FINISH
+# -------------------------
+def claim(worker_id):
+    """Ek ready job atomically lo. (id, kind, payload, attempts, max_attempts, token) ya None."""
+    conn = db.connect()
+    c = conn.cursor()
+
+    ts = now_ts()
+    token = f"{worker_id}:{uuid.uuid4().hex}"
+
+    c.execute("""
+        UPDATE jobs SET
+            status='running', locked_by=?, locked_at=?, updated_at=?,
+            attempts = attempts + 1
+        WHERE id = (
+            SELECT id FROM jobs
+            WHERE status='queued' AND run_after<=?
+            ORDER BY run_after, id
+            LIMIT 1
+        ) AND status='queued'
+    """, (token, ts, ts, ts))
+    conn.commit()
+
+    job = None
+
+    if c.rowcount:
+        c.execute("""
+            SELECT id, kind, payload, attempts, max_attempts, locked_by
+            FROM jobs WHERE locked_by=?
+        """, (token,))
+        job = c.fetchone()
+
+    conn.close()
+    return job
+
+
+def _finish(job_id, token, status, error=None, run_after=None):
+    """Sirf apna claim band karo. False = lock stale hoke kisi aur ke paas gaya."""
+    conn = db.connect()
+    c = conn.cursor()
+
+    # requeue_stale ne job dusre worker ko de diya ho to uska 'running'
+    # mat pelo (done/failed likh ke wo run abandon ho jata)
+    c.execute("""
+        UPDATE jobs SET
+            status=?, last_error=?, locked_by=NULL, locked_at=NULL,
+            run_after=COALESCE(?, run_after), updated_at=?
+        WHERE id=? AND locked_by=?
+    """, (status, error, run_after, now_ts(), job_id, token))
+    owned = c.rowcount > 0
+
+    conn.commit()
+    conn.close()
+    return owned
+
+
+def requeue_stale(timeout=LOCK_TIMEOUT):
+    """Crash hue worker ke 'running' jobs wapas queue me."""
+    conn = db.connect()
+    c = conn.cursor()
+
+    ts = now_ts()
+    custom = list(LOCK_TIMEOUTS)
+
+    c.execute(f"""
+        UPDATE jobs SET status='queued', locked_by=NULL, locked_at=NULL
+        WHERE status='running' AND locked_at < ?
+          AND kind NOT IN ({",".join("?" * len(custom))})
+    """, (ts - timeout, *custom))
+    n = c.rowcount
+
+    for kind, kind_timeout in LOCK_TIMEOUTS.items():
+        c.execute("""
+            UPDATE jobs SET status='queued', locked_by=NULL, locked_at=NULL
+            WHERE status='running' AND kind=? AND locked_at < ?
+        """, (kind, ts - kind_timeout))
+        n += c.rowcount
+
+    conn.commit()
+    conn.close()
+    return n
+
+
+# -------------------------
+# RUN ONE
+# -------------------------
+def run_job(job):
+    job_id, kind, payload, attempts, max_attempts, token = job
+
+    handler = HANDLERS.get(kind)
+
+    if handler is None:
+        _finish(job_id, token, "failed", f"no handler for {kind}")
+        return False
+
+    try:
+        handler(json.loads(payload or "{}"))
+
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+
+        if attempts < max_attempts:
+            delay = RETRY_BASE * (2 ** (attempts - 1))
+            _finish(job_id, token, "queued", error, now_ts() + delay)
+        else:
+            print("JOB FAILED:", job_id, kind, error)
+            traceback.print_exc()
+            # give-up sirf tab jab job abhi bhi hamara hai (naya owner khud decide karega)
+            if _finish(job_id, token, "failed", error):
+                _on_give_up(kind, payload)
+
+        return False
+
+    return _finish(job_id, token, "done")
+
+
+def _on_give_up(kind, payload):
+    fn = GIVE_UP.get(kind)
+    if fn:
+        try:
+            fn(json.loads(payload or "{}"))
+        except Exception as e:
+            print("JOB GIVE_UP ERROR:", kind, e)
+
+
+def run_pending(worker_id="cli", limit=100):
+    """Abhi ready jobs chala do (CLI / debugging)."""
+    done = 0
+    for _ in range(limit):
+        job = claim(worker_id)
+        if job is None:
+            break
+        run_job(job)
+        done += 1
+    return done
+
+
+# -------------------------
+# WORKER POOL
+# -------------------------
+def _worker(worker_id, sleep):
+    idle_polls = 0
+
+    while True:
+        try:
+            job = claim(worker_id)
+        except Exception as e:
+            print("JOB CLAIM ERROR:", e)
+            job = None
+
+        if job is not None:
+            run_job(job)
+            idle_polls = 0
+            continue
+
+        # kabhi kabhi crashed workers ke jobs bhi utha lo
+        idle_polls += 1
+        if idle_polls % 60 == 0:
+            try:
+                requeue_stale()
+            except Exception as e:
+                print("JOB REQUEUE ERROR:", e)
+
+        sleep(POLL_INTERVAL)
+
+
+def start_workers(sio=socketio, workers=WORKERS):
+    if os.environ.get("JOBS", "on") == "off":
+        return 0
+
+    _load_handlers()
+
+    base = f"{os.getpid()}"
+    for i in range(workers):
+        sio.start_background_task(_worker, f"{base}-{i}", sio.sleep)
+
+    return workers
+
+
+def stats():
+    conn = db.connect()
+    c = conn.cursor()
+
+    c.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+    counts = dict(c.fetchall())
+
+    c.execute("SELECT MIN(run_after) FROM jobs WHERE status='queued'")
+    oldest = c.fetchone()[0]
+
+    conn.close()
+
+    counts["oldest_queued_age"] = max(0, now_ts() - oldest) if oldest else 0
+    counts["workers"] = WORKERS
+    return counts
+
+
+def _load_handlers():
+    # handler modules khud register karte hain
+    import routes.reel_media  # noqa: F401
+    import routes.images  # noqa: F401
+
+
+if __name__ == "__main__":
+    import migrations
+    migrations.ensure_schema()
+    _load_handlers()
+
+    if "--once" in sys.argv:
+        print(f"✅ ran {run_pending()} jobs", stats())
+    else:
+        requeue_stale()
+        print(f"🧵 job worker started ({os.getpid()})")
+        _worker(f"{os.getpid()}-cli", time.sleep)
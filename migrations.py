@@ -0,0 +1,1207 @@
+# migrations.py
+# ===============================
+# 🧱 VERSIONED SCHEMA MIGRATIONS (database.db)
+# ===============================
+# Saara DDL yahin rehta hai. Har migration ek baar chalta hai aur
+# schema_version me record hota hai; dobara chalane par kuch nahi hota.
+#
+#   python migrations.py          # deploy pe (Procfile / render.yaml)
+#   python migrations.py --plan   # EXPLAIN QUERY PLAN before/after dikhao
+#
+# Naya migration: function likho aur MIGRATIONS list ke end me add karo.
+# "checks" me hot-path queries do; migration ke pehle aur baad unka
+# query plan compare hota hai aur "SCAN <table>" bacha ho to warning aati hai.
+
+import calendar
+import math
+import re
+import sqlite3
+import sys
+import time
+
+import db
+
+
+# -------------------------
+# HELPERS
+# -------------------------
+def _columns(c, table):
+    c.execute(f"PRAGMA table_info({table})")
+    return [r[1] for r in c.fetchall()]
+
+
+def _add_column(c, table, column, decl):
+    if column not in _columns(c, table):
+        c.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
+def _plan(c, sql, params=()):
+    c.execute("EXPLAIN QUERY PLAN " + sql, params)
+    return [r[-1] for r in c.fetchall()]
+
+
+def _full_scan(plan, table):
+    pattern = re.compile(rf"^SCAN (TABLE )?{table}\b")
+    return any(pattern.search(step) for step in plan)
+
+
+# ===============================
+# 001 - BASELINE SCHEMA
+# (pehle auth_backend / init_reels_db / create.publish / init_db.py me bikhra tha)
+# ===============================
+def m001_baseline(c):
+
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE,
+            password TEXT,
+            bio TEXT,
+            photo TEXT,
+            ghost_mode INTEGER DEFAULT 0,
+            last_seen DATETIME DEFAULT NULL,
+            is_private INTEGER DEFAULT 0,
+            email TEXT,
+            phone TEXT,
+            dob TEXT,
+            google_id TEXT
+        )
+    """)
+    _add_column(c, "users", "bio", "TEXT")
+    _add_column(c, "users", "photo", "TEXT")
+    _add_column(c, "users", "ghost_mode", "INTEGER DEFAULT 0")
+    _add_column(c, "users", "last_seen", "DATETIME DEFAULT NULL")
+    _add_column(c, "users", "is_private", "INTEGER DEFAULT 0")
+    _add_column(c, "users", "email", "TEXT")
+    _add_column(c, "users", "phone", "TEXT")
+    _add_column(c, "users", "dob", "TEXT")
+    _add_column(c, "users", "google_id", "TEXT")
+
+    # ---------- POSTS ----------
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS posts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            caption TEXT,
+            likes INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    """)
+    _add_column(c, "posts", "likes", "INTEGER DEFAULT 0")
+
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS post_images (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            post_id INTEGER,
+            image_path TEXT,
+            FOREIGN KEY (post_id) REFERENCES posts(id) ON DELETE CASCADE
+        )
+    """)
+
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS likes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            post_id INTEGER,
+            username TEXT,
+            user_id INTEGER,
+            FOREIGN KEY (post_id) REFERENCES posts(id) ON DELETE CASCADE
+        )
+    """)
+    _add_column(c, "likes", "username", "TEXT")
+    _add_column(c, "likes", "user_id", "INTEGER")
+
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS comments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            post_id INTEGER,
+            user_id INTEGER,
+            comment TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (post_id) REFERENCES posts(id),
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    """)
+
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS post_saves (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            post_id INTEGER,
+            user_id INTEGER,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    c.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_post_save_unique ON post_saves(post_id, user_id)")
+
+    # ---------- STORIES (legacy table) ----------
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS stories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            media_path TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            expires_at TIMESTAMP,
+            story_path TEXT,
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        )
+    """)
+
+    # ---------- SOCIAL ----------
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS follows (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            follower_id INTEGER,
+            following_id INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(follower_id, following_id)
+        )
+    """)
+
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS follow_requests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sender_id INTEGER NOT NULL,
+            receiver_id INTEGER NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS notifications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            actor_id INTEGER,
+            type TEXT,
+            meta TEXT,
+            is_read INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # ---------- REELS ----------
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS reels (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            caption TEXT,
+            video_path TEXT,
+            likes INTEGER DEFAULT 0,
+            saves INTEGER DEFAULT 0,
+            shares INTEGER DEFAULT 0,
+            comments_count INTEGER DEFAULT 0,
+            created_at TEXT,
+            audio_name TEXT DEFAULT 'Original Audio',
+            thumbnail TEXT,
+            views INTEGER DEFAULT 0
+        )
+    """)
+    _add_column(c, "reels", "created_at", "TEXT")
+    _add_column(c, "reels", "saves", "INTEGER DEFAULT 0")
+    _add_column(c, "reels", "shares", "INTEGER DEFAULT 0")
+    _add_column(c, "reels", "comments_count", "INTEGER DEFAULT 0")
+    _add_column(c, "reels", "views", "INTEGER DEFAULT 0")
+    _add_column(c, "reels", "audio_name", "TEXT DEFAULT 'Original Audio'")
+    _add_column(c, "reels", "thumbnail", "TEXT")
+
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS reel_likes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            reel_id INTEGER,
+            user_id INTEGER,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(reel_id, user_id)
+        )
+    """)
+
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS reel_views (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            reel_id INTEGER,
+            user_id INTEGER,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(reel_id, user_id)
+        )
+    """)
+
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS reel_comments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            reel_id INTEGER,
+            user_id INTEGER,
+            comment TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS reel_saves (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            reel_id INTEGER,
+            user_id INTEGER
+        )
+    """)
+
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS reel_shares (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sender_id INTEGER,
+            receiver_id INTEGER,
+            reel_id INTEGER,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # ---------- MESSAGES ----------
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS chats (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user1 INTEGER NOT NULL,
+            user2 INTEGER NOT NULL,
+            locked INTEGER DEFAULT 0,
+            lock_pin TEXT
+        )
+    """)
+    _add_column(c, "chats", "locked", "INTEGER DEFAULT 0")
+    _add_column(c, "chats", "lock_pin", "TEXT")
+
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            chat_id INTEGER NOT NULL,
+            sender_id INTEGER NOT NULL,
+            msg TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            edited INTEGER DEFAULT 0,
+            deleted INTEGER DEFAULT 0,
+            expire_seconds INTEGER DEFAULT NULL,
+            view_once INTEGER DEFAULT 0,
+            viewed INTEGER DEFAULT 0,
+            expires_at DATETIME DEFAULT NULL,
+            attachment TEXT DEFAULT NULL,
+            deleted_for TEXT DEFAULT ''
+        )
+    """)
+    _add_column(c, "messages", "edited", "INTEGER DEFAULT 0")
+    _add_column(c, "messages", "deleted", "INTEGER DEFAULT 0")
+    _add_column(c, "messages", "expire_seconds", "INTEGER DEFAULT NULL")
+    _add_column(c, "messages", "view_once", "INTEGER DEFAULT 0")
+    _add_column(c, "messages", "viewed", "INTEGER DEFAULT 0")
+    _add_column(c, "messages", "expires_at", "DATETIME DEFAULT NULL")
+    _add_column(c, "messages", "attachment", "TEXT DEFAULT NULL")
+    _add_column(c, "messages", "deleted_for", "TEXT DEFAULT ''")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_msgs_chat ON messages(chat_id)")
+
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS message_receipts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            message_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            seen_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            view_once_seen INTEGER DEFAULT 0
+        )
+    """)
+    _add_column(c, "message_receipts", "view_once_seen", "INTEGER DEFAULT 0")
+
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS message_screenshots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            message_id INTEGER,
+            user_id INTEGER,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # ---------- CALLS ----------
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS calls (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            chat_id INTEGER NOT NULL,
+            caller_id INTEGER NOT NULL,
+            receiver_id INTEGER NOT NULL,
+            call_type TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'ringing',
+            started_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            answered_at DATETIME,
+            ended_at DATETIME,
+            duration INTEGER DEFAULT 0
+        )
+    """)
+
+
+# ===============================
+# 002 - HOT PATH INDEXES
+# ===============================
+def m002_hot_path_indexes(c):
+    c.execute("CREATE INDEX IF NOT EXISTS idx_likes_post_user ON likes(post_id, user_id)")
+    # posts.like / feed "liked_by_me" username column pe dekhte hain
+    c.execute("CREATE INDEX IF NOT EXISTS idx_likes_post_username ON likes(post_id, username)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_comments_post ON comments(post_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_post_images_post ON post_images(post_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_notifications_user_read ON notifications(user_id, is_read)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_receipts_msg_user ON message_receipts(message_id, user_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_reel_comments_reel ON reel_comments(reel_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_follows_following ON follows(following_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_posts_user ON posts(user_id)")
+
+
+# ===============================
+# 003 - STORY STORE (data/stories.json ki jagah)
+# ===============================
+def m003_story_store(c):
+    _add_column(c, "stories", "filename", "TEXT")
+    _add_column(c, "stories", "timestamp", "INTEGER")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_stories_user_ts ON stories(user_id, timestamp)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_stories_ts ON stories(timestamp)")
+
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS story_views (
+            story_id INTEGER NOT NULL,
+            viewer_id INTEGER NOT NULL,
+            viewed_at INTEGER,
+            PRIMARY KEY (story_id, viewer_id)
+        ) WITHOUT ROWID
+    """)
+
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS story_likes (
+            story_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            created_at INTEGER,
+            PRIMARY KEY (story_id, user_id)
+        ) WITHOUT ROWID
+    """)
+
+
+# ===============================
+# 004 - EXPIRY SWEEPER LOOKUPS
+# ===============================
+def m004_expiry_indexes(c):
+    # sirf pending disappearing messages index me (partial index, chhota)
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_messages_pending_expiry
+        ON messages(expires_at)
+        WHERE expires_at IS NOT NULL AND deleted=0
+    """)
+
+
+# ===============================
+# 005 - CHAT STATE (inbox summary, routes/chat_state.py maintain karta hai)
+# ===============================
+def m005_chat_state(c):
+    # har chat ke har participant ki ek row
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS chat_state (
+            chat_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            other_id INTEGER NOT NULL,
+            last_message_id INTEGER,
+            last_msg TEXT DEFAULT '',
+            last_time DATETIME,
+            unread_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (chat_id, user_id)
+        ) WITHOUT ROWID
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_chat_state_user_time ON chat_state(user_id, last_time)")
+
+    # backfill (ek baar, purane correlated queries yahin)
+    c.execute("""
+        INSERT OR IGNORE INTO chat_state (chat_id, user_id, other_id)
+        SELECT id, user1, user2 FROM chats
+        UNION ALL
+        SELECT id, user2, user1 FROM chats
+    """)
+    c.execute("""
+        UPDATE chat_state SET
+            last_message_id = (SELECT MAX(id) FROM messages WHERE chat_id=chat_state.chat_id)
+    """)
+    c.execute("""
+        UPDATE chat_state SET
+            last_msg = COALESCE((SELECT substr(msg, 1, 120) FROM messages WHERE id=chat_state.last_message_id), ''),
+            last_time = (SELECT created_at FROM messages WHERE id=chat_state.last_message_id),
+            unread_count = (
+                SELECT COUNT(*) FROM messages m
+                WHERE m.chat_id=chat_state.chat_id
+                  AND m.sender_id!=chat_state.user_id
+                  AND m.deleted=0
+                  AND NOT EXISTS (
+                      SELECT 1 FROM message_receipts r
+                      WHERE r.message_id=m.id AND r.user_id=chat_state.user_id
+                  )
+            )
+    """)
+
+
+# ===============================
+# 006 - CHAT HISTORY PAGES
+# ===============================
+def m006_chat_history_index(c):
+    # chat_page / load_older: WHERE chat_id=? AND id<? ORDER BY id DESC LIMIT n
+    c.execute("CREATE INDEX IF NOT EXISTS idx_messages_chat_id ON messages(chat_id, id)")
+    # (chat_id) wala ab iska prefix hai
+    c.execute("DROP INDEX IF EXISTS idx_msgs_chat")
+
+
+# ===============================
+# 007 - DELETE FOR ME (deleted_for CSV -> message_hidden)
+# ===============================
+def m007_message_hidden(c):
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS message_hidden (
+            message_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            hidden_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (message_id, user_id)
+        ) WITHOUT ROWID
+    """)
+
+    # purana "3,7," CSV -> rows (column ab koi nahi likhta)
+    c.execute("SELECT id, deleted_for FROM messages WHERE deleted_for IS NOT NULL AND deleted_for!=''")
+    rows = []
+    for mid, csv in c.fetchall():
+        for uid in csv.split(","):
+            if uid.strip().isdigit():
+                rows.append((mid, int(uid)))
+
+    c.executemany(
+        "INSERT OR IGNORE INTO message_hidden (message_id, user_id) VALUES (?, ?)",
+        rows
+    )
+
+
+# ===============================
+# 008 - MEDIA JOB QUEUE (jobs.py)
+# ===============================
+def m008_job_queue(c):
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            payload TEXT NOT NULL DEFAULT '{}',
+            status TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 3,
+            run_after INTEGER NOT NULL DEFAULT 0,
+            locked_by TEXT,
+            locked_at INTEGER,
+            last_error TEXT,
+            created_at INTEGER,
+            updated_at INTEGER
+        )
+    """)
+    # worker claim: status + run_after order me
+    c.execute("CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs(status, run_after, id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_jobs_locked_by ON jobs(locked_by)")
+
+    # reel row pe processing state (purani reels already ready)
+    _add_column(c, "reels", "media_status", "TEXT DEFAULT 'ready'")
+    _add_column(c, "reels", "duration", "REAL")
+    _add_column(c, "reels", "width", "INTEGER")
+    _add_column(c, "reels", "height", "INTEGER")
+
+
+# ===============================
+# 009 - REEL HLS LADDER
+# ===============================
+def m009_reel_hls(c):
+    # hls_status: NULL (nahi bana) / processing / ready / failed
+    _add_column(c, "reels", "hls_status", "TEXT")
+    _add_column(c, "reels", "hls_path", "TEXT")          # master.m3u8 ka URL
+    _add_column(c, "reels", "hls_renditions", "TEXT")    # "240,480,720"
+
+
+# ===============================
+# 010 - CONTENT-ADDRESSED MEDIA (routes/blobs.py)
+# ===============================
+def m010_blob_store(c):
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS blobs (
+            name TEXT PRIMARY KEY,              -- <sha256>.<ext>
+            size INTEGER,
+            refcount INTEGER NOT NULL DEFAULT 0,
+            created_at INTEGER,
+            released_at INTEGER                 -- refcount 0 kab hua (gc)
+        ) WITHOUT ROWID
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_blobs_unreferenced ON blobs(released_at) WHERE refcount=0")
+
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS media (
+            owner_kind TEXT NOT NULL,           -- post / reel / story / avatar
+            owner_id INTEGER NOT NULL,
+            blob TEXT NOT NULL,
+            created_at INTEGER,
+            PRIMARY KEY (owner_kind, owner_id, blob)
+        ) WITHOUT ROWID
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_media_blob ON media(blob)")
+
+    # reels.video_path ab static/uploads ke relative (blobs/ab/cd/.. bhi ho sakta hai)
+    c.execute("""
+        UPDATE reels SET video_path = 'reels/' || video_path
+        WHERE video_path IS NOT NULL AND instr(video_path, '/') = 0
+    """)
+
+
+# ===============================
+# 011 - POST COUNTERS (routes/post_counters.py maintain karta hai)
+# ===============================
+def m011_post_counters(c):
+    _add_column(c, "posts", "comments_count", "INTEGER DEFAULT 0")
+
+    # posts.likes ab tak kisi ne update nahi kiya -> asli counts se bharo
+    c.execute("""
+        UPDATE posts SET
+            likes = (SELECT COUNT(*) FROM likes WHERE post_id=posts.id),
+            comments_count = (SELECT COUNT(*) FROM comments WHERE post_id=posts.id)
+    """)
+
+
+# ===============================
+# 012 - FTS5 SEARCH (routes/search.py)
+# ===============================
+# external-content: text users / posts / reels me hi rehta hai, FTS sirf
+# index. Triggers har insert / update / delete pe index sync rakhte hain.
+FTS_TABLES = {
+    # fts table: (content table, columns)
+    "users_fts": ("users", ("username", "bio")),
+    "posts_fts": ("posts", ("caption", "hashtags", "location")),
+    "reels_fts": ("reels", ("caption", "audio_name", "hashtags")),
+}
+
+
+def _fts_triggers(c, fts, table, cols):
+    col_list = ", ".join(cols)
+    new_vals = ", ".join(f"new.{col}" for col in cols)
+    old_vals = ", ".join(f"old.{col}" for col in cols)
+
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts}(rowid, {col_list}) VALUES (new.id, {new_vals});
+        END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {col_list}) VALUES ('delete', old.id, {old_vals});
+        END
+    """)
+    # sirf indexed columns badle tab (likes / views update pe index mat chhedo)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {col_list} ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {col_list}) VALUES ('delete', old.id, {old_vals});
+            INSERT INTO {fts}(rowid, {col_list}) VALUES (new.id, {new_vals});
+        END
+    """)
+
+
+# routes/search.py ka TAG_RE, 012 ke waqt jaisa (wahan badle to bhi yeh backfill same)
+M012_TAG_RE = re.compile(r"#(\w{1,64})", re.UNICODE)
+
+
+def m012_search_index(c):
+    # publish ka hashtags / location ab save hota hai
+    _add_column(c, "posts", "hashtags", "TEXT")
+    _add_column(c, "posts", "location", "TEXT")
+    _add_column(c, "reels", "hashtags", "TEXT")
+    _add_column(c, "reels", "location", "TEXT")
+
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS hashtag_uses (
+            tag TEXT NOT NULL,
+            owner_kind TEXT NOT NULL,       -- post / reel
+            owner_id INTEGER NOT NULL,
+            PRIMARY KEY (tag, owner_kind, owner_id)
+        ) WITHOUT ROWID
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_hashtag_uses_owner ON hashtag_uses(owner_kind, owner_id)")
+
+    # purane captions ke #tags
+    for table, kind in (("posts", "post"), ("reels", "reel")):
+        c.execute(f"SELECT id, caption FROM {table} WHERE caption LIKE '%#%'")
+        for owner_id, caption in c.fetchall():
+            tags = list(dict.fromkeys(t.lower() for t in M012_TAG_RE.findall(caption or "")))
+            c.execute(f"UPDATE {table} SET hashtags=? WHERE id=?", (" ".join(tags) or None, owner_id))
+            c.executemany(
+                "INSERT OR IGNORE INTO hashtag_uses (tag, owner_kind, owner_id) VALUES (?, ?, ?)",
+                [(t, kind, owner_id) for t in tags]
+            )
+
+        # post / reel delete -> uske tags bhi
+        c.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_hashtags_ad AFTER DELETE ON {table} BEGIN
+                DELETE FROM hashtag_uses WHERE owner_kind='{kind}' AND owner_id=old.id;
+            END
+        """)
+
+    for fts, (table, cols) in FTS_TABLES.items():
+        c.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                {", ".join(cols)},
+                content='{table}', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2',
+                prefix='2 3'
+            )
+        """)
+        _fts_triggers(c, fts, table, cols)
+
+        # maujooda rows index karo
+        c.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+# ===============================
+# 013 - USERNAME LOOKUP (routes/username_index.py)
+# ===============================
+# memory index ka DB fallback: lower(username)=lower(?) ab index seek.
+# UNIQUE nahi: purane data me "Dhaval" / "dhaval" dono ho sakte hain.
+def m013_username_lower_index(c):
+    c.execute("CREATE INDEX IF NOT EXISTS idx_users_username_lower ON users(lower(username))")
+
+
+# ===============================
+# 014 - HOME TIMELINE (routes/timeline.py)
+# ===============================
+# routes/timeline.py ka FANOUT_LIMIT, 014 ke waqt jaisa (wahan badle to bhi backfill same)
+M014_FANOUT_LIMIT = 5000
+
+
+def m014_timeline(c):
+    # 0 = fan-out-on-read (bade accounts / purana code path)
+    _add_column(c, "posts", "fanned_out", "INTEGER NOT NULL DEFAULT 0")
+
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS timeline (
+            owner_id INTEGER NOT NULL,
+            post_id INTEGER NOT NULL,
+            author_id INTEGER NOT NULL,
+            created_at TIMESTAMP,
+            PRIMARY KEY (owner_id, post_id)
+        ) WITHOUT ROWID
+    """)
+    # unfollow trim
+    c.execute("CREATE INDEX IF NOT EXISTS idx_timeline_owner_author ON timeline(owner_id, author_id)")
+    # post delete trigger
+    c.execute("CREATE INDEX IF NOT EXISTS idx_timeline_post ON timeline(post_id)")
+    # read pe pull: sirf fan-out na hue posts is index me
+    c.execute("CREATE INDEX IF NOT EXISTS idx_posts_pull ON posts(user_id, id) WHERE fanned_out=0")
+
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS posts_timeline_ad AFTER DELETE ON posts BEGIN
+            DELETE FROM timeline WHERE post_id=old.id;
+        END
+    """)
+
+    # maujooda posts: chhote accounts ke followers + khud author
+    c.execute("""
+        SELECT users.id FROM users
+        WHERE (SELECT COUNT(*) FROM follows WHERE following_id=users.id) <= ?
+    """, (M014_FANOUT_LIMIT,))
+    authors = [r[0] for r in c.fetchall()]
+
+    for author_id in authors:
+        c.execute("""
+            INSERT OR IGNORE INTO timeline (owner_id, post_id, author_id, created_at)
+            SELECT owners.id, posts.id, posts.user_id, posts.created_at
+            FROM posts
+            JOIN (
+                SELECT follower_id AS id FROM follows WHERE following_id=?
+                UNION SELECT ?
+            ) AS owners
+            WHERE posts.user_id=?
+        """, (author_id, author_id, author_id))
+        c.execute("UPDATE posts SET fanned_out=1 WHERE user_id=?", (author_id,))
+
+
+# ===============================
+# 015 - TRENDING SCORES (routes/trending.py)
+# ===============================
+# routes/trending.py ke WEIGHTS / HALF_LIFE / EPOCH, 015 ke waqt jaisa:
+# seed ka formula yahin frozen (live module badle ya helper rename ho to bhi same)
+M015_WEIGHTS = {"like": 1.0, "comment": 2.0, "save": 3.0, "share": 4.0, "view": 0.1}
+M015_DECAY = math.log(2) / (12 * 60 * 60)
+M015_EPOCH = 1767225600
+
+
+def _m015_log_weight(weight, ts):
+    return math.log(weight) + M015_DECAY * (ts - M015_EPOCH)
+
+
+def _created_ts(value, default):
+    try:
+        return calendar.timegm(time.strptime(str(value)[:19], "%Y-%m-%d %H:%M:%S"))
+    except (TypeError, ValueError):
+        return default
+
+
+def m015_trending(c):
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS hot_scores (
+            kind TEXT NOT NULL,             -- post / reel
+            item_id INTEGER NOT NULL,
+            score REAL NOT NULL,            -- log-space, M015_EPOCH relative
+            updated_at INTEGER,
+            PRIMARY KEY (kind, item_id)
+        ) WITHOUT ROWID
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_hot_scores_rank ON hot_scores(kind, score)")
+
+    for table, kind in (("posts", "post"), ("reels", "reel")):
+        c.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_hot_scores_ad AFTER DELETE ON {table} BEGIN
+                DELETE FROM hot_scores WHERE kind='{kind}' AND item_id=old.id;
+            END
+        """)
+
+    # seed: maujooda counters, item ke created_at pe (purane khud thande)
+    w = M015_WEIGHTS
+    now = int(time.time())
+
+    c.execute("""
+        SELECT id, created_at, likes, comments_count,
+               (SELECT COUNT(*) FROM post_saves WHERE post_id=posts.id)
+        FROM posts
+    """)
+    seeds = [("post", pid, created,
+              (likes or 0) * w["like"] + (comments or 0) * w["comment"] + saves * w["save"])
+             for pid, created, likes, comments, saves in c.fetchall()]
+
+    c.execute("SELECT id, created_at, likes, comments_count, saves, shares, views FROM reels")
+    seeds += [("reel", rid, created,
+               (likes or 0) * w["like"] + (comments or 0) * w["comment"] + (saves or 0) * w["save"]
+               + (shares or 0) * w["share"] + (views or 0) * w["view"])
+              for rid, created, likes, comments, saves, shares, views in c.fetchall()]
+
+    c.executemany(
+        "INSERT OR IGNORE INTO hot_scores (kind, item_id, score, updated_at) VALUES (?, ?, ?, ?)",
+        [(kind, item_id, _m015_log_weight(weight, _created_ts(created, now)), now)
+         for kind, item_id, created, weight in seeds if weight > 0]
+    )
+
+
+# ===============================
+# 016 - SOCKET.IO BACKPLANE + CALL STATE (socket_backplane.py, routes/call_socket.py)
+# (SOCKETIO_MESSAGE_QUEUE=sqlite: workers ke beech emit; call state process dict se bahar)
+# ===============================
+def m016_socket_backplane(c):
+    # SOCKETIO_MESSAGE_QUEUE=sqlite: workers ke beech emit (socket_backplane.py)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS socket_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            channel TEXT NOT NULL,
+            payload TEXT NOT NULL,          -- pubsub message json
+            created_at INTEGER NOT NULL
+        )
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_socket_events_channel ON socket_events(channel, id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_socket_events_created ON socket_events(created_at)")
+
+    # call_socket.active_calls dict -> table (accept dusre worker pe aa sakta hai)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS call_state (
+            chat_id INTEGER PRIMARY KEY,
+            state TEXT NOT NULL,            -- json: caller, receiver, status, type
+            updated_at INTEGER NOT NULL
+        )
+    """)
+
+
+# ===============================
+# 017 - TRENDING DEDUP (routes/trending.py bump_once)
+# ===============================
+def m017_hot_events(c):
+    # (user, item, like/save) ek hi baar score me; toggle spam se top pe nahi
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS hot_events (
+            kind TEXT NOT NULL,             -- post / reel
+            item_id INTEGER NOT NULL,
+            event TEXT NOT NULL,            -- like / save
+            user_id INTEGER NOT NULL,
+            PRIMARY KEY (kind, item_id, event, user_id)
+        ) WITHOUT ROWID
+    """)
+
+    for table, kind in (("posts", "post"), ("reels", "reel")):
+        c.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_hot_events_ad AFTER DELETE ON {table} BEGIN
+                DELETE FROM hot_events WHERE kind='{kind}' AND item_id=old.id;
+            END
+        """)
+
+    # maujooda likes / saves 015 ke seed me gine ja chuke
+    for kind, event, table, item_col in (
+        ("post", "like", "likes", "post_id"),
+        ("post", "save", "post_saves", "post_id"),
+        ("reel", "like", "reel_likes", "reel_id"),
+        ("reel", "save", "reel_saves", "reel_id"),
+    ):
+        c.execute(f"""
+            INSERT OR IGNORE INTO hot_events (kind, item_id, event, user_id)
+            SELECT ?, {item_col}, ?, user_id FROM {table}
+            WHERE {item_col} IS NOT NULL AND user_id IS NOT NULL
+        """, (kind, event))
+
+
+# ===============================
+# REGISTRY
+# checks: (table, sql, params) -> migration ke baad us table ka full SCAN nahi hona chahiye
+# ===============================
+MIGRATIONS = [
+    {
+        "version": 1,
+        "name": "baseline schema",
+        "up": m001_baseline,
+        "checks": []
+    },
+    {
+        "version": 2,
+        "name": "hot path indexes",
+        "up": m002_hot_path_indexes,
+        "checks": [
+            ("likes", "SELECT COUNT(*) FROM likes WHERE post_id=?", (1,)),
+            ("likes", "SELECT id FROM likes WHERE post_id=? AND user_id=?", (1, 1)),
+            ("likes", "SELECT id FROM likes WHERE post_id=? AND username=?", (1, "1")),
+            ("comments", "SELECT id FROM comments WHERE post_id=?", (1,)),
+            ("post_images", "SELECT image_path FROM post_images WHERE post_id=?", (1,)),
+            ("notifications", "SELECT COUNT(*) FROM notifications WHERE user_id=? AND is_read=0", (1,)),
+            ("message_receipts", "SELECT 1 FROM message_receipts WHERE message_id=? AND user_id=?", (1, 1)),
+            ("reel_comments", "SELECT id FROM reel_comments WHERE reel_id=?", (1,)),
+            ("follows", "SELECT COUNT(*) FROM follows WHERE following_id=?", (1,)),
+            ("posts", "SELECT id FROM posts WHERE user_id=?", (1,)),
+        ]
+    },
+    {
+        "version": 3,
+        "name": "story store",
+        "up": m003_story_store,
+        "checks": [
+            ("stories", "SELECT id FROM stories WHERE user_id=? AND filename IS NOT NULL AND timestamp > ?", (1, 0)),
+            ("stories", "SELECT id FROM stories WHERE filename IS NOT NULL AND timestamp <= ?", (0,)),
+        ]
+    },
+    {
+        "version": 4,
+        "name": "expiry sweeper indexes",
+        "up": m004_expiry_indexes,
+        "checks": [
+            ("messages", "SELECT id, chat_id FROM messages WHERE expires_at IS NOT NULL AND expires_at<=? AND deleted=0 ORDER BY expires_at LIMIT 500", ("2000-01-01 00:00:00",)),
+        ]
+    },
+    {
+        "version": 5,
+        "name": "chat state",
+        "up": m005_chat_state,
+        "checks": [
+            ("chat_state", "SELECT chat_id, other_id, last_msg, last_time, unread_count FROM chat_state WHERE user_id=? ORDER BY last_time DESC", (1,)),
+        ]
+    },
+    {
+        "version": 6,
+        "name": "chat history index",
+        "up": m006_chat_history_index,
+        "checks": [
+            ("messages", "SELECT id FROM messages WHERE chat_id=? AND id<? ORDER BY id DESC LIMIT 51", (1, 1000)),
+            ("messages", "SELECT MAX(id) FROM messages WHERE chat_id=?", (1,)),
+        ]
+    },
+    {
+        "version": 7,
+        "name": "message hidden",
+        "up": m007_message_hidden,
+        "checks": [
+            ("message_hidden", "SELECT 1 FROM message_hidden WHERE message_id=? AND user_id=?", (1, 1)),
+        ]
+    },
+    {
+        "version": 8,
+        "name": "media job queue",
+        "up": m008_job_queue,
+        "checks": [
+            ("jobs", "SELECT id FROM jobs WHERE status='queued' AND run_after<=? ORDER BY run_after, id LIMIT 1", (0,)),
+            ("jobs", "SELECT id FROM jobs WHERE locked_by=?", ("x",)),
+        ]
+    },
+    {
+        "version": 9,
+        "name": "reel hls ladder",
+        "up": m009_reel_hls,
+        "checks": []
+    },
+    {
+        "version": 10,
+        "name": "blob store",
+        "up": m010_blob_store,
+        "checks": [
+            ("blobs", "SELECT name FROM blobs WHERE refcount=0 AND released_at < ? ORDER BY released_at LIMIT 500", (0,)),
+            ("media", "SELECT blob FROM media WHERE owner_kind=? AND owner_id IN (?)", ("post", 1)),
+        ]
+    },
+    {
+        "version": 11,
+        "name": "post counters",
+        "up": m011_post_counters,
+        "checks": [
+            ("posts", "SELECT id, likes, comments_count FROM posts WHERE id IN (?, ?)", (1, 2)),
+            ("likes", "SELECT id FROM likes WHERE post_id=? AND (user_id=? OR username=?)", (1, 1, 1)),
+        ]
+    },
+    {
+        "version": 12,
+        "name": "fts5 search",
+        "up": m012_search_index,
+        "checks": [
+            ("users", "SELECT users.id FROM users_fts JOIN users ON users.id = users_fts.rowid WHERE users_fts MATCH ? ORDER BY bm25(users_fts)", ('"a"*',)),
+            ("posts", "SELECT posts.id FROM posts_fts JOIN posts ON posts.id = posts_fts.rowid WHERE posts_fts MATCH ?", ('"a"*',)),
+            ("hashtag_uses", "SELECT tag, COUNT(*) FROM hashtag_uses WHERE tag >= ? AND tag < ? GROUP BY tag", ("a", "b")),
+        ]
+    },
+    {
+        "version": 13,
+        "name": "username lower index",
+        "up": m013_username_lower_index,
+        "checks": [
+            ("users", "SELECT id FROM users WHERE lower(username)=lower(?) AND id IS NOT ?", ("a", None)),
+        ]
+    },
+    {
+        "version": 14,
+        "name": "home timeline",
+        "up": m014_timeline,
+        "checks": [
+            ("timeline", "SELECT post_id FROM timeline WHERE owner_id=? AND post_id < ? ORDER BY post_id DESC LIMIT 10", (1, 10 ** 9)),
+            ("timeline", "DELETE FROM timeline WHERE owner_id=? AND author_id=?", (0, 0)),
+            ("posts", "SELECT id FROM posts WHERE fanned_out=0 AND id < ? AND user_id IN (SELECT following_id FROM follows WHERE follower_id=? UNION SELECT ?) ORDER BY id DESC LIMIT 10", (10 ** 9, 1, 1)),
+        ]
+    },
+    {
+        "version": 15,
+        "name": "trending scores",
+        "up": m015_trending,
+        "checks": [
+            ("hot_scores", "SELECT item_id, score FROM hot_scores WHERE kind=? ORDER BY score DESC LIMIT 100", ("post",)),
+            ("hot_scores", "DELETE FROM hot_scores WHERE kind=? AND score < ?", ("post", 0)),
+        ]
+    },
+    {
+        "version": 16,
+        "name": "socket backplane + call state",
+        "up": m016_socket_backplane,
+        "checks": [
+            ("socket_events", "SELECT id, payload FROM socket_events WHERE id > ? AND channel=? ORDER BY id LIMIT 500", (0, "inschat")),
+            ("socket_events", "DELETE FROM socket_events WHERE created_at < ?", (0,)),
+        ]
+    },
+    {
+        "version": 17,
+        "name": "trending event dedup",
+        "up": m017_hot_events,
+        "checks": [
+            ("hot_events", "SELECT 1 FROM hot_events WHERE kind=? AND item_id=? AND event=? AND user_id=?", ("post", 0, "like", 0)),
+            ("hot_events", "DELETE FROM hot_events WHERE kind=? AND item_id=?", ("post", 0)),
+        ]
+    },
+]
+
+LATEST_VERSION = MIGRATIONS[-1]["version"]
+
+# self-check: ye tables/columns na mile to app start hi nahi hona chahiye
+REQUIRED_SCHEMA = {
+    "users": ["id", "username", "photo"],
+    "posts": ["id", "user_id", "caption", "likes", "comments_count",
+              "hashtags", "location", "fanned_out"],
+    "reels": ["id", "user_id", "video_path", "thumbnail", "likes", "saves",
+              "shares", "comments_count", "views", "audio_name", "created_at",
+              "media_status", "duration", "width", "height",
+              "hls_status", "hls_path", "hls_renditions", "hashtags", "location"],
+    "reel_likes": ["reel_id", "user_id"],
+    "reel_views": ["reel_id", "user_id"],
+    "reel_comments": ["reel_id", "user_id", "comment"],
+    "reel_saves": ["reel_id", "user_id"],
+    "reel_shares": ["reel_id", "sender_id", "receiver_id"],
+    "follows": ["follower_id", "following_id"],
+    "stories": ["id", "user_id", "filename", "timestamp"],
+    "story_views": ["story_id", "viewer_id"],
+    "story_likes": ["story_id", "user_id"],
+    "message_hidden": ["message_id", "user_id"],
+    "jobs": ["id", "kind", "payload", "status", "attempts", "max_attempts",
+             "run_after", "locked_by", "locked_at", "last_error"],
+    "chat_state": ["chat_id", "user_id", "other_id", "last_message_id",
+                   "last_msg", "last_time", "unread_count"],
+    "blobs": ["name", "size", "refcount", "created_at", "released_at"],
+    "media": ["owner_kind", "owner_id", "blob", "created_at"],
+    "hashtag_uses": ["tag", "owner_kind", "owner_id"],
+    "timeline": ["owner_id", "post_id", "author_id", "created_at"],
+    "hot_scores": ["kind", "item_id", "score", "updated_at"],
+    "socket_events": ["id", "channel", "payload", "created_at"],
+    "call_state": ["chat_id", "state", "updated_at"],
+    "hot_events": ["kind", "item_id", "event", "user_id"],
+}
+
+# process-level guard: ek baar ready -> dobara db touch nahi
+_schema_ready = False
+
+
+# -------------------------
+# RUNNER
+# -------------------------
+def _ensure_version_table(c):
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT,
+            applied_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def current_version(c):
+    _ensure_version_table(c)
+    c.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+    return c.fetchone()[0]
+
+
+def _run_checks(c, checks):
+    plans = []
+    for table, sql, params in checks:
+        try:
+            plans.append(_plan(c, sql, params))
+        except sqlite3.OperationalError as e:
+            # table abhi bani hi nahi (fresh db)
+            plans.append([f"n/a ({e})"])
+    return plans
+
+
+def migrate(path=None, verbose=False):
+    """Pending migrations apply karo. Report list return hota hai."""
+
+    # apna alag connection: pool wale connection pe isolation_level nahi chhedna
+    conn = sqlite3.connect(path or db.DB_PATH, timeout=30)
+    conn.isolation_level = None
+    c = conn.cursor()
+
+    # WAL db file me persistent: yahin ek baar, har pool connection pe nahi
+    c.execute("PRAGMA journal_mode=WAL")
+
+    report = []
+
+    try:
+        # dusre worker ke saath race na ho
+        c.execute("BEGIN IMMEDIATE")
+        version = current_version(c)
+
+        for m in MIGRATIONS:
+            if m["version"] <= version:
+                continue
+
+            before = _run_checks(c, m["checks"])
+            m["up"](c)
+            after = _run_checks(c, m["checks"])
+
+            c.execute(
+                "INSERT INTO schema_version (version, name) VALUES (?, ?)",
+                (m["version"], m["name"])
+            )
+
+            warnings = [
+                f"{table}: still full-scanned by {sql!r}"
+                for (table, sql, _), plan in zip(m["checks"], after)
+                if _full_scan(plan, table)
+            ]
+
+            report.append({
+                "version": m["version"],
+                "name": m["name"],
+                "checks": [
+                    {"sql": sql, "before": b, "after": a}
+                    for (_, sql, _), b, a in zip(m["checks"], before, after)
+                ],
+                "warnings": warnings
+            })
+
+        c.execute("COMMIT")
+
+    except Exception:
+        c.execute("ROLLBACK")
+        raise
+
+    finally:
+        conn.close()
+
+    if verbose:
+        print_report(report)
+
+    return report
+
+
+def self_check(path=None):
+    """Schema version + required tables/columns verify karo. Problems ki list."""
+    conn = sqlite3.connect(path or db.DB_PATH)
+    c = conn.cursor()
+
+    problems = []
+
+    version = current_version(c)
+    if version < LATEST_VERSION:
+        problems.append(f"schema_version {version} < {LATEST_VERSION}")
+
+    for table, cols in REQUIRED_SCHEMA.items():
+        have = _columns(c, table)
+        if not have:
+            problems.append(f"missing table {table}")
+            continue
+        missing = [col for col in cols if col not in have]
+        if missing:
+            problems.append(f"{table} missing columns {missing}")
+
+    conn.close()
+    return problems
+
+
+def ensure_schema(path=None):
+    """Startup pe ek baar: migrate + self-check. Baad ke calls free hain."""
+    global _schema_ready
+
+    if _schema_ready:
+        return
+
+    migrate(path)
+
+    problems = self_check(path)
+    if problems:
+        raise RuntimeError("database schema self-check failed: " + "; ".join(problems))
+
+    _schema_ready = True
+
+
+def explain(path=None):
+    """Current db pe saare checks ka query plan (koi migration nahi chalta)."""
+    conn = sqlite3.connect(path or db.DB_PATH)
+    c = conn.cursor()
+
+    out = []
+    for m in MIGRATIONS:
+        for (table, sql, params), plan in zip(m["checks"], _run_checks(c, m["checks"])):
+            out.append({"version": m["version"], "sql": sql, "plan": plan})
+
+    conn.close()
+    return out
+
+
+def print_report(report):
+    if not report:
+        print(f"✅ schema up to date (version {LATEST_VERSION})")
+        return
+
+    for r in report:
+        print(f"✅ migration {r['version']:03d} {r['name']}")
+        for chk in r["checks"]:
+            print(f"   {chk['sql']}")
+            print(f"     before: {' | '.join(chk['before'])}")
+            print(f"     after:  {' | '.join(chk['after'])}")
+        for w in r["warnings"]:
+            print(f"   ⚠️  {w}")
+
+
+if __name__ == "__main__":
+    if "--plan" in sys.argv:
+        for row in explain():
+            print(f"[{row['version']:03d}] {row['sql']}\n      {' | '.join(row['plan'])}")
+    else:
+        migrate(verbose=True)
@@ -1,5 +1,5 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session
-import sqlite3
+import db
 import random
 import os
 import requests
@@ -9,6 +9,8 @@ from datetime import datetime, timedelta
 from authlib.integrations.flask_client import OAuth
 from flask import current_app
 
+from routes import username_index
+
 BREVO_API_KEY = os.getenv("BREVO_API_KEY")
 
 auth_bp = Blueprint("auth", __name__, url_prefix="/auth")
@@ -123,7 +125,7 @@ def login():
         username = request.form.get("username", "").strip()
         password = request.form.get("password", "").strip()
 
-        conn = sqlite3.connect("database.db")
+        conn = db.connect()
         c = conn.cursor()
 
         # Username se user fetch karo
@@ -161,18 +163,19 @@ def login():
 def check_username():
     username = request.args.get("username", "").strip()
 
-    conn = sqlite3.connect("database.db")
-    c = conn.cursor()
+    # har keystroke pe aata hai -> sirf memory index, DB nahi
+    exists = username_index.is_taken(username)
 
-    c.execute(
-        "SELECT id FROM users WHERE lower(username)=lower(?)",
-        (username,)
-    )
+    return {"available": not exists}
 
-    exists = c.fetchone() is not None
-    conn.close()
 
-    return {"available": not exists}
+# username autocomplete (mentions / search box), top-k prefix
+@auth_bp.route("/api/usernames")
+def username_suggest():
+    q = request.args.get("q", "")
+    limit = request.args.get("limit", username_index.DEFAULT_LIMIT, type=int)
+
+    return {"users": username_index.prefix(q, limit)}
 
 
 ###############################################
@@ -219,11 +222,10 @@ def register_username():
             flash("Username must be at least 3 characters", "error")
             return redirect(url_for("auth.register_username"))
 
-        conn = sqlite3.connect("database.db")
+        conn = db.connect()
         c = conn.cursor()
 
-        c.execute("SELECT id FROM users WHERE lower(username)=lower(?)", (username,))
-        exists = c.fetchone()
+        exists = username_index.taken(c, username)
 
         conn.close()
 
@@ -322,7 +324,7 @@ def register_verify():
             google_id = session.get("google_id", None)
 
             # ✅ Sirf username unique hoga
-            conn = sqlite3.connect("database.db")
+            conn = db.connect()
             c = conn.cursor()
 
             c.execute(
@@ -389,7 +391,7 @@ def google_callback():
     email = user_info["email"]
     google_id = user_info["sub"]
 
-    conn = sqlite3.connect("database.db")
+    conn = db.connect()
     c = conn.cursor()
 
     # Agar pehle se account bana hua hai
@@ -423,12 +425,7 @@ def google_callback():
         hashed = generate_password_hash(password)
 
          # Sirf username unique hoga
-        c.execute(
-            "SELECT id FROM users WHERE username=?",
-            (username,)
-        )
-
-        existing = c.fetchone()
+        existing = username_index.taken(c, username)
 
         if existing:
             conn.close()
@@ -458,6 +455,8 @@ def google_callback():
 
         conn.close()
 
+        username_index.add(user_id, username)
+
         # Signup session clear
         session.pop("signup_username", None)
         session.pop("signup_password", None)
@@ -501,7 +500,7 @@ def verify_phone():
 
         hashed = generate_password_hash(password)
 
-        conn = sqlite3.connect("database.db")
+        conn = db.connect()
         c = conn.cursor()
 
         c.execute("""
@@ -523,6 +522,8 @@ def verify_phone():
 
         conn.close()
 
+        username_index.add(user_id, username)
+
         session.clear()
 
         session["user_id"] = user_id
@@ -540,7 +541,7 @@ def forgot_password():
 
         login = request.form.get("login", "").strip()
 
-        conn = sqlite3.connect("database.db")
+        conn = db.connect()
         c = conn.cursor()
 
         c.execute("""
@@ -654,7 +655,7 @@ def resend_reset_otp():
     if "reset_user_id" not in session:
         return redirect(url_for("auth.forgot_password"))
 
-    conn = sqlite3.connect("database.db")
+    conn = db.connect()
     c = conn.cursor()
 
     c.execute(
@@ -706,7 +707,7 @@ def new_password():
 
         hashed = generate_password_hash(password)
 
-        conn = sqlite3.connect("database.db")
+        conn = db.connect()
         c = conn.cursor()
 
         c.execute(
@@ -0,0 +1,303 @@
+# ===============================
+# 🧬 CONTENT-ADDRESSED BLOB STORE
+# ===============================
+# Pehle har upload apne naam se save hota tha (posts.upload me
+# secure_filename -> do users ki "photo.jpg" ek dusre ko overwrite),
+# aur same screenshot editor_temp / posts / stories me baar baar copy.
+#
+# Ab har file ka naam uske content ka sha256 hai:
+#   static/uploads/blobs/ab/cd/<sha256>.<ext>
+#   /static/uploads/blobs/ab/cd/<sha256>.<ext>     (immutable URL)
+#
+#   blobs  (name, size, refcount, ...)              ek row = ek file
+#   media  (owner_kind, owner_id, blob)             post / reel / story / avatar -> blob
+#
+# Same file dobara aaye to disk pe kuch naya nahi likhta, sirf refcount.
+# Delete sirf reference chhodta hai; refcount 0 + GRACE purana blob
+# sweeper (gc) hatata hai.
+
+import hashlib
+import os
+import re
+import tempfile
+import time
+
+import db
+from routes.media import UPLOADS_DIR
+
+BLOB_DIR = os.path.join(UPLOADS_DIR, "blobs")
+BLOB_URL = "/static/uploads/blobs"
+
+CHUNK_SIZE = 1024 * 1024
+GRACE = 6 * 60 * 60        # unreferenced blob itni der rehta hai (editor -> publish)
+
+NAME_RE = re.compile(r"^[0-9a-f]{64}\.[a-z0-9]{1,5}$")
+
+os.makedirs(BLOB_DIR, exist_ok=True)
+
+
+def now_ts():
+    return int(time.time())
+
+
+def _marks(ids):
+    return ",".join("?" * len(ids))
+
+
+# -------------------------
+# NAME <-> PATH / URL
+# -------------------------
+def is_blob(name):
+    return bool(name) and bool(NAME_RE.match(name))
+
+
+def rel_path(name):
+    """'<sha>.jpg' -> 'ab/cd/<sha>.jpg' (BLOB_DIR ke andar)."""
+    return f"{name[:2]}/{name[2:4]}/{name}"
+
+
+def path_for(name):
+    return os.path.join(BLOB_DIR, name[:2], name[2:4], name)
+
+
+def url_for(name):
+    return f"{BLOB_URL}/{rel_path(name)}"
+
+
+def upload_rel(name):
+    """static/uploads ke relative (reels.video_path isi form me)."""
+    return f"blobs/{rel_path(name)}"
+
+
+def name_from_url(url):
+    """Blob URL / upload-relative path -> naam, warna None (purani files)."""
+    if not url:
+        return None
+    name = url.rsplit("/", 1)[-1]
+    return name if is_blob(name) and url.endswith(rel_path(name)) else None
+
+
+def _ext(filename, default="bin"):
+    ext = filename.rsplit(".", 1)[-1].lower() if filename and "." in filename else ""
+    return ext if re.match(r"^[a-z0-9]{1,5}$", ext) else default
+
+
+# -------------------------
+# STORE (stream + hash ek hi pass me)
+# -------------------------
+def _ingest(src, ext, c=None):
+    h = hashlib.sha256()
+    size = 0
+
+    fd, tmp = tempfile.mkstemp(dir=BLOB_DIR, prefix=".incoming-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = src.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                h.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+            out.flush()
+            os.fsync(out.fileno())
+
+        name = f"{h.hexdigest()}.{ext}"
+        dest = path_for(name)
+
+        # pehle row (released_at = ab), phir file check. gc ka DELETE
+        # released_at dobara dekhta hai -> register ke baad wo is blob ko
+        # nahi chhuega; aur agar register se pehle hi file hata chuka tha
+        # to exists() False aayega aur tmp se wapas aa jayegi
+        _register(name, size, c)
+
+        if os.path.exists(dest):
+            # duplicate: zero extra disk, bas GC grace reset
+            os.unlink(tmp)
+            os.utime(dest)
+        else:
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            os.replace(tmp, dest)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+    return name
+
+
+def _register(name, size, c=None):
+    # bina reference ka blob bhi row rakhta hai, taaki gc use dekh sake.
+    # caller ka transaction khula ho to usi me (warna apna connection lock pe atakta)
+    conn = None
+    if c is None:
+        conn = db.connect()
+        c = conn.cursor()
+
+    c.execute("""
+        INSERT INTO blobs (name, size, refcount, created_at, released_at)
+        VALUES (?, ?, 0, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET
+            released_at = CASE WHEN refcount=0 THEN excluded.released_at ELSE released_at END
+    """, (name, size, now_ts(), now_ts()))
+
+    if conn is not None:
+        conn.commit()
+        conn.close()
+
+
+def store(file, filename=None, c=None):
+    """Werkzeug FileStorage (upload) -> blob naam."""
+    return _ingest(file.stream, _ext(filename or file.filename), c)
+
+
+def store_path(path, move=True, c=None):
+    """Disk pe padi file (editor_temp) -> blob naam. move=True: source hata do."""
+    with open(path, "rb") as f:
+        name = _ingest(f, _ext(path), c)
+    if move:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    return name
+
+
+# -------------------------
+# REFERENCES (caller ke transaction me)
+# -------------------------
+def attach(c, owner_kind, owner_id, name):
+    c.execute("""
+        INSERT OR IGNORE INTO media (owner_kind, owner_id, blob, created_at)
+        VALUES (?, ?, ?, ?)
+    """, (owner_kind, owner_id, name, now_ts()))
+
+    if not c.rowcount:
+        return
+
+    c.execute("""
+        INSERT INTO blobs (name, size, refcount, created_at)
+        VALUES (?, ?, 1, ?)
+        ON CONFLICT(name) DO UPDATE SET refcount = refcount + 1, released_at = NULL
+    """, (name, _size(name), now_ts()))
+
+
+def release(c, owner_kind, owner_ids):
+    """owner delete hua -> uske saare blob references chhodo (file nahi)."""
+    owner_ids = list(owner_ids)
+    if not owner_ids:
+        return 0
+
+    params = [owner_kind] + owner_ids
+    c.execute(f"""
+        SELECT blob FROM media
+        WHERE owner_kind=? AND owner_id IN ({_marks(owner_ids)})
+    """, params)
+    names = [r[0] for r in c.fetchall()]
+
+    if not names:
+        return 0
+
+    c.execute(f"""
+        DELETE FROM media
+        WHERE owner_kind=? AND owner_id IN ({_marks(owner_ids)})
+    """, params)
+
+    ts = now_ts()
+    c.executemany("""
+        UPDATE blobs SET
+            refcount = MAX(refcount - 1, 0),
+            released_at = CASE WHEN refcount <= 1 THEN ? ELSE released_at END
+        WHERE name=?
+    """, [(ts, n) for n in names])
+
+    return len(names)
+
+
+def _size(name):
+    try:
+        return os.path.getsize(path_for(name))
+    except OSError:
+        return None
+
+
+# -------------------------
+# GC (sweeper chalata hai)
+# -------------------------
+def gc(limit=500, grace=GRACE, now=None):
+    """refcount 0 aur GRACE se purane blobs hatao. Hataye gaye naam return."""
+    cutoff = (now or now_ts()) - grace
+
+    conn = db.connect()
+    c = conn.cursor()
+
+    c.execute("""
+        SELECT name FROM blobs
+        WHERE refcount=0 AND released_at < ?
+        ORDER BY released_at
+        LIMIT ?
+    """, (cutoff, limit))
+
+    removed = []
+
+    for (name,) in c.fetchall():
+        path = path_for(name)
+
+        # beech me dobara upload hua (utime) -> abhi nahi
+        try:
+            if os.stat(path).st_mtime >= cutoff:
+                continue
+        except OSError:
+            pass
+
+        # SELECT ke baad _ingest ne register kiya ho (released_at naya) -> chhodo
+        c.execute("""
+            DELETE FROM blobs WHERE name=? AND refcount=0 AND released_at < ?
+        """, (name, cutoff))
+        if not c.rowcount:
+            continue
+
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+        removed.append(name)
+
+    conn.commit()
+    conn.close()
+
+    # bache hue .incoming- (crash ke beech) bhi
+    _remove_stale_incoming(cutoff)
+
+    return removed
+
+
+def _remove_stale_incoming(cutoff):
+    with os.scandir(BLOB_DIR) as it:
+        for entry in it:
+            try:
+                if entry.name.startswith(".incoming-") and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+
+def stats():
+    conn = db.connect()
+    c = conn.cursor()
+
+    c.execute("SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(refcount), 0) FROM blobs")
+    blobs, size, refs = c.fetchone()
+
+    c.execute("SELECT COUNT(*) FROM blobs WHERE refcount=0")
+    unreferenced = c.fetchone()[0]
+
+    conn.close()
+
+    return {
+        "blobs": blobs,
+        "bytes": size,
+        "references": refs,
+        "unreferenced": unreferenced,
+    }
@@ -3,7 +3,10 @@ from flask import session, Blueprint, render_template, request
 from socketio_init import socketio
 from datetime import datetime
 from threading import Timer
+import json
 import sqlite3
+import time
+import db
 
 call_bp = Blueprint("call_bp", __name__, url_prefix="/call")
 
@@ -14,7 +17,7 @@ def call_page(chat_id):
 
     # ✔ caller flag detect
     caller = request.args.get("caller") == "1"
-    conn = sqlite3.connect("database.db")
+    conn = db.connect()
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
     me = session.get("user_id")
@@ -37,21 +40,59 @@ def call_page(chat_id):
     )
 
 # ================= CALL STATE ================
-active_calls = {}
+# Process dict nahi, call_state table: caller ek worker pe, receiver ka
+# accept / reject dusre worker pe aa sakta hai (multi-process deploy).
+# Worker mar jaye to ringing / active row atki na rahe -> TTL ke baad gone.
+RING_TIMEOUT = 30
+RING_TTL = RING_TIMEOUT + 30
+ACTIVE_TTL = 4 * 60 * 60
 
 def get_call(chat_id):
-    return active_calls.get(chat_id)
+    conn = db.connect()
+    c = conn.cursor()
+    c.execute("SELECT state, updated_at FROM call_state WHERE chat_id=?", (chat_id,))
+    row = c.fetchone()
 
-def set_call(chat_id, state):
-    active_calls[chat_id] = state
+    if not row:
+        conn.close()
+        return None
+
+    call = json.loads(row[0])
+    ttl = RING_TTL if call.get("status") == "ringing" else ACTIVE_TTL
+    if time.time() - row[1] > ttl:
+        c.execute("DELETE FROM call_state WHERE chat_id=? AND updated_at=?", (chat_id, row[1]))
+        conn.commit()
+        conn.close()
+        return None
+
+    conn.close()
+    return call
+
+def set_call(chat_id, state, new=False):
+    """new=True: sirf tab jab koi call nahi chal rahi (do workers ek saath ring na karein)."""
+    conn = db.connect()
+    c = conn.cursor()
+    verb = "INSERT OR IGNORE" if new else "INSERT OR REPLACE"
+    c.execute(
+        f"{verb} INTO call_state (chat_id, state, updated_at) VALUES (?, ?, ?)",
+        (chat_id, json.dumps(state), int(time.time()))
+    )
+    ok = c.rowcount > 0
+    conn.commit()
+    conn.close()
+    return ok
 
 def clear_call(chat_id):
-    active_calls.pop(chat_id, None)
+    conn = db.connect()
+    c = conn.cursor()
+    c.execute("DELETE FROM call_state WHERE chat_id=?", (chat_id,))
+    conn.commit()
+    conn.close()
 
 
 # ================= GET RECEIVER =================
 def get_receiver(chat_id, me):
-    conn = sqlite3.connect("database.db")
+    conn = db.connect()
     c = conn.cursor()
 
     c.execute(
@@ -72,7 +113,7 @@ def get_receiver(chat_id, me):
     return user1
 
 
-def call_timeout(chat_id):
+def call_timeout(chat_id, call_id=None):
     call = get_call(chat_id)
 
     if not call:
@@ -81,6 +122,10 @@ def call_timeout(chat_id):
     if call["status"] != "ringing":
         return
 
+    # isi beech nayi call shuru ho chuki
+    if call_id and call.get("call_id") != call_id:
+        return
+
     clear_call(chat_id)
 
     socketio.emit(
@@ -140,18 +185,20 @@ def call_request(data):
 
     call_id = int(datetime.utcnow().timestamp())
 
-    # Save active call
-    set_call(chat_id, {
+    # Save active call (dusre worker ne abhi abhi ring kiya -> busy)
+    if not set_call(chat_id, {
         "call_id": call_id,
         "caller": me,
         "receiver": receiver,
         "status": "ringing",
         "type": call_type,
         "started_at": datetime.utcnow().isoformat()
-    })
+    }, new=True):
+        emit("call_busy", {"chat_id": chat_id})
+        return
 
     # Auto timeout after 30 sec
-    Timer(30, call_timeout, args=[chat_id]).start()
+    Timer(RING_TIMEOUT, call_timeout, args=[chat_id, call_id]).start()
 
     print("SENDING incoming_call TO:", f"user_{receiver}")
 
@@ -184,7 +231,7 @@ def call_accept(data):
     set_call(chat_id, call)
 
     # Update database
-    conn = sqlite3.connect("database.db")
+    conn = db.connect()
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
 
@@ -220,7 +267,7 @@ def call_reject(data):
     if not call:
         return
 
-    conn = sqlite3.connect("database.db")
+    conn = db.connect()
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
     me = session.get("user_id")
@@ -255,7 +302,7 @@ def call_ended(data):
         return
 
     # Update database
-    conn = sqlite3.connect("database.db")
+    conn = db.connect()
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
     me = session.get("user_id")
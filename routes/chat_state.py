@@ -0,0 +1,115 @@
+# ===============================
+# 📬 CHAT STATE (inbox summary)
+# ===============================
+# Inbox pehle har chat ke liye messages + message_receipts pe correlated
+# COUNT(*) chalata tha. Ab har participant ki ek row:
+#   chat_state (chat_id, user_id) -> other_id, last_message_id,
+#                                    last_msg, last_time, unread_count
+#
+# Saare functions caller ka cursor lete hain, taaki message write aur
+# chat_state update ek hi transaction me commit ho.
+
+PREVIEW_CHARS = 120
+
+
+def _preview(msg):
+    return (msg or "")[:PREVIEW_CHARS]
+
+
+def _marks(ids):
+    return ",".join("?" * len(ids))
+
+
+# -------------------------
+# CHAT BANI
+# -------------------------
+def open_chat(c, chat_id, user1, user2):
+    c.executemany(
+        "INSERT OR IGNORE INTO chat_state (chat_id, user_id, other_id) VALUES (?, ?, ?)",
+        [(chat_id, user1, user2), (chat_id, user2, user1)]
+    )
+
+
+# -------------------------
+# NAYA MESSAGE
+# -------------------------
+def record_message(c, chat_id, sender_id, message_id, msg, created_at):
+    # sender ka unread same, baaki participant ka +1
+    c.execute("""
+        UPDATE chat_state SET
+            last_message_id=?,
+            last_msg=?,
+            last_time=?,
+            unread_count = unread_count + (user_id != ?)
+        WHERE chat_id=?
+    """, (message_id, _preview(msg), created_at, sender_id, chat_id))
+
+
+def update_preview(c, chat_id, message_id, msg):
+    """Edit hua message agar last message hai to preview badlo."""
+    c.execute(
+        "UPDATE chat_state SET last_msg=? WHERE chat_id=? AND last_message_id=?",
+        (_preview(msg), chat_id, message_id)
+    )
+
+
+# -------------------------
+# SEEN
+# -------------------------
+def mark_read(c, chat_id, user_id):
+    c.execute(
+        "UPDATE chat_state SET unread_count=0 WHERE chat_id=? AND user_id=?",
+        (chat_id, user_id)
+    )
+
+
+# -------------------------
+# DELETE / EXPIRY -> chat dobara gino
+# (rare path; idx_messages_chat_id + idx_receipts_msg_user use hote hain)
+# -------------------------
+def refresh(c, chat_ids):
+    chat_ids = list(set(chat_ids))
+
+    if not chat_ids:
+        return
+
+    marks = _marks(chat_ids)
+
+    c.execute(f"""
+        UPDATE chat_state SET
+            last_message_id = (SELECT MAX(id) FROM messages WHERE chat_id=chat_state.chat_id)
+        WHERE chat_id IN ({marks})
+    """, chat_ids)
+
+    c.execute(f"""
+        UPDATE chat_state SET
+            last_msg = COALESCE((SELECT substr(msg, 1, {PREVIEW_CHARS}) FROM messages WHERE id=chat_state.last_message_id), ''),
+            last_time = (SELECT created_at FROM messages WHERE id=chat_state.last_message_id),
+            unread_count = (
+                SELECT COUNT(*) FROM messages m
+                WHERE m.chat_id=chat_state.chat_id
+                  AND m.sender_id!=chat_state.user_id
+                  AND m.deleted=0
+                  AND NOT EXISTS (
+                      SELECT 1 FROM message_receipts r
+                      WHERE r.message_id=m.id AND r.user_id=chat_state.user_id
+                  )
+            )
+        WHERE chat_id IN ({marks})
+    """, chat_ids)
+
+
+# -------------------------
+# INBOX (ek indexed row per chat)
+# -------------------------
+def inbox_rows(c, user_id):
+    c.execute("""
+        SELECT cs.chat_id, cs.other_id,
+               u.username, u.photo,
+               cs.last_msg, cs.last_time, cs.unread_count
+        FROM chat_state cs
+        LEFT JOIN users u ON u.id = cs.other_id
+        WHERE cs.user_id=?
+        ORDER BY cs.last_time DESC
+    """, (user_id,))
+    return c.fetchall()
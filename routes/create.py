@@ -1,12 +1,14 @@
 # routes/create.py
-from flask import Blueprint, render_template, request, redirect, session, flash, url_for, send_from_directory
-import os, uuid, sqlite3, shutil, json, time
-import json, time
+from flask import Blueprint, render_template, request, redirect, session, flash, url_for
+import os, json
+import db
+import json
 from werkzeug.utils import secure_filename
+from routes.media import send_media
+from routes import blobs, explore_grid, search, timeline
 
 create_bp = Blueprint("create", __name__, url_prefix="/create")
 
-DB_NAME = "database.db"
 
 UPLOAD_REELS_DIR = os.path.join("static", "uploads", "reels")
 UPLOAD_POSTS_DIR = os.path.join("static", "uploads", "posts")      # ✅ posts folder
@@ -24,9 +26,7 @@ os.makedirs(EDITOR_TEMP_DIR, exist_ok=True)
 # ✅ DB CONNECTION
 # ===============================
 def get_conn():
-    conn = sqlite3.connect(DB_NAME)
-    conn.row_factory = sqlite3.Row
-    return conn
+    return db.connect_rows()
 
 
 # ===============================
@@ -68,9 +68,8 @@ def editor():
             flash("Invalid file", "error")
             return redirect("/create")
 
-        newname = f"{uuid.uuid4().hex}_{filename}"
-        save_path = os.path.join(EDITOR_TEMP_DIR, newname)
-        f.save(save_path)
+        # seedha blob store: same screenshot dobara -> wahi file
+        newname = blobs.store(f, filename)
 
         return redirect(url_for("create.editor", media_path=newname, mode=request.args.get("mode","post")))
 
@@ -79,9 +78,7 @@ def editor():
         f = request.files.get("export")
         filename = secure_filename(f.filename) or "export.webm"
 
-        newname = f"{uuid.uuid4().hex}_{filename}"
-        save_path = os.path.join(EDITOR_TEMP_DIR, newname)
-        f.save(save_path)
+        newname = blobs.store(f, filename)
 
         return redirect(url_for("create.publish", media_path=newname, mode=request.args.get("mode","post")))
 
@@ -112,108 +109,52 @@ def publish():
             flash("No media selected", "error")
             return redirect("/create")
 
-        src = os.path.join(EDITOR_TEMP_DIR, media_path)
+        # editor upload already blob hai; purani editor_temp file ho to ab blob banao
+        if blobs.is_blob(media_path):
+            src = blobs.path_for(media_path)
+        else:
+            src = os.path.join(EDITOR_TEMP_DIR, secure_filename(media_path))
+
         if not os.path.exists(src):
             flash("File missing in editor temp", "error")
             return redirect("/create")
 
-        # Decide destination folder
-        if mode == "reel":
-            dest_folder = UPLOAD_REELS_DIR
-        elif mode == "story":
-            dest_folder = UPLOAD_STORY_DIR
-        else:
-            dest_folder = UPLOAD_POSTS_DIR
-
-        dest_name = f"{uuid.uuid4().hex}_{media_path}"
-        dest = os.path.join(dest_folder, dest_name)
-
-        # Move file
-        try:
-            os.replace(src, dest)
-        except:
-            shutil.copy(src, dest)
+        blob = media_path if blobs.is_blob(media_path) else blobs.store_path(src)
 
         # DB SAVE
         conn = get_conn()
         c = conn.cursor()
 
-        # POSTS TABLE
-        c.execute("""
-            CREATE TABLE IF NOT EXISTS posts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                caption TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-
-        # POST IMAGES TABLE
-        c.execute("""
-            CREATE TABLE IF NOT EXISTS post_images (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                post_id INTEGER,
-                image_path TEXT
-            )
-        """)
-
-        # REELS TABLE (MATCH WITH reels.py)
-        c.execute("""
-            CREATE TABLE IF NOT EXISTS reels (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                caption TEXT,
-                video_path TEXT,
-                likes INTEGER DEFAULT 0,
-                comments INTEGER DEFAULT 0,
-                shares INTEGER DEFAULT 0,
-                saves INTEGER DEFAULT 0
-            )
-        """)
-
-        # STORIES TABLE
-        c.execute("""
-            CREATE TABLE IF NOT EXISTS stories (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                media_path TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                expires_at TIMESTAMP
-            )
-        """)
-
         # SAVE ACCORDING TO MODE
         if mode == "reel":
-            # reels folder me save hoga
-            db_path = dest_name
+            db_path = blobs.upload_rel(blob)
 
             c.execute("""
-                INSERT INTO reels (user_id, caption, video_path)
-                VALUES (?, ?, ?)
-            """, (user_id, caption, db_path))
+                INSERT INTO reels (user_id, caption, video_path, location)
+                VALUES (?, ?, ?, ?)
+            """, (user_id, caption, db_path, location or None))
+            reel_id = c.lastrowid
+
+            search.set_tags(c, "reel", reel_id, caption, hashtags)
+
+            blobs.attach(c, "reel", reel_id, blob)
+
+            # thumbnail ab yahan bhi banega (background job)
+            from routes import reel_media
+            reel_media.enqueue(c, reel_id, db_path)
 
             conn.commit()
             conn.close()
 
+            explore_grid.add_reel(reel_id, db_path)
+
             flash("Reel published successfully!", "success")
             return redirect("/reels")
 
         elif mode == "story":
-            from routes.stories import load_stories, save_stories
-
-            stories = load_stories()
+            from routes import story_store
 
-            stories.append({
-                "id": max([s.get("id",0) for s in stories], default=0) + 1,
-                "user_id": str(user_id),
-                "filename": dest_name,
-                "timestamp": int(time.time()),
-                "viewers": [],
-                "likes": [],
-                "reactions": {}
-            })
-
-            save_stories(stories)
+            story_store.add_story(user_id, blob)
 
             conn.close()
 
@@ -222,15 +163,27 @@ def publish():
 
         else:
             # Post mode
-            c.execute("INSERT INTO posts (user_id, caption) VALUES (?, ?)", (user_id, caption))
+            c.execute("INSERT INTO posts (user_id, caption, location) VALUES (?, ?, ?)",
+                      (user_id, caption, location or None))
             post_id = c.lastrowid
 
-            db_path = "/static/uploads/posts/" + dest_name
+            # hashtags ab save + searchable (pehle discard hote the)
+            search.set_tags(c, "post", post_id, caption, hashtags)
+
+            db_path = blobs.url_for(blob)
             c.execute("INSERT INTO post_images (post_id, image_path) VALUES (?, ?)", (post_id, db_path))
+            blobs.attach(c, "post", post_id, blob)
+
+            from routes import images
+            images.enqueue(c, db_path)
+
+            timeline.fan_out(c, post_id, user_id)
 
             conn.commit()
             conn.close()
 
+            explore_grid.add_post(post_id, db_path)
+
             flash("Post published successfully!", "success")
             return redirect("/posts/feed")
 
@@ -245,4 +198,9 @@ def publish():
 # ===============================
 @create_bp.route("/editor_temp/<path:fn>")
 def editor_temp(fn):
-    return send_from_directory(EDITOR_TEMP_DIR, fn)
+    # blob ka naam hi content hai -> immutable
+    if blobs.is_blob(fn):
+        return send_media(blobs.BLOB_DIR, blobs.rel_path(fn), immutable=True)
+
+    # purani editor_temp file publish tak badal sakti hai -> revalidate
+    return send_media(EDITOR_TEMP_DIR, fn, max_age=0, immutable=False)
@@ -1,9 +1,7 @@
-import sqlite3
+import db
 
 def get_db():
-    conn = sqlite3.connect("database.db")
-    conn.row_factory = sqlite3.Row
-    return conn
+    return db.connect_rows()
 
 def query_db(query, args=(), one=False):
     conn = get_db()
@@ -1,6 +1,7 @@
-from flask import Blueprint, render_template, session, request
+from flask import Blueprint, Response, render_template, session, request, jsonify
 import sqlite3
-import os
+import db
+from routes import explore_grid, search
 
 explore_bp = Blueprint("explore", __name__, url_prefix="/explore")
 
@@ -11,107 +12,63 @@ explore_bp = Blueprint("explore", __name__, url_prefix="/explore")
 @explore_bp.route("/")
 def explore_page():
 
-    conn = sqlite3.connect("database.db")
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-
-    # USERS
-    c.execute("""
-        SELECT id, username, photo
-        FROM users
-        ORDER BY id DESC
-    """)
-    users = c.fetchall()
-
-    explore_items = []
-
-    # =========================
-    # POSTS
-    # =========================
-    c.execute("""
-        SELECT id, user_id
-        FROM posts
-        ORDER BY id DESC
-    """)
-
-    posts_raw = c.fetchall()
-
-    for p in posts_raw:
-
-        c.execute("""
-            SELECT image_path
-            FROM post_images
-            WHERE post_id=?
-            LIMIT 1
-        """, (p["id"],))
-
-        img = c.fetchone()
-
-        if img:
-            explore_items.append({
-                "type": "post",
-                "id": p["id"],
-                "media": img["image_path"]
-            })
-
-    # =========================
-    # REELS
-    # =========================
-    c.execute("""
-        SELECT id, video_path
-        FROM reels
-        ORDER BY id DESC
-    """)
-
-    reels = c.fetchall()
-
-    for r in reels:
-
-        explore_items.append({
-            "type": "reel",
-            "id": r["id"],
-            "media": "/static/uploads/reels/" + r["video_path"]
-        })
-
-    conn.close()
-
-    # MIX ORDER
-    explore_items = sorted(
-        explore_items,
-        key=lambda x: x["id"],
-        reverse=True
-    )
+    # tiles / users strip sab viewers ke liye same -> memory cache
+    explore_items, next_offset, _ = explore_grid.page()
+    users = explore_grid.users()
 
     # =========================
     # CURRENT USER PHOTO
     # =========================
     current_user = session.get("user_id")
+    current_user_photo = "/static/default_dp.png"
 
-    jpg = f"static/profile/user_{current_user}.jpg"
-    png = f"static/profile/user_{current_user}.png"
-    jpeg = f"static/profile/user_{current_user}.jpeg"
-
-    if os.path.exists(jpg):
-        current_user_photo = "/" + jpg
+    if current_user:
+        conn = db.connect()
+        c = conn.cursor()
+        c.execute("SELECT photo FROM users WHERE id=?", (current_user,))
+        row = c.fetchone()
+        conn.close()
 
-    elif os.path.exists(png):
-        current_user_photo = "/" + png
-
-    elif os.path.exists(jpeg):
-        current_user_photo = "/" + jpeg
-
-    else:
-        current_user_photo = "/static/default_dp.png"
+        if row and row[0]:
+            current_user_photo = row[0]
 
     return render_template(
         "explore.html",
         users=users,
         explore_items=explore_items,
+        next_offset=next_offset,
         current_user=current_user,
         current_user_photo=current_user_photo
     )
 
 
+# =========================
+# EXPLORE GRID API (INFINITE SCROLL)
+# /explore/api/grid?offset=&limit=
+# =========================
+@explore_bp.route("/api/grid")
+def api_grid():
+
+    offset = request.args.get("offset", 0, type=int)
+    limit = request.args.get("limit", explore_grid.PAGE_SIZE, type=int)
+
+    tiles, next_offset, etag = explore_grid.page(offset, limit)
+
+    # grid nahi badla -> 304, body dobara nahi
+    if request.if_none_match.contains(etag):
+        rv = Response(status=304)
+    else:
+        rv = jsonify({
+            "ok": True,
+            "items": tiles,
+            "next_offset": next_offset
+        })
+
+    rv.set_etag(etag)
+    rv.headers["Cache-Control"] = "private, no-cache"
+    return rv
+
+
 # =========================
 # SEARCH PAGE
 # =========================
@@ -120,21 +77,12 @@ def explore_search():
 
     q = request.args.get("q", "").strip()
 
-    conn = sqlite3.connect("database.db")
+    conn = db.connect()
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
 
-    users = []
-
-    if q:
-        c.execute("""
-            SELECT id, username, photo
-            FROM users
-            WHERE username LIKE ?
-            ORDER BY username ASC
-        """, (f"%{q}%",))
-
-        users = c.fetchall()
+    # FTS5 prefix match + bm25 (routes/search.py), LIKE '%q%' scan nahi
+    users, _ = search.search_users(c, q, limit=search.MAX_LIMIT)
 
     conn.close()
 
@@ -143,3 +91,35 @@ def explore_search():
         users=users,
         query=q
     )
+
+
+# =========================
+# SEARCH API
+# /explore/api/search?q=&type=users|posts|reels|tags&offset=&limit=
+# =========================
+@explore_bp.route("/api/search")
+def api_search():
+
+    q = request.args.get("q", "").strip()
+    kind = request.args.get("type", "users")
+
+    if kind not in search.TYPES:
+        return jsonify({"ok": False, "error": "invalid type"}), 400
+
+    offset = request.args.get("offset", 0, type=int)
+    limit = request.args.get("limit", search.DEFAULT_LIMIT, type=int)
+
+    conn = db.connect()
+    c = conn.cursor()
+
+    results, next_offset = search.search(c, q, kind, limit, offset)
+
+    conn.close()
+
+    return jsonify({
+        "ok": True,
+        "q": q,
+        "type": kind,
+        "results": results,
+        "next_offset": next_offset
+    })
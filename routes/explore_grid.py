@@ -0,0 +1,185 @@
+# ===============================
+# 🧭 EXPLORE GRID CACHE
+# ===============================
+# Pehle har /explore hit: saare users + saare posts (LIMIT nahi), har
+# post pe alag `post_images ... LIMIT 1` query, saare reels, Python sort,
+# aur viewer ke avatar ke liye 3 os.path.exists. Data sab viewers ke
+# liye same hai, phir bhi har request dobara.
+#
+# Ab process memory me ready-to-render tiles (naye pehle):
+#   {"type": "post", "id", "media", "src", "srcset"}
+#   {"type": "reel", "id", "media"}
+#
+# Publish / delete hooks (add_post, add_reel, remove) list ko seedha
+# badalte hain; dusre workers ke changes REFRESH_INTERVAL pe reload se.
+# ETag slice ke content (type, id) se banta hai, process / reload se nahi:
+# jis bhi worker pe jaaye, same slice -> same ETag -> client 304.
+#
+#   /explore/api/grid?offset=&limit=   (If-None-Match -> 304)
+
+import hashlib
+import threading
+import time
+
+import db
+from routes import images
+
+GRID_SIZE = 1000             # memory me itne recent tiles (posts + reels)
+USERS_SIZE = 50              # upar ki users strip
+PAGE_SIZE = 30
+MAX_PAGE_SIZE = 60
+REFRESH_INTERVAL = 30        # seconds, dusre processes ke publish / delete
+
+_lock = threading.Lock()
+
+_tiles = []                  # id DESC (purana explore jaisa mix order)
+_users = []
+_version = 0
+_loaded_at = 0
+
+
+# -------------------------
+# TILES
+# -------------------------
+def post_tile(post_id, media):
+    return {
+        "type": "post",
+        "id": post_id,
+        "media": media,
+        "src": images.img_url(media, "medium"),
+        "srcset": images.srcset(media),
+    }
+
+
+def reel_tile(reel_id, video_path):
+    return {
+        "type": "reel",
+        "id": reel_id,
+        "media": "/static/uploads/" + video_path,
+    }
+
+
+# -------------------------
+# LOAD (startup / refresh)
+# -------------------------
+def load():
+    global _tiles, _users, _version, _loaded_at
+
+    conn = db.connect()
+    c = conn.cursor()
+
+    # pehli image ek hi query me (idx_post_images_post), bina image ke post skip
+    c.execute("""
+        SELECT id, (SELECT image_path FROM post_images
+                    WHERE post_id=posts.id ORDER BY id LIMIT 1) AS media
+        FROM posts
+        ORDER BY id DESC
+        LIMIT ?
+    """, (GRID_SIZE,))
+    tiles = [post_tile(pid, media) for pid, media in c.fetchall() if media]
+
+    c.execute("SELECT id, video_path FROM reels ORDER BY id DESC LIMIT ?", (GRID_SIZE,))
+    tiles += [reel_tile(rid, path) for rid, path in c.fetchall() if path]
+
+    c.execute("SELECT id, username, photo FROM users ORDER BY id DESC LIMIT ?", (USERS_SIZE,))
+    users = [{"id": r[0], "username": r[1], "photo": r[2]} for r in c.fetchall()]
+
+    conn.close()
+
+    tiles.sort(key=lambda t: t["id"], reverse=True)
+
+    with _lock:
+        _tiles = tiles[:GRID_SIZE]
+        _users = users
+        _version += 1
+        _loaded_at = time.time()
+
+    return len(_tiles)
+
+
+def _ensure():
+    if time.time() - _loaded_at > REFRESH_INTERVAL:
+        load()
+
+
+# -------------------------
+# HOOKS (commit ke baad call karo)
+# -------------------------
+def _insert(tile):
+    global _version
+
+    with _lock:
+        # naya item lagbhag hamesha sabse upar
+        i = 0
+        while i < len(_tiles) and _tiles[i]["id"] > tile["id"]:
+            i += 1
+        _tiles.insert(i, tile)
+        del _tiles[GRID_SIZE:]
+        _version += 1
+
+
+def add_post(post_id, media):
+    if media:
+        _insert(post_tile(post_id, media))
+
+
+def add_reel(reel_id, video_path):
+    if video_path:
+        _insert(reel_tile(reel_id, video_path))
+
+
+def remove(kind, item_id):
+    global _version
+
+    with _lock:
+        before = len(_tiles)
+        _tiles[:] = [t for t in _tiles if not (t["type"] == kind and t["id"] == item_id)]
+        if len(_tiles) != before:
+            _version += 1
+
+
+def touch_users():
+    """Avatar / username badla: users strip agle read pe reload."""
+    global _loaded_at
+    _loaded_at = 0
+
+
+# -------------------------
+# READ
+# -------------------------
+def page(offset=0, limit=PAGE_SIZE):
+    """(tiles, next_offset, etag)"""
+    _ensure()
+
+    offset = max(0, int(offset or 0))
+    limit = max(1, min(int(limit or PAGE_SIZE), MAX_PAGE_SIZE))
+
+    with _lock:
+        tiles = _tiles[offset:offset + limit]
+        more = len(_tiles) > offset + limit
+
+    return tiles, (offset + limit if more else None), etag_for(tiles, offset, limit, more)
+
+
+def etag_for(tiles, offset, limit, more):
+    """Sirf content se: sab workers pe same slice ka same ETag."""
+    key = ",".join(f"{t['type']}:{t['id']}" for t in tiles)
+    raw = f"{offset}:{limit}:{int(more)}:{key}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+def users():
+    _ensure()
+    with _lock:
+        return list(_users)
+
+
+def stats():
+    with _lock:
+        return {
+            "tiles": len(_tiles),
+            "users": len(_users),
+            "version": _version,
+            "age_s": int(time.time() - _loaded_at) if _loaded_at else None,
+            "refresh_interval_s": REFRESH_INTERVAL,
+        }
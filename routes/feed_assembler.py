@@ -0,0 +1,186 @@
+# ===============================
+# 📌 FEED ASSEMBLER
+# ===============================
+# Post ids ek baar load karo, phir har relation (images, likes,
+# saves, comments) ke liye sirf EK set-based query chalao.
+# Feed size badhne par bhi query count constant rehta hai.
+
+DEFAULT_DP = "/static/default_dp.png"
+
+# feed card pe kitne comments preview me aayenge
+COMMENT_PREVIEW = 3
+
+# SQLite bound-parameter limit se neeche rehne ke liye
+CHUNK_SIZE = 500
+
+# keyset pagination (posts.id cursor, routes/timeline.py load_home_rows)
+FEED_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 50
+
+
+def _chunks(ids):
+    ids = list(ids)
+    for i in range(0, len(ids), CHUNK_SIZE):
+        yield ids[i:i + CHUNK_SIZE]
+
+
+def _marks(ids):
+    return ",".join("?" * len(ids))
+
+
+# -------------------------
+# IMAGES  {post_id: [path, ...]}
+# -------------------------
+def load_images(c, post_ids):
+    images = {pid: [] for pid in post_ids}
+
+    for chunk in _chunks(post_ids):
+        c.execute(f"""
+            SELECT post_id, image_path
+            FROM post_images
+            WHERE post_id IN ({_marks(chunk)})
+            ORDER BY post_id, id
+        """, chunk)
+
+        for post_id, image_path in c.fetchall():
+            images[post_id].append(image_path)
+
+    return images
+
+
+# -------------------------
+# COUNTERS  {post_id: (likes, comments_count)}
+# posts ke denormalized columns (routes/post_counters.py), COUNT(*) nahi
+# -------------------------
+def load_counters(c, post_ids):
+    counts = {pid: (0, 0) for pid in post_ids}
+
+    for chunk in _chunks(post_ids):
+        c.execute(f"""
+            SELECT id, likes, comments_count
+            FROM posts
+            WHERE id IN ({_marks(chunk)})
+        """, chunk)
+
+        for post_id, likes, comments in c.fetchall():
+            counts[post_id] = (likes or 0, comments or 0)
+
+    return counts
+
+
+def load_like_counts(c, post_ids):
+    return {pid: n for pid, (n, _) in load_counters(c, post_ids).items()}
+
+
+# -------------------------
+# MY LIKES  {post_id, ...}
+# -------------------------
+def load_liked_by(c, post_ids, user_id):
+    liked = set()
+
+    if not user_id:
+        return liked
+
+    for chunk in _chunks(post_ids):
+        c.execute(f"""
+            SELECT DISTINCT post_id
+            FROM likes
+            WHERE username=? AND post_id IN ({_marks(chunk)})
+        """, [user_id] + chunk)
+
+        liked.update(r[0] for r in c.fetchall())
+
+    return liked
+
+
+# -------------------------
+# MY SAVES  {post_id, ...}
+# -------------------------
+def load_saved_by(c, post_ids, user_id):
+    saved = set()
+
+    if not user_id:
+        return saved
+
+    for chunk in _chunks(post_ids):
+        c.execute(f"""
+            SELECT post_id
+            FROM post_saves
+            WHERE user_id=? AND post_id IN ({_marks(chunk)})
+        """, [user_id] + chunk)
+
+        saved.update(r[0] for r in c.fetchall())
+
+    return saved
+
+
+# -------------------------
+# COMMENTS  {post_id: [comment, ...]}
+# limit=None -> saare comments, warna har post ke latest N
+# -------------------------
+def load_comments(c, post_ids, limit=None, newest_first=False):
+    comments = {pid: [] for pid in post_ids}
+    order = "DESC" if newest_first else "ASC"
+
+    for chunk in _chunks(post_ids):
+        c.execute(f"""
+            SELECT post_id, id, user_id, username, comment
+            FROM (
+                SELECT comments.post_id, comments.id, comments.user_id,
+                       users.username, comments.comment,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY comments.post_id
+                           ORDER BY comments.id DESC
+                       ) AS rn
+                FROM comments
+                JOIN users ON comments.user_id = users.id
+                WHERE comments.post_id IN ({_marks(chunk)})
+            )
+            WHERE ? IS NULL OR rn <= ?
+            ORDER BY post_id, id {order}
+        """, chunk + [limit, limit])
+
+        for post_id, cid, uid, username, text in c.fetchall():
+            comments[post_id].append({
+                "id": cid,
+                "user_id": uid,
+                "username": username,
+                "comment": text
+            })
+
+    return comments
+
+
+# -------------------------
+# POST ROWS -> TEMPLATE DICTS
+# rows: (id, owner_id, username, photo, caption)
+# -------------------------
+def assemble_posts(c, rows, current_user, comment_limit=COMMENT_PREVIEW):
+    post_ids = [r[0] for r in rows]
+
+    if not post_ids:
+        return []
+
+    images = load_images(c, post_ids)
+    counts = load_counters(c, post_ids)
+    liked = load_liked_by(c, post_ids, current_user)
+    saved = load_saved_by(c, post_ids, current_user)
+    comments = load_comments(c, post_ids, limit=comment_limit)
+
+    posts = []
+    for post_id, owner_id, username, user_photo, caption in rows:
+        posts.append({
+            "id": post_id,
+            "owner_id": owner_id,
+            "username": username,
+            "photo": user_photo if user_photo else DEFAULT_DP,
+            "caption": caption,
+            "images": images[post_id],
+            "likes": counts[post_id][0],
+            "comments_count": counts[post_id][1],
+            "liked_by_me": post_id in liked,
+            "saved_by_me": post_id in saved,
+            "comments": comments[post_id]
+        })
+
+    return posts
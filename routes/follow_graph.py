@@ -0,0 +1,264 @@
+# ===============================
+# 🕸️ FOLLOW GRAPH + SUGGESTIONS (CSR)
+# ===============================
+# Pehle social.suggestions:
+#   users WHERE id NOT IN (...) ORDER BY RANDOM() LIMIT 10
+# -> har call pe poori table scan + sort, aur result random.
+#
+# Ab follows table memory me CSR (compressed sparse row) form me:
+#   _ids      dense index -> user_id
+#   _out_off  array: node i ki following list _out[_out_off[i]:_out_off[i+1]]
+#   _out      array: following (dense index), sorted
+#   _in_off / _in   wahi, followers ke liye (follow back + popular)
+#
+# Suggestion = friends-of-friends: jinhe mere following follow karte hain,
+# mutual count (kitne mere following unhe follow karte hain) se rank.
+# Mujhe follow karne wale (follow back) ko bhi bonus.
+#
+# Follow / unfollow hook (on_follow) CSR ko nahi chhedta, chhote delta
+# overlay me likhta hai; DELTA_LIMIT paar -> rebuild. Per-user top-N
+# cache follower aur followee dono ka hatta hai; dusre workers ke changes
+# REFRESH_INTERVAL pe rebuild se aate hain.
+#
+# Rebuild (poora follows scan) request path pe nahi: _ensure background
+# task chalata hai (sweeper jaisa), ek waqt me ek hi; tab tak requests
+# purane CSR + delta se jawab dete hain.
+
+import heapq
+import threading
+import time
+from array import array
+from collections import Counter
+
+import db
+from socketio_init import socketio
+
+TOP_N = 20                   # per user cache me itne candidates
+DEFAULT_LIMIT = 10
+CACHE_TTL = 10 * 60          # friends ke naye follows bhi dheere aa jayein
+REFRESH_INTERVAL = 5 * 60    # dusre processes ke follows
+DELTA_LIMIT = 5000           # itne overlay edges -> CSR rebuild
+FOLLOW_BACK_BONUS = 2
+
+_lock = threading.Lock()
+
+_ids = array("q")            # dense -> user_id
+_index = {}                  # user_id -> dense
+_out_off = array("q", [0])
+_out = array("q")
+_in_off = array("q", [0])
+_in = array("q")
+_popular = []                # user_ids, followers count DESC
+
+# CSR ke baad ke follow / unfollow: (direction, user_id) -> {user_id}
+_added = {}
+_removed = {}
+_delta = 0
+
+_cache = {}                  # user_id -> (cached_at, [(user_id, mutuals, follows_me), ...])
+_built_at = 0
+_rebuilding = False          # single-flight: background rebuild chal raha hai
+
+metrics = {
+    "builds": 0,
+    "build_errors": 0,
+    "cache_hits": 0,
+    "cache_misses": 0,
+}
+
+
+# -------------------------
+# BUILD (follows -> CSR)
+# -------------------------
+def _csr(n, edges):
+    """[(src, dst), ...] dense -> (offsets, targets), har src ke targets sorted."""
+    off = array("q", [0]) * (n + 1)
+    targets = array("q", [0]) * len(edges)
+
+    for a, _ in edges:
+        off[a + 1] += 1
+    for i in range(n):
+        off[i + 1] += off[i]
+
+    fill = array("q", off[:n])
+    for a, b in sorted(edges):
+        targets[fill[a]] = b
+        fill[a] += 1
+
+    return off, targets
+
+
+def build():
+    global _ids, _index, _out_off, _out, _in_off, _in, _popular
+    global _added, _removed, _delta, _cache, _built_at
+
+    conn = db.connect()
+    c = conn.cursor()
+
+    c.execute("SELECT id FROM users ORDER BY id")
+    ids = array("q", (r[0] for r in c.fetchall()))
+    index = {uid: i for i, uid in enumerate(ids)}
+
+    c.execute("SELECT follower_id, following_id FROM follows")
+    edges = [(index[a], index[b]) for a, b in c.fetchall()
+             if a in index and b in index and a != b]
+
+    conn.close()
+
+    n = len(ids)
+    out_off, out = _csr(n, edges)
+    in_off, in_ = _csr(n, [(b, a) for a, b in edges])
+
+    def in_deg(i):
+        return in_off[i + 1] - in_off[i]
+
+    popular = [ids[i] for i in heapq.nlargest(TOP_N, range(n), key=in_deg) if in_deg(i) > 0]
+
+    with _lock:
+        _ids, _index = ids, index
+        _out_off, _out, _in_off, _in = out_off, out, in_off, in_
+        _popular = popular
+        _added, _removed, _delta = {}, {}, 0
+        _cache = {}
+        _built_at = time.time()
+        metrics["builds"] += 1
+
+    return n, len(edges)
+
+
+def _rebuild():
+    global _rebuilding
+
+    try:
+        build()
+    except Exception as e:
+        metrics["build_errors"] += 1
+        print("FOLLOW GRAPH BUILD ERROR:", e)
+    finally:
+        _rebuilding = False
+
+
+def _ensure():
+    global _rebuilding
+
+    if time.time() - _built_at <= REFRESH_INTERVAL and _delta <= DELTA_LIMIT:
+        return
+
+    with _lock:
+        if _rebuilding:
+            return
+        _rebuilding = True
+
+    # server abhi init nahi (CLI / startup) -> yahin build
+    if socketio.server is None:
+        _rebuild()
+    else:
+        socketio.start_background_task(_rebuild)
+
+
+# -------------------------
+# NEIGHBOURS (CSR + delta overlay)
+# -------------------------
+def _neighbours(direction, user_id):
+    off, targets = (_out_off, _out) if direction == "out" else (_in_off, _in)
+
+    base = set()
+    i = _index.get(user_id)
+    if i is not None:
+        base = {_ids[j] for j in targets[off[i]:off[i + 1]]}
+
+    key = (direction, user_id)
+    return (base - _removed.get(key, set())) | _added.get(key, set())
+
+
+def following(user_id):
+    return _neighbours("out", user_id)
+
+
+def followers(user_id):
+    return _neighbours("in", user_id)
+
+
+def _in_degree(user_id):
+    i = _index.get(user_id)
+    return _in_off[i + 1] - _in_off[i] if i is not None else 0
+
+
+# -------------------------
+# HOOK (follow / unfollow commit ke baad)
+# -------------------------
+def on_follow(follower_id, following_id, followed=True):
+    global _delta
+
+    with _lock:
+        add, remove = (_added, _removed) if followed else (_removed, _added)
+
+        for key, other in ((("out", follower_id), following_id), (("in", following_id), follower_id)):
+            remove.get(key, set()).discard(other)
+            add.setdefault(key, set()).add(other)
+
+        _delta += 1
+
+        # follower ke candidates badle; followee ka "follow back" bhi
+        _cache.pop(follower_id, None)
+        _cache.pop(following_id, None)
+
+
+# -------------------------
+# SUGGESTIONS
+# -------------------------
+def _candidates(user_id):
+    mine = following(user_id)
+    fans = followers(user_id)
+
+    mutuals = Counter()
+    for friend in mine:
+        for other in following(friend):
+            mutuals[other] += 1
+
+    # mujhe follow karte hain, main nahi -> follow back
+    pool = (mutuals.keys() | fans) - mine - {user_id}
+
+    def rank(uid):
+        score = mutuals[uid] + (FOLLOW_BACK_BONUS if uid in fans else 0)
+        return (-score, -_in_degree(uid), uid)
+
+    ranked = [(uid, mutuals[uid], uid in fans) for uid in sorted(pool, key=rank)[:TOP_N]]
+
+    # graph me koi nahi mila -> popular accounts
+    if len(ranked) < TOP_N:
+        seen = pool | mine | {user_id}
+        ranked += [(uid, 0, False) for uid in _popular if uid not in seen][:TOP_N - len(ranked)]
+
+    return ranked
+
+
+def suggest(user_id, limit=DEFAULT_LIMIT):
+    """[(user_id, mutuals, follows_me), ...] cached top-N se."""
+    _ensure()
+
+    now = time.time()
+    with _lock:
+        hit = _cache.get(user_id)
+        if hit and now - hit[0] < CACHE_TTL:
+            metrics["cache_hits"] += 1
+            return hit[1][:limit]
+
+        metrics["cache_misses"] += 1
+        ranked = _candidates(user_id)
+        _cache[user_id] = (now, ranked)
+
+    return ranked[:limit]
+
+
+def stats():
+    with _lock:
+        return {
+            **metrics,
+            "users": len(_ids),
+            "edges": len(_out),
+            "delta_edges": _delta,
+            "cached_users": len(_cache),
+            "rebuilding": _rebuilding,
+            "age_s": int(time.time() - _built_at) if _built_at else None,
+        }
@@ -0,0 +1,216 @@
+# ===============================
+# 🖼 IMAGE DERIVATIVES (thumb / medium / full)
+# ===============================
+# Grid / avatar me 4 MB original bhejne ki jagah chhote variants:
+#   /img/<size>/<path under static>     e.g. /img/thumb/uploads/posts/a.jpg
+#
+#   - pehli request pe Pillow se banta hai, phir disk cache:
+#       static/uploads/derived/<size>/<path>.webp | .jpg
+#   - Accept me image/webp ho to WebP, warna JPEG (Vary: Accept)
+#   - EXIF orientation apply, metadata strip
+#   - original badla (profile photo same naam) -> cache dobara banta hai
+#   - upload pe "image_derivatives" job cache pehle se bhar deta hai
+#   - Pillow decode / resize / encode CPU kaam hai: gevent / eventlet worker
+#     me asli OS thread pool pe (_native), warna hub ruk jaata aur us worker
+#     ke saare sockets / requests atak jaate. Pillow GIL chhod deta hai.
+#
+# Templates:  src="{{ url|img('medium') }}" srcset="{{ url|srcset }}"
+
+import os
+import uuid
+
+from flask import Blueprint, abort, request
+from PIL import Image, ImageOps
+
+import jobs
+from routes.media import STATIC_DIR, send_media
+
+images_bp = Blueprint("images", __name__)
+
+# naam -> max side (px)
+SIZES = {
+    "thumb": 240,
+    "medium": 720,
+    "full": 1440,
+}
+
+DERIVED_DIR = os.path.join(STATIC_DIR, "uploads", "derived")
+
+# sirf yahan ki files ke variants bante hain
+SOURCE_DIRS = ("uploads/", "profile/")
+SOURCE_EXT = {"jpg", "jpeg", "png", "webp"}      # gif animated hai, original hi
+
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+JOB_KIND = "image_derivatives"
+
+
+def _source_rel(url):
+    """'/static/uploads/a.jpg' -> 'uploads/a.jpg', variant na ban sake to None."""
+    if not url or not url.startswith("/static/"):
+        return None
+
+    rel = url[len("/static/"):].split("?", 1)[0]
+
+    if not rel.startswith(SOURCE_DIRS) or rel.startswith("uploads/derived/"):
+        return None
+    if ".." in rel.split("/"):
+        return None
+    if rel.rsplit(".", 1)[-1].lower() not in SOURCE_EXT:
+        return None
+
+    return rel
+
+
+# -------------------------
+# TEMPLATE FILTERS
+# -------------------------
+@images_bp.app_template_filter("img")
+def img_url(url, size="medium"):
+    rel = _source_rel(url)
+    if rel is None or size not in SIZES:
+        return url
+    return f"/img/{size}/{rel}"
+
+
+@images_bp.app_template_filter("srcset")
+def srcset(url):
+    rel = _source_rel(url)
+    if rel is None:
+        return ""
+    return ", ".join(f"/img/{name}/{rel} {px}w" for name, px in SIZES.items())
+
+
+# -------------------------
+# GENERATE
+# -------------------------
+def _derived_path(size, rel, fmt):
+    return os.path.join(DERIVED_DIR, size, rel + "." + fmt)
+
+
+def _render(src_path, size, fmt, out_path):
+    with Image.open(src_path) as im:
+        im = ImageOps.exif_transpose(im)
+        im.thumbnail((SIZES[size], SIZES[size]), Image.LANCZOS)
+
+        if fmt == "jpg":
+            if im.mode in ("RGBA", "LA", "P"):
+                im = im.convert("RGBA")
+                bg = Image.new("RGB", im.size, (255, 255, 255))
+                bg.paste(im, mask=im.split()[-1])
+                im = bg
+            elif im.mode != "RGB":
+                im = im.convert("RGB")
+        elif im.mode not in ("RGB", "RGBA"):
+            im = im.convert("RGBA" if im.mode in ("LA", "P", "PA") else "RGB")
+
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        # pid + uuid: ek process ke concurrent requests (gevent) bhi alag file
+        tmp = f"{out_path}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp"
+
+        # exif / icc pass nahi karte -> metadata strip
+        try:
+            if fmt == "webp":
+                im.save(tmp, "WEBP", quality=WEBP_QUALITY, method=4)
+            else:
+                im.save(tmp, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+        except Exception:
+            # unique naam -> adhoori file khud hatao, koi aur overwrite nahi karega
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    os.replace(tmp, out_path)
+
+
+def _native(fn, *args):
+    """CPU-bound kaam event loop ke bahar, asli thread pe (socketio_init async mode)."""
+    mode = os.environ.get("SOCKETIO_ASYNC_MODE")
+
+    if mode == "gevent":
+        import gevent
+        return gevent.get_hub().threadpool.apply(fn, args)
+
+    if mode == "eventlet":
+        from eventlet import tpool
+        return tpool.execute(fn, *args)
+
+    # threading (dev server / python jobs.py): already asli thread
+    return fn(*args)
+
+
+def ensure_variant(rel, size, fmt):
+    """Cached variant ka path (zarurat ho to abhi banao). Source na mile to None."""
+    src_path = os.path.join(STATIC_DIR, rel)
+
+    if not os.path.isfile(src_path):
+        return None
+
+    out_path = _derived_path(size, rel, fmt)
+
+    try:
+        fresh = os.stat(out_path).st_mtime >= os.stat(src_path).st_mtime
+    except OSError:
+        fresh = False
+
+    if not fresh:
+        _native(_render, src_path, size, fmt, out_path)
+
+    return out_path
+
+
+def remove_variants(url):
+    """Source gaya (blob gc) -> uske variants bhi."""
+    rel = _source_rel(url)
+    if rel is None:
+        return
+    for size in SIZES:
+        for fmt in ("webp", "jpg"):
+            try:
+                os.remove(_derived_path(size, rel, fmt))
+            except OSError:
+                pass
+
+
+def build_all(payload):
+    rel = _source_rel(payload.get("url"))
+    if rel is None:
+        return
+    for size in SIZES:
+        for fmt in ("webp", "jpg"):
+            ensure_variant(rel, size, fmt)
+
+
+def enqueue(c, url):
+    """Upload ke transaction me: variants background me pehle se bana do."""
+    if _source_rel(url) is None:
+        return None
+    return jobs.enqueue(c, JOB_KIND, {"url": url})
+
+
+jobs.register(JOB_KIND, build_all)
+
+
+# -------------------------
+# SERVE (lazy)
+# -------------------------
+@images_bp.route("/img/<size>/<path:rel>")
+def derived(size, rel):
+    if size not in SIZES or _source_rel("/static/" + rel) is None:
+        abort(404)
+
+    fmt = "webp" if "image/webp" in request.headers.get("Accept", "") else "jpg"
+
+    try:
+        path = ensure_variant(rel, size, fmt)
+    except (OSError, Image.DecompressionBombError):
+        # tooti / ajeeb file -> original hi de do
+        return send_media(STATIC_DIR, rel)
+
+    if path is None:
+        abort(404)
+
+    rv = send_media(DERIVED_DIR, os.path.relpath(path, DERIVED_DIR))
+    rv.vary.add("Accept")
+    return rv
@@ -0,0 +1,172 @@
+# ===============================
+# 📦 MEDIA SERVING (uploads / stories / editor temp)
+# ===============================
+# send_from_directory ki jagah ek hi helper:
+#   - Range / 206 (video seek), If-Range, 416
+#   - strong ETag + If-None-Match / If-Modified-Since -> 304
+#   - uuid-named (write-once) files -> immutable Cache-Control
+#   - MEDIA_OFFLOAD=nginx  -> X-Accel-Redirect (MEDIA_ACCEL_PREFIX + path)
+#     MEDIA_OFFLOAD=sendfile -> X-Sendfile (apache / lighttpd)
+#   - warna wsgi.file_wrapper: gunicorn isse os.sendfile() karta hai,
+#     range ke liye bhi (file seek + Content-Length), bytes Python se nahi guzarte
+#     (sirf sync / gthread worker; gevent / eventlet worker me file_wrapper nahi
+#     -> bounded read() copy, isliye wahan MEDIA_OFFLOAD=nginx, gunicorn.conf.py dekho)
+#
+# nginx example:
+#   location /_media/ { internal; alias /app/static/; }
+
+import mimetypes
+import os
+import re
+
+from flask import Blueprint, Response, abort, request
+from werkzeug.security import safe_join
+from werkzeug.wsgi import FileWrapper
+
+media_bp = Blueprint("media", __name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+UPLOADS_DIR = os.path.join(STATIC_DIR, "uploads")
+
+OFFLOAD = os.environ.get("MEDIA_OFFLOAD", "").lower()          # "", "nginx", "sendfile"
+ACCEL_PREFIX = os.environ.get("MEDIA_ACCEL_PREFIX", "/_media/")
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+DEFAULT_MAX_AGE = 60
+BLOCK_SIZE = 64 * 1024
+
+# create / reels upload: uuid4().hex se shuru hone wale naam kabhi overwrite nahi hote
+FINGERPRINT_RE = re.compile(r"^[0-9a-f]{32}")
+
+mimetypes.add_type("application/vnd.apple.mpegurl", ".m3u8")
+mimetypes.add_type("video/mp2t", ".ts")
+
+
+def is_fingerprinted(filename):
+    return bool(FINGERPRINT_RE.match(os.path.basename(filename)))
+
+
+class _RangeFile:
+    """File ka [start, start+length) hissa. fileno() bhi deta hai taaki
+    gunicorn sendfile kar sake; baaki servers read() se bounded copy."""
+
+    def __init__(self, f, start, length):
+        self.f = f
+        self.remaining = length
+        f.seek(start)
+
+    def fileno(self):
+        return self.f.fileno()
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.f.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.f.close()
+
+
+def _etag(st):
+    return f"{st.st_size:x}-{st.st_mtime_ns:x}"
+
+
+def send_media(root, filename, max_age=None, immutable=None):
+    # relative folder (create / stories) app root se, send_from_directory jaisa
+    if not os.path.isabs(root):
+        root = os.path.join(BASE_DIR, root)
+
+    path = safe_join(root, filename)
+
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    st = os.stat(path)
+    etag = _etag(st)
+
+    if immutable is None:
+        immutable = is_fingerprinted(filename)
+
+    mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+    headers = {
+        "ETag": f'"{etag}"',
+        "Accept-Ranges": "bytes",
+    }
+
+    rv = Response(status=200, mimetype=mimetype, headers=headers)
+    rv.last_modified = int(st.st_mtime)
+
+    if immutable:
+        rv.headers["Cache-Control"] = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    else:
+        rv.headers["Cache-Control"] = f"public, max-age={DEFAULT_MAX_AGE if max_age is None else max_age}, must-revalidate"
+
+    # ---- 304 ----
+    if request.if_none_match:
+        if request.if_none_match.contains(etag):
+            rv.status_code = 304
+            return rv
+    elif request.if_modified_since and int(st.st_mtime) <= request.if_modified_since.timestamp():
+        rv.status_code = 304
+        return rv
+
+    # ---- proxy offload (range / conditional proxy khud karega) ----
+    if OFFLOAD == "nginx":
+        rel = os.path.relpath(path, STATIC_DIR).replace(os.sep, "/")
+        rv.headers["X-Accel-Redirect"] = ACCEL_PREFIX + rel
+        return rv
+
+    if OFFLOAD == "sendfile":
+        rv.headers["X-Sendfile"] = path
+        return rv
+
+    # ---- range ----
+    size = st.st_size
+    start, length = 0, size
+
+    rng = request.range
+    if_range = request.if_range
+
+    # If-Range mismatch -> file badal gayi, poori bhejo
+    range_ok = "If-Range" not in request.headers or if_range.etag == etag
+
+    if rng and range_ok:
+        span = rng.range_for_length(size)
+
+        if span is None:
+            rv.status_code = 416
+            rv.headers["Content-Range"] = f"bytes */{size}"
+            return rv
+
+        start, stop = span
+        length = stop - start
+        rv.status_code = 206
+        rv.headers["Content-Range"] = f"bytes {start}-{stop - 1}/{size}"
+
+    rv.content_length = length
+
+    if request.method == "HEAD":
+        return rv
+
+    f = open(path, "rb")
+    body = _RangeFile(f, start, length)
+
+    wrapper = request.environ.get("wsgi.file_wrapper", FileWrapper)
+    rv.response = wrapper(body, BLOCK_SIZE)
+    rv.direct_passthrough = True
+
+    return rv
+
+
+# ===============================
+# /static/uploads/* (Flask ke static handler se pehle match hota hai)
+# ===============================
+@media_bp.route("/static/uploads/<path:filename>")
+def uploads(filename):
+    return send_media(UPLOADS_DIR, filename)
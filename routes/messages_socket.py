@@ -1,19 +1,17 @@
 active_calls = {}
-import sqlite3, os
-from flask import Blueprint, render_template, session, redirect, request, jsonify, current_app
+import db
+from flask import Blueprint, render_template, session, redirect, request, jsonify
 from flask_socketio import emit, join_room, leave_room
 from datetime import datetime, timedelta
 from threading import Timer
 from socketio_init import socketio
+from routes import chat_state
 
 messages_bp = Blueprint("messages_bp", __name__, url_prefix="/messages")
 
 # ----------------- DB -----------------
 def get_db():
-    db = os.path.join(current_app.root_path, "database.db")
-    conn = sqlite3.connect(db, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    return conn
+    return db.connect_rows()
 
 # ----------------- HELPERS -----------------
 def find_or_create_chat(a, b):
@@ -26,39 +24,12 @@ def find_or_create_chat(a, b):
         cid = r["id"]
     else:
         c.execute("INSERT INTO chats(user1,user2) VALUES(?,?)",(a,b))
-        conn.commit()
         cid = c.lastrowid
+        chat_state.open_chat(c, cid, a, b)
+        conn.commit()
     conn.close()
     return cid
 
-def remove_expired_messages_for_chat(chat_id):
-    conn = get_db()
-    c = conn.cursor()
-
-    now_str = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-
-    c.execute(
-        "SELECT id FROM messages WHERE chat_id=? AND expires_at IS NOT NULL AND expires_at<=?",
-        (chat_id, now_str)
-    )
-    rows = c.fetchall()
-
-    for r in rows:
-        mid = r["id"]
-        c.execute(
-            "UPDATE messages SET deleted=1, msg='' WHERE id=?",
-            (mid,)
-        )
-        socketio.emit(
-            "message_deleted",
-            {"chat_id": chat_id, "message_id": mid},
-            room=f"chat_{chat_id}"
-        )
-
-    conn.commit()
-    conn.close()
-
-
 def user_is_ghost(user_id):
     conn = get_db(); c = conn.cursor()
     c.execute("SELECT ghost_mode FROM users WHERE id=?", (user_id,))
@@ -89,6 +60,61 @@ def typing_stop(chat_id, user_id):
 def is_ghost(user_id):
     return user_is_ghost(user_id)
 
+def is_participant(chat_id, user_id):
+    conn = get_db(); c = conn.cursor()
+    c.execute("SELECT 1 FROM chats WHERE id=? AND (user1=? OR user2=?)", (chat_id, user_id, user_id))
+    r = c.fetchone(); conn.close()
+    return r is not None
+
+# ----------------- HISTORY (cursor pages) -----------------
+CHAT_PAGE_SIZE = 50
+MAX_CHAT_PAGE = 200
+
+def load_history(c, chat_id, me, before_id=None, limit=CHAT_PAGE_SIZE):
+    """Last `limit` messages (before_id se pehle), oldest pehle. (msgs, has_more)"""
+    # expired messages yahan filter; tombstone + emit sweeper.py karta hai
+    # idx_messages_chat_id (chat_id, id) se ulta walk, sirf limit+1 rows
+    c.execute("""
+SELECT
+    m.id,
+    m.sender_id,
+    m.msg,
+    m.edited,
+    m.deleted,
+    m.created_at,
+    m.view_once,
+    m.expires_at,
+    m.attachment,
+    CASE
+        WHEN m.sender_id = ?
+         AND EXISTS (
+            SELECT 1
+            FROM message_receipts r
+            WHERE r.message_id = m.id
+              AND r.user_id <> m.sender_id
+         )
+        THEN 1
+        ELSE 0
+    END AS seen
+FROM messages m
+WHERE m.chat_id=?
+AND m.id < ?
+AND m.deleted=0
+AND (m.expires_at IS NULL OR m.expires_at > ?)
+AND NOT EXISTS (
+    SELECT 1 FROM message_hidden h
+    WHERE h.message_id = m.id AND h.user_id = ?
+)
+ORDER BY m.id DESC
+LIMIT ?
+""", (me, chat_id, before_id or 2**62,
+      datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"), me, limit + 1))
+
+    rows = [dict(x) for x in c.fetchall()]
+    has_more = len(rows) > limit
+
+    return rows[:limit][::-1], has_more
+
 # ----------------- ROUTES -----------------
 @messages_bp.route("/")
 def inbox():
@@ -96,23 +122,7 @@ def inbox():
         return redirect("/auth/login")
     me = session["user_id"]
     conn = get_db(); c = conn.cursor()
-    c.execute("""
-        SELECT ch.id AS chat_id,
-               CASE WHEN ch.user1=? THEN ch.user2 ELSE ch.user1 END AS other_id,
-               u.username, u.photo,
-               m.msg AS last_msg, m.created_at AS last_time,
-               (SELECT COUNT(*) FROM messages ms
-                 LEFT JOIN message_receipts mr ON mr.message_id=ms.id AND mr.user_id=?
-                 WHERE ms.chat_id=ch.id AND mr.id IS NULL AND ms.sender_id!=?
-               ) AS unread_count
-        FROM chats ch
-        LEFT JOIN users u ON u.id = CASE WHEN ch.user1=? THEN ch.user2 ELSE ch.user1 END
-        LEFT JOIN messages m ON m.chat_id=ch.id AND m.id = (SELECT id FROM messages WHERE chat_id=ch.id ORDER BY id DESC LIMIT 1)
-        WHERE ch.user1=? OR ch.user2=?
-        GROUP BY ch.id
-        ORDER BY last_time DESC
-    """, (me, me, me, me, me, me))
-    rows = c.fetchall(); conn.close()
+    rows = chat_state.inbox_rows(c, me); conn.close()
     inbox = []
     for r in rows:
         inbox.append({
@@ -182,42 +192,7 @@ def chat_page(other_id):
         "photo": u["photo"] or "/static/profile/default_dp.png"
     }
 
-    remove_expired_messages_for_chat(chat_id)
-
-    c.execute("""
-SELECT
-    m.id,
-    m.sender_id,
-    m.msg,
-    m.edited,
-    m.deleted,
-    m.created_at,
-    m.view_once,
-    m.expires_at,
-    m.attachment,
-    CASE
-        WHEN m.sender_id = ?
-         AND EXISTS (
-            SELECT 1
-            FROM message_receipts r
-            WHERE r.message_id = m.id
-              AND r.user_id <> m.sender_id
-         )
-        THEN 1
-        ELSE 0
-    END AS seen
-FROM messages m
-WHERE m.chat_id=?
-AND m.deleted=0
-AND (
-    m.deleted_for IS NULL
-    OR m.deleted_for=''
-    OR instr(','||m.deleted_for||',', ','||?||',') = 0
-)
-ORDER BY m.id ASC
-""", (me, chat_id, str(me)))
-
-    msgs = [dict(x) for x in c.fetchall()]
+    msgs, has_more = load_history(c, chat_id, me)
     conn.close()
 
     return render_template(
@@ -225,7 +200,8 @@ ORDER BY m.id ASC
         me=me,
         other=other,
         chat_id=chat_id,
-        messages=msgs
+        messages=msgs,
+        has_more=has_more
     )
 # ----------------- SOCKET EVENTS -----------------
 @socketio.on("connect")
@@ -256,8 +232,6 @@ def join_chat(data):
     room = f"chat_{chat_id}"
     join_room(room)
 
-    remove_expired_messages_for_chat(chat_id)
-
     if not is_ghost(me):
         conn = get_db(); c = conn.cursor()
         c.execute("""
@@ -267,6 +241,7 @@ def join_chat(data):
                 SELECT message_id FROM message_receipts WHERE user_id=?
             )
         """, (me, chat_id, me, me))
+        chat_state.mark_read(c, chat_id, me)
         conn.commit(); conn.close()
 
         print("EMITTING messages_seen")
@@ -295,6 +270,32 @@ def typing_event(data):
     timer = Timer(3.5, typing_stop, args=[chat_id, me])
     typing_timers[key] = timer; timer.start()
 
+#--------------------------- load older -----------------------#
+@socketio.on("load_older")
+def load_older(data):
+    me = session.get("user_id")
+    chat_id = data.get("chat_id")
+
+    try:
+        before_id = int(data.get("before_id"))
+        limit = min(int(data.get("limit") or CHAT_PAGE_SIZE), MAX_CHAT_PAGE)
+    except (TypeError, ValueError):
+        return
+
+    if not me or not chat_id or not is_participant(chat_id, me):
+        return
+
+    conn = get_db()
+    c = conn.cursor()
+    msgs, has_more = load_history(c, chat_id, me, before_id, limit)
+    conn.close()
+
+    emit("older_messages", {
+        "chat_id": chat_id,
+        "messages": msgs,
+        "has_more": has_more
+    })
+
 #--------------------------- send -----------------------#
 @socketio.on("send_message")
 def send_message(data):
@@ -309,6 +310,13 @@ def send_message(data):
     if not me or not chat_id or (not text and not attachment):
         return
 
+    deliver_message(chat_id, me, text, attachment)
+
+
+def deliver_message(chat_id, sender_id, text, attachment=None):
+    """Insert + inbox summary + new_message emit. Socket handler aur HTTP
+    routes (posts.share_to_user) dono yahi use karte hain; message queue ke
+    saath emit kisi bhi worker ke chat room tak pahunchta hai."""
     conn = get_db()
     c = conn.cursor()
 
@@ -316,9 +324,8 @@ def send_message(data):
         INSERT INTO messages
         (chat_id, sender_id, msg, attachment, created_at)
         VALUES (?, ?, ?, ?, datetime('now'))
-    """, (chat_id, me, text, attachment))
+    """, (chat_id, sender_id, text, attachment))
 
-    conn.commit()
     mid = c.lastrowid
 
     c.execute("""
@@ -326,6 +333,11 @@ def send_message(data):
         FROM messages WHERE id=?
     """, (mid,))
     r = c.fetchone()
+
+    # message + inbox summary ek saath commit
+    chat_state.record_message(c, chat_id, sender_id, mid, r["msg"], r["created_at"])
+
+    conn.commit()
     conn.close()
 
     m = {
@@ -344,6 +356,8 @@ def send_message(data):
         room=f"chat_{chat_id}"
     )
 
+    return m
+
 #--------------------------- seen -----------------------#
 @socketio.on("seen")
 def seen_messages(data):
@@ -370,6 +384,8 @@ def seen_messages(data):
           AND r.id IS NULL
     """, (me, me, chat_id, me))
 
+    chat_state.mark_read(c, chat_id, me)
+
     conn.commit()
     conn.close()
 
@@ -386,11 +402,12 @@ def view_once(data):
     me=session.get("user_id"); mid=data.get("message_id"); chat_id=data.get("chat_id")
     if not me or not mid: return
     conn=get_db(); c=conn.cursor()
-    c.execute("SELECT view_once FROM messages WHERE id=?", (mid,))
+    c.execute("SELECT view_once, chat_id FROM messages WHERE id=?", (mid,))
     r=c.fetchone()
     if not r or r["view_once"]!=1: conn.close(); return
     c.execute("INSERT INTO message_receipts(message_id,user_id,seen_at,view_once_seen) VALUES(?,?,datetime('now'),1)", (mid, me))
     c.execute("UPDATE messages SET deleted=1, msg='' WHERE id=?", (mid,))
+    chat_state.refresh(c, [r["chat_id"]])
     conn.commit(); conn.close()
     socketio.emit("view_once_viewed", {"chat_id": chat_id, "message_id": mid, "user_id": me}, room=f"chat_{chat_id}")
     socketio.emit("message_deleted", {"chat_id": chat_id, "message_id": mid}, room=f"chat_{chat_id}")
@@ -402,10 +419,11 @@ def edit_message(data):
     me=session.get("user_id"); mid=data.get("message_id"); new_text=(data.get("new_text") or "").strip(); chat_id=data.get("chat_id")
     if not new_text: emit("error", {"error":"empty"}); return
     conn=get_db(); c=conn.cursor()
-    c.execute("SELECT sender_id FROM messages WHERE id=?", (mid,))
+    c.execute("SELECT sender_id, chat_id FROM messages WHERE id=?", (mid,))
     r=c.fetchone();
     if not r or r["sender_id"]!=me: conn.close(); return
     c.execute("UPDATE messages SET msg=?, edited=1 WHERE id=?", (new_text, mid))
+    chat_state.update_preview(c, r["chat_id"], mid, new_text)
     conn.commit()
     c.execute("SELECT * FROM messages WHERE id=?", (mid,))
     m=dict(c.fetchone()); conn.close()
@@ -415,10 +433,11 @@ def edit_message(data):
 @socketio.on("message_delete")
 def delete_message(data):
     me=session.get("user_id"); mid=data.get("message_id"); chat_id=data.get("chat_id")
-    conn=get_db(); c=conn.cursor(); c.execute("SELECT sender_id FROM messages WHERE id=?", (mid,))
+    conn=get_db(); c=conn.cursor(); c.execute("SELECT sender_id, chat_id FROM messages WHERE id=?", (mid,))
     r=c.fetchone()
     if not r or r["sender_id"]!=me: conn.close(); return
-    c.execute("UPDATE messages SET deleted=1, msg='' WHERE id=?", (mid,)); conn.commit(); conn.close()
+    c.execute("UPDATE messages SET deleted=1, msg='' WHERE id=?", (mid,))
+    chat_state.refresh(c, [r["chat_id"]]); conn.commit(); conn.close()
     socketio.emit("message_deleted", {"chat_id": chat_id, "message_id": mid}, room=f"chat_{chat_id}")
 
 #############delet for me ##################
@@ -428,12 +447,15 @@ def delete_for_me(data):
     mid = data.get("message_id")
     chat_id = data.get("chat_id")
 
+    if not me or not mid:
+        return
+
     conn = get_db()
     c = conn.cursor()
 
     c.execute(
-        "UPDATE messages SET deleted_for = COALESCE(deleted_for,'') || ? WHERE id=?",
-        (f"{me},", mid)
+        "INSERT OR IGNORE INTO message_hidden (message_id, user_id) VALUES (?, ?)",
+        (mid, me)
     )
 
     conn.commit()
@@ -0,0 +1,144 @@
+# ===============================
+# ❤️ POST COUNTERS (posts.likes / posts.comments_count)
+# ===============================
+# Pehle har page COUNT(*) FROM likes chalata tha aur posts.likes column
+# koi update nahi karta tha. Ab likes / comments ke insert / delete ke
+# SAME transaction me counter bhi badalta hai, reads seedha column se.
+#
+# Teeno like endpoints (posts.like, posts.like_toggle, social.like_post)
+# toggle_like() use karte hain. likes table me purani rows kabhi sirf
+# username (= user id) me, kabhi user_id me hain -> dono se match.
+#
+# Drift (purana code, manual DB edit, crash) reconcile() theek karta hai;
+# sweeper har RECONCILE_INTERVAL chalata hai.
+#
+#   python -m routes.post_counters      # abhi poora reconcile
+
+import time
+
+import db
+from routes import trending
+
+RECONCILE_INTERVAL = 15 * 60     # seconds
+RECONCILE_WINDOW = 1000          # ek transaction me itne posts check
+
+_last_reconcile = 0
+
+
+# -------------------------
+# LIKES
+# -------------------------
+def toggle_like(c, post_id, user_id):
+    """(liked, count) — caller commit karega."""
+    c.execute("""
+        SELECT id FROM likes
+        WHERE post_id=? AND (user_id=? OR username=?)
+    """, (post_id, user_id, user_id))
+    rows = c.fetchall()
+
+    if rows:
+        # purane duplicate rows bhi saath me
+        c.executemany("DELETE FROM likes WHERE id=?", rows)
+        c.execute("UPDATE posts SET likes = MAX(likes - ?, 0) WHERE id=?", (len(rows), post_id))
+        liked = False
+    else:
+        c.execute("INSERT INTO likes (post_id, user_id, username) VALUES (?, ?, ?)",
+                  (post_id, user_id, user_id))
+        c.execute("UPDATE posts SET likes = likes + 1 WHERE id=?", (post_id,))
+        trending.bump_once(c, "post", post_id, "like", user_id)
+        liked = True
+
+    c.execute("SELECT likes FROM posts WHERE id=?", (post_id,))
+    row = c.fetchone()
+
+    return liked, row[0] if row else 0
+
+
+# -------------------------
+# COMMENTS
+# -------------------------
+def add_comment(c, post_id, user_id, text):
+    c.execute("INSERT INTO comments (post_id, user_id, comment) VALUES (?, ?, ?)",
+              (post_id, user_id, text))
+    comment_id = c.lastrowid
+
+    c.execute("UPDATE posts SET comments_count = comments_count + 1 WHERE id=?", (post_id,))
+    trending.bump(c, "post", post_id, "comment")
+    return comment_id
+
+
+def delete_comment(c, comment_id):
+    c.execute("SELECT post_id FROM comments WHERE id=?", (comment_id,))
+    row = c.fetchone()
+
+    if not row:
+        return False
+
+    c.execute("DELETE FROM comments WHERE id=?", (comment_id,))
+    c.execute("UPDATE posts SET comments_count = MAX(comments_count - 1, 0) WHERE id=?", (row[0],))
+    return True
+
+
+# -------------------------
+# RECONCILER
+# -------------------------
+def reconcile(window=RECONCILE_WINDOW):
+    """Counter != asli COUNT wale posts theek karo. (posts checked, repaired)."""
+    conn = db.connect()
+    c = conn.cursor()
+
+    checked = repaired = 0
+    after = 0
+
+    while True:
+        # read: writer block nahi hota
+        c.execute("""
+            SELECT id, likes, comments_count,
+                   (SELECT COUNT(*) FROM likes WHERE post_id=posts.id),
+                   (SELECT COUNT(*) FROM comments WHERE post_id=posts.id)
+            FROM posts
+            WHERE id > ?
+            ORDER BY id
+            LIMIT ?
+        """, (after, window))
+        rows = c.fetchall()
+
+        if not rows:
+            break
+
+        drift = [(pid,) for pid, likes, comments, lk, cm in rows
+                 if likes != lk or comments != cm]
+
+        if drift:
+            # beech me aaye like/comment ko overwrite na karein: COUNT dobara, write ke andar
+            c.executemany("""
+                UPDATE posts SET
+                    likes = (SELECT COUNT(*) FROM likes WHERE post_id=posts.id),
+                    comments_count = (SELECT COUNT(*) FROM comments WHERE post_id=posts.id)
+                WHERE id=?
+            """, drift)
+            conn.commit()
+
+        checked += len(rows)
+        repaired += len(drift)
+        after = rows[-1][0]
+
+    conn.close()
+    return checked, repaired
+
+
+def maybe_reconcile(now=None):
+    """Sweeper har run pe call karta hai; interval pe hi asli kaam."""
+    global _last_reconcile
+
+    now = now or time.time()
+    if now - _last_reconcile < RECONCILE_INTERVAL:
+        return None
+
+    _last_reconcile = now
+    return reconcile()
+
+
+if __name__ == "__main__":
+    checked, repaired = reconcile()
+    print(f"✅ checked {checked} posts, repaired {repaired}")
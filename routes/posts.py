@@ -1,7 +1,8 @@
 import os
 import sqlite3
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash
-from werkzeug.utils import secure_filename
+import db
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify
+from routes import blobs, explore_grid, images, messages_socket, post_counters, search, timeline, trending
 from datetime import datetime
 
 posts_bp = Blueprint("posts", __name__, url_prefix="/posts")
@@ -12,8 +13,16 @@ ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif"}
 # STORY IMPORTS
 from routes.stories import (
     load_stories_for_feed,
-    get_storybar_for_user,
-    cleanup_expired
+    get_storybar_for_user
+)
+from routes.feed_assembler import (
+    FEED_PAGE_SIZE,
+    assemble_posts,
+    load_images,
+    load_like_counts,
+    load_liked_by,
+    load_saved_by,
+    load_comments
 )
 
 # -------------------------
@@ -21,6 +30,33 @@ def allowed_file(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+# -------------------------
+# STORY RING FLAGS (feed + api)
+# -------------------------
+def attach_story_flags(posts, stories, current_user):
+
+    # owner ke hisaab se stories group (har post pe poori list scan nahi)
+    stories_by_owner = {}
+    for s in stories:
+        stories_by_owner.setdefault(str(s.get("user_id")), []).append(s)
+
+    for post in posts:
+        owner_stories = stories_by_owner.get(str(post["owner_id"]), [])
+
+        post["has_story"] = len(owner_stories) > 0
+
+        # True sirf tab hoga jab owner's HAR story dekh li ho
+        post["story_seen"] = (
+            len(owner_stories) > 0 and
+            all(
+                str(current_user) in [str(v) for v in s.get("viewers", [])]
+                for s in owner_stories
+            )
+        )
+
+    return posts
+
+
 # ===============================
 # 📌 FEED PAGE (UPDATED)
 # ===============================
@@ -32,7 +68,7 @@ def feed():
 
     current_user = session["user_id"]
 
-    conn = sqlite3.connect("database.db")
+    conn = db.connect()
     c = conn.cursor()
 
     c.execute(
@@ -51,7 +87,7 @@ def feed():
     # ✅ USER DP LOAD (NEW FIX)
     photo = "/static/default_dp.png"
 
-    conn2 = sqlite3.connect("database.db")
+    conn2 = db.connect()
     conn2.row_factory = sqlite3.Row
     c2 = conn2.cursor()
 
@@ -65,8 +101,6 @@ def feed():
 
 # ---- STORY SYSTEM ----
 
-    cleanup_expired()
-
     stories = load_stories_for_feed()
 
     my_story_seen = False
@@ -92,96 +126,70 @@ def feed():
 
     stories_bar = get_storybar_for_user(current_user)
 
-    # -------- POSTS LOAD ----------
-    conn = sqlite3.connect("database.db")
+    # -------- POSTS LOAD (FIRST PAGE ONLY) ----------
+    conn = db.connect()
     c = conn.cursor()
 
-    # ✅ FIXED QUERY (NOW FETCHES OWNER ID ALSO)
-    c.execute("""
-        SELECT posts.id, posts.user_id, users.username, users.photo, posts.caption
-        FROM posts
-        JOIN users ON posts.user_id = users.id
-        ORDER BY posts.id DESC
-    """)
-    rows = c.fetchall()
+    # sirf follow kiye hue + apne posts (timeline table, ek range scan)
+    rows, next_before = timeline.load_home_rows(c, current_user)
 
-    posts = []
-    for row in rows:
-        post_id, owner_id, username, user_photo, caption = row
+    # images / likes / saves / comments -> ek query per relation
+    posts = assemble_posts(c, rows, current_user)
 
-        c.execute("SELECT image_path FROM post_images WHERE post_id=?", (post_id,))
-        images = [r[0] for r in c.fetchall()]
+    conn.close()
 
-        c.execute("SELECT COUNT(*) FROM likes WHERE post_id=?", (post_id,))
-        likes = c.fetchone()[0]
+    attach_story_flags(posts, stories, current_user)
 
-        #feed post like #
-        c.execute("""
-            SELECT 1
-            FROM likes
-            WHERE post_id=? AND username=?
-        """, (post_id, current_user))
+    return render_template(
+        "feed.html",
+        posts=posts,
+        stories_bar=stories_bar,
+        current_user=current_user,
+        current_user_photo=photo,   # ✅ FIXED
+        my_story_seen=my_story_seen,
+        has_my_story=has_my_story,
+        next_before=next_before
+    )
 
-        liked_by_me = c.fetchone() is not None
 
-#post save clor change reset nahi hoga #
-        c.execute(
-            "SELECT 1 FROM post_saves WHERE post_id=? AND user_id=?",
-            (post_id, current_user)
-        )
+# ===============================
+# 📜 FEED API (INFINITE SCROLL)
+# /posts/api/feed?before=<id>&limit=N
+# ===============================
+@posts_bp.route("/api/feed")
+def api_feed():
 
-        saved_by_me = c.fetchone() is not None
+    if "user_id" not in session:
+        return jsonify({"ok": False, "error": "login required"}), 401
 
-        c.execute("""
-            SELECT users.username, comments.comment
-            FROM comments
-            JOIN users ON comments.user_id = users.id
-            WHERE comments.post_id=?
-            ORDER BY comments.id ASC
-        """, (post_id,))
-        comments = [{"username": r[0], "comment": r[1]} for r in c.fetchall()]
+    current_user = session["user_id"]
 
-        owner_stories = [
-            s for s in stories
-            if str(s.get("user_id")) == str(owner_id)
-        ]
+    before = request.args.get("before", type=int)
+    limit = request.args.get("limit", FEED_PAGE_SIZE, type=int)
 
-        print(owner_id, current_user, len(owner_stories), [s.get("viewers", []) for s in owner_stories])
-        posts.append({
-            "id": post_id,
-            "owner_id": owner_id,
-            "username": username,
-            "photo": user_photo if user_photo else "/static/default_dp.png",
-            "caption": caption,
-            "images": images,
-            "likes": likes,
-            "liked_by_me": liked_by_me,
-            "saved_by_me": saved_by_me,
-            "comments": comments,
-
-            "has_story": len(owner_stories) > 0,
-
-    # True sirf tab hoga jab owner's HAR story dekh li ho
-            "story_seen": (
-                len(owner_stories) > 0 and
-                all(
-                    str(current_user) in [str(v) for v in s.get("viewers", [])]
-                    for s in owner_stories
-                )
-            )
-        })
+    conn = db.connect()
+    c = conn.cursor()
+
+    rows, next_before = timeline.load_home_rows(c, current_user, before, limit)
+    posts = assemble_posts(c, rows, current_user)
 
     conn.close()
 
-    return render_template(
-        "feed.html",
-        posts=posts,
-        stories_bar=stories_bar,
-        current_user=current_user,
-        current_user_photo=photo,   # ✅ FIXED
-        my_story_seen=my_story_seen,
-        has_my_story=has_my_story
-    )
+    attach_story_flags(posts, load_stories_for_feed(), current_user)
+
+    # client card bhi variants use kare (post_card.html jaisa)
+    for p in posts:
+        p["photo_thumb"] = images.img_url(p["photo"], "thumb")
+        p["image_variants"] = [
+            {"src": images.img_url(i, "medium"), "srcset": images.srcset(i)}
+            for i in p["images"]
+        ]
+
+    return jsonify({
+        "ok": True,
+        "posts": posts,
+        "next_before": next_before
+    })
 
 # ===============================
 # 📌 UPLOAD POST
@@ -194,29 +202,39 @@ def upload():
     if request.method == "POST":
         caption = request.form.get("caption", "")
 
-        conn = sqlite3.connect("database.db")
+        conn = db.connect()
         c = conn.cursor()
 
         c.execute("INSERT INTO posts (user_id, caption) VALUES (?, ?)",
                   (session["user_id"], caption))
         post_id = c.lastrowid
+        search.set_tags(c, "post", post_id, caption)
+
+        cover = None
 
         if "images" in request.files:
             for img in request.files.getlist("images"):
                 if img.filename and allowed_file(img.filename):
-                    filename = secure_filename(img.filename)
-
-                    path = os.path.join(UPLOAD_FOLDER, filename)
-                    img.save(path)
-
-                    db_path = "/static/uploads/" + filename
+                    # content hash naam: "photo.jpg" ab kisi aur ki file overwrite nahi karta
+                    blob = blobs.store(img, c=c)
+                    db_path = blobs.url_for(blob)
 
                     c.execute("INSERT INTO post_images (post_id, image_path) VALUES (?, ?)",
                               (post_id, db_path))
+                    blobs.attach(c, "post", post_id, blob)
+                    cover = cover or db_path
+
+                    # thumb / medium / full variants background me
+                    images.enqueue(c, db_path)
+
+        # followers ki home timeline me (bade accounts: read pe pull)
+        timeline.fan_out(c, post_id, session["user_id"])
 
         conn.commit()
         conn.close()
 
+        explore_grid.add_post(post_id, cover)
+
         flash("Post uploaded!", "success")
         return redirect(url_for("posts.feed"))
 
@@ -234,7 +252,7 @@ def delete(post_id):
 
     uid = session["user_id"]
 
-    conn = sqlite3.connect("database.db")
+    conn = db.connect()
     c = conn.cursor()
 
     # ✅ FIXED: OWNER CHECK BY user_id NOT username
@@ -246,9 +264,14 @@ def delete(post_id):
         flash("You cannot delete others' posts!", "error")
         return redirect(url_for("posts.feed"))
 
-    # delete images from disk
+    # blob images shared ho sakti hain -> sirf reference chhodo
+    blobs.release(c, "post", [post_id])
+
+    # purani (blob se pehle ki) images disk se
     c.execute("SELECT image_path FROM post_images WHERE post_id=?", (post_id,))
     for img in c.fetchall():
+        if blobs.name_from_url(img[0]):
+            continue
         try:
             # db stores /static/uploads/file.jpg
             # convert to real file path static/uploads/file.jpg
@@ -262,10 +285,13 @@ def delete(post_id):
     c.execute("DELETE FROM likes WHERE post_id=?", (post_id,))
     c.execute("DELETE FROM comments WHERE post_id=?", (post_id,))
     c.execute("DELETE FROM posts WHERE id=?", (post_id,))
+    trending.remove(c, "post", post_id)
 
     conn.commit()
     conn.close()
 
+    explore_grid.remove("post", post_id)
+
     flash("Post deleted!", "success")
     return redirect(url_for("posts.feed"))
 
@@ -282,11 +308,10 @@ def comment(post_id):
     if not comment_text:
         return redirect(url_for("posts.feed"))
 
-    conn = sqlite3.connect("database.db")
+    conn = db.connect()
     c = conn.cursor()
 
-    c.execute("INSERT INTO comments (post_id, user_id, comment) VALUES (?, ?, ?)",
-              (post_id, session["user_id"], comment_text))
+    post_counters.add_comment(c, post_id, session["user_id"], comment_text)
 
     conn.commit()
     conn.close()
@@ -301,18 +326,10 @@ def like(post_id):
     if "user_id" not in session:
         return redirect(url_for("auth.login"))
 
-    conn = sqlite3.connect("database.db")
+    conn = db.connect()
     c = conn.cursor()
 
-    c.execute("SELECT id FROM likes WHERE post_id=? AND username=?",
-              (post_id, session["user_id"]))
-    liked = c.fetchone()
-
-    if liked:
-        c.execute("DELETE FROM likes WHERE id=?", (liked[0],))
-    else:
-        c.execute("INSERT INTO likes (post_id, username) VALUES (?, ?)",
-                  (post_id, session["user_id"]))
+    post_counters.toggle_like(c, post_id, session["user_id"])
 
     conn.commit()
     conn.close()
@@ -325,7 +342,7 @@ def like(post_id):
 @posts_bp.route("/<int:post_id>")
 def view_post(post_id):
 
-    conn = sqlite3.connect("database.db")
+    conn = db.connect()
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
 
@@ -342,42 +359,14 @@ def view_post(post_id):
         conn.close()
         return "Post not found", 404
 
-    # IMAGES
-    c.execute("SELECT image_path FROM post_images WHERE post_id=?", (post_id,))
-    images = [r["image_path"] for r in c.fetchall()]
-
-    # LIKES COUNT
-    c.execute("SELECT COUNT(*) as total FROM likes WHERE post_id=?", (post_id,))
-    likes = c.fetchone()["total"]
-
-    # CHECK CURRENT USER LIKED OR NOT
-    liked_by_me = False
-    if "user_id" in session:
-        c.execute("SELECT 1 FROM likes WHERE post_id=? AND username=?",
-                  (post_id, session["user_id"]))
-        liked_by_me = c.fetchone() is not None
-
-    # CHECK SAVED OR NOT
-    saved_by_me = False
-    if "user_id" in session:
-        c.execute("SELECT 1 FROM post_saves WHERE post_id=? AND user_id=?",
-                  (post_id, session["user_id"]))
-        saved_by_me = c.fetchone() is not None
-
-    # COMMENTS (FIXED WITH COMMENT ID + USER ID)
-    c.execute("""
-        SELECT comments.id, comments.user_id, users.username, comments.comment
-        FROM comments
-        JOIN users ON comments.user_id = users.id
-        WHERE comments.post_id=?
-        ORDER BY comments.id DESC
-    """, (post_id,))
-    comments = [{
-        "id": r["id"],
-        "user_id": r["user_id"],
-        "username": r["username"],
-        "comment": r["comment"]
-    } for r in c.fetchall()]
+    current_user = session.get("user_id")
+
+    # IMAGES / LIKES / SAVED / COMMENTS (feed assembler)
+    images = load_images(c, [post_id])[post_id]
+    likes = load_like_counts(c, [post_id])[post_id]
+    liked_by_me = post_id in load_liked_by(c, [post_id], current_user)
+    saved_by_me = post_id in load_saved_by(c, [post_id], current_user)
+    comments = load_comments(c, [post_id], newest_first=True)[post_id]
 
     conn.close()
 
@@ -389,7 +378,7 @@ def view_post(post_id):
         comments=comments,
         liked_by_me=liked_by_me,
         saved_by_me=saved_by_me,
-        current_user=session.get("user_id")
+        current_user=current_user
     )
 
 
@@ -402,19 +391,10 @@ def like_toggle(post_id):
     if "user_id" not in session:
         return redirect(url_for("auth.login"))
 
-    conn = sqlite3.connect("database.db")
+    conn = db.connect()
     c = conn.cursor()
 
-    # Check if already liked
-    c.execute("SELECT id FROM likes WHERE post_id=? AND username=?",
-              (post_id, session["user_id"]))
-    liked = c.fetchone()
-
-    if liked:
-        c.execute("DELETE FROM likes WHERE id=?", (liked[0],))
-    else:
-        c.execute("INSERT INTO likes (post_id, username) VALUES (?, ?)",
-                  (post_id, session["user_id"]))
+    post_counters.toggle_like(c, post_id, session["user_id"])
 
     conn.commit()
     conn.close()
@@ -435,11 +415,10 @@ def comment_view(post_id):
     if not comment_text:
         return redirect(f"/posts/{post_id}")
 
-    conn = sqlite3.connect("database.db")
+    conn = db.connect()
     c = conn.cursor()
 
-    c.execute("INSERT INTO comments (post_id, user_id, comment) VALUES (?, ?, ?)",
-              (post_id, session["user_id"], comment_text))
+    post_counters.add_comment(c, post_id, session["user_id"], comment_text)
 
     conn.commit()
     conn.close()
@@ -458,7 +437,7 @@ def comment_delete(comment_id, post_id):
 
     uid = session["user_id"]
 
-    conn = sqlite3.connect("database.db")
+    conn = db.connect()
     c = conn.cursor()
 
     c.execute("SELECT user_id FROM comments WHERE id=?", (comment_id,))
@@ -469,7 +448,7 @@ def comment_delete(comment_id, post_id):
         flash("You cannot delete others comment!", "error")
         return redirect(f"/posts/{post_id}")
 
-    c.execute("DELETE FROM comments WHERE id=?", (comment_id,))
+    post_counters.delete_comment(c, comment_id)
     conn.commit()
     conn.close()
 
@@ -488,7 +467,7 @@ def get_followers():
 
     uid = session["user_id"]
 
-    conn = sqlite3.connect("database.db")
+    conn = db.connect()
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
 
@@ -524,25 +503,37 @@ def share_to_user():
         return {"ok": False, "error": "login required"}
 
     from_user = session["user_id"]
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
 
-    to_user_id = data.get("to_user_id")
-    post_id = data.get("post_id")
+    try:
+        to_user_id = int(data.get("to_user_id") or 0)
+        post_id = int(data.get("post_id") or 0)
+    except (TypeError, ValueError):
+        return {"ok": False, "error": "invalid data"}
 
     if not to_user_id or not post_id:
         return {"ok": False, "error": "missing data"}
 
+    conn = db.connect()
+    c = conn.cursor()
+
+    c.execute("""
+        SELECT (SELECT 1 FROM users WHERE id=?), (SELECT 1 FROM posts WHERE id=?)
+    """, (to_user_id, post_id))
+    user_ok, post_ok = c.fetchone()
+
+    if not user_ok or not post_ok:
+        conn.close()
+        return {"ok": False, "error": "not found"}
+
     # message text (post link)
     msg = f"📌 Shared a post: /posts/{post_id}"
 
-    conn = sqlite3.connect("database.db")
-    c = conn.cursor()
+    # normal chat message: inbox summary + live new_message (kisi bhi worker pe)
+    chat_id = messages_socket.find_or_create_chat(from_user, to_user_id)
+    messages_socket.deliver_message(chat_id, from_user, msg)
 
-    # INSERT into messages table
-    c.execute("""
-        INSERT INTO messages (sender_id, receiver_id, message, timestamp, seen)
-        VALUES (?, ?, ?, datetime('now'), 0)
-    """, (from_user, to_user_id, msg))
+    trending.bump(c, "post", post_id, "share")
 
     conn.commit()
     conn.close()
@@ -561,7 +552,7 @@ def save_toggle(post_id):
 
     uid = session["user_id"]
 
-    conn = sqlite3.connect("database.db")
+    conn = db.connect()
     c = conn.cursor()
 
     c.execute("SELECT id FROM post_saves WHERE post_id=? AND user_id=?", (post_id, uid))
@@ -572,6 +563,7 @@ def save_toggle(post_id):
         action = "unsaved"
     else:
         c.execute("INSERT INTO post_saves (post_id, user_id) VALUES (?, ?)", (post_id, uid))
+        trending.bump_once(c, "post", post_id, "save", uid)
         action = "saved"
 
     conn.commit()
@@ -595,7 +587,7 @@ def comments_page(post_id):
 @posts_bp.route("/comments_api/<int:post_id>")
 def comments_api(post_id):
 
-    conn = sqlite3.connect("database.db")
+    conn = db.connect()
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
 
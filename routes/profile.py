@@ -1,11 +1,11 @@
 from flask import Blueprint, render_template, request, redirect, session
 import sqlite3, os
-from werkzeug.utils import secure_filename
+import db
+from routes import blobs, explore_grid, images, username_index
 from routes.stories import load_stories_for_feed
 
 profile_bp = Blueprint("profile_bp", __name__, url_prefix="/profile")
 
-DB_NAME = "database.db"
 UPLOAD_FOLDER = "static/profile"
 ALLOWED_EXT = {"png", "jpg", "jpeg"}
 
@@ -28,7 +28,7 @@ def my_profile():
 @profile_bp.route("/<int:user_id>")
 def profile(user_id):
 
-    conn = sqlite3.connect(DB_NAME)
+    conn = db.connect()
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
 
@@ -141,7 +141,7 @@ def profile(user_id):
         for r in reels_rows:
             reels_data.append({
                 "id": r["id"],
-                "video": "/static/uploads/reels/" + r["video_path"],
+                "video": "/static/uploads/" + r["video_path"],
                 "thumbnail": r["thumbnail"],
             })
 
@@ -193,35 +193,40 @@ def edit_profile():
     bio = request.form.get("bio", "").strip()
     photo = request.files.get("photo")
 
-    conn = sqlite3.connect(DB_NAME)
+    conn = db.connect()
     c = conn.cursor()
 
     # CHECK DUPLICATE USERNAME
-    c.execute("SELECT id FROM users WHERE username=? AND id!=?", (username, uid))
-    if c.fetchone():
+    if username_index.taken(c, username, exclude_id=uid):
         conn.close()
         return redirect(f"/profile/{uid}?error=username_taken")
 
     if photo and photo.filename and allowed_file(photo.filename):
-        ext = photo.filename.rsplit(".", 1)[1].lower()
-        filename = secure_filename(f"user_{uid}.{ext}")
-        save_path = os.path.join(UPLOAD_FOLDER, filename)
-        photo.save(save_path)
-        photo_url = "/" + save_path.replace("\\", "/")
+        # naya content = naya URL (purana avatar cache me atakta nahi)
+        blob = blobs.store(photo, c=c)
+        photo_url = blobs.url_for(blob)
         c.execute("UPDATE users SET photo=? WHERE id=?", (photo_url, uid))
 
+        blobs.release(c, "avatar", [uid])
+        blobs.attach(c, "avatar", uid, blob)
+
+        images.enqueue(c, photo_url)
+
     c.execute("UPDATE users SET username=?, bio=? WHERE id=?", (username, bio, uid))
 
     conn.commit()
     conn.close()
 
+    username_index.rename(uid, username)
+    explore_grid.touch_users()
+
     return redirect(f"/profile/{uid}")
 
 # ------------------ FOLLOWERS ------------------ #
 @profile_bp.route("/<int:user_id>/followers")
 def followers_list(user_id):
 
-    conn = sqlite3.connect(DB_NAME)
+    conn = db.connect()
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
 
@@ -248,7 +253,7 @@ def followers_list(user_id):
 @profile_bp.route("/<int:user_id>/following")
 def following_list(user_id):
 
-    conn = sqlite3.connect(DB_NAME)
+    conn = db.connect()
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
 
@@ -290,7 +295,7 @@ def saved_page():
 
     uid = session["user_id"]
 
-    conn = sqlite3.connect(DB_NAME)
+    conn = db.connect()
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
 
@@ -346,7 +351,7 @@ def full_reels():
     start = int(request.args.get("start", 0))
     current = session.get("user_id")
 
-    conn = sqlite3.connect(DB_NAME)
+    conn = db.connect()
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
 
@@ -363,7 +368,7 @@ def full_reels():
     reels = []
     for r in rows:
         reels.append({
-            "video": "/static/uploads/reels/" + r["video_path"],
+            "video": "/static/uploads/" + r["video_path"],
                 "thumbnail": r["thumbnail"],
             "caption": r["caption"] if "caption" in r.keys() else ""
         })
@@ -388,7 +393,7 @@ def toggle_private():
 
     uid = session["user_id"]
 
-    conn = sqlite3.connect(DB_NAME)
+    conn = db.connect()
     c = conn.cursor()
 
     # current value
@@ -417,7 +422,7 @@ def privacy_page():
 
     uid = session["user_id"]
 
-    conn = sqlite3.connect(DB_NAME)
+    conn = db.connect()
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
 
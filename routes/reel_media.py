@@ -0,0 +1,341 @@
+# ===============================
+# 🎞 REEL MEDIA JOBS (ffmpeg / ffprobe)
+# ===============================
+# Upload request sirf file blob store me (routes/blobs.py) rakhta hai aur job daalta hai:
+#   reel_media: reels.media_status processing -> ready / failed
+#               thumbnail / duration / width / height bharta hai,
+#               phir reel_hls job daalta hai
+#   reel_hls:   HLS ladder (240p / 480p / 720p) + master.m3u8
+#               reels.hls_status processing -> ready / failed
+#
+# ffmpeg hamesha argument list se chalta hai (shell nahi), timeout ke saath.
+
+import glob
+import json
+import os
+import shutil
+import subprocess
+import time
+import uuid
+
+import db
+import jobs
+
+FFMPEG = os.environ.get("FFMPEG_BIN", "ffmpeg")
+FFPROBE = os.environ.get("FFPROBE_BIN", "ffprobe")
+
+PROBE_TIMEOUT = 30        # seconds
+THUMB_TIMEOUT = 60
+TRANSCODE_TIMEOUT = 15 * 60   # ek rendition
+
+# reels.video_path static/uploads ke relative: "blobs/ab/cd/<sha>.mp4" ya purana "reels/x.mp4"
+MEDIA_ROOT = os.path.join("static", "uploads")
+THUMB_FOLDER = os.path.join("static", "uploads", "reels", "thumbs")
+
+HLS_FOLDER = os.path.join("static", "uploads", "reels", "hls")
+HLS_URL = "/static/uploads/reels/hls"
+
+os.makedirs(THUMB_FOLDER, exist_ok=True)
+os.makedirs(HLS_FOLDER, exist_ok=True)
+
+# (short side, video kbps, audio kbps) — source se badi rendition nahi banti.
+# Short side se: 1080x1920 portrait reel ka 720 rung = 720x1280 (height se 405x720 ho jaata)
+HLS_LADDER = [
+    (240, 400, 64),
+    (480, 1000, 96),
+    (720, 2500, 128),
+]
+HLS_SEGMENT_SECONDS = 4
+
+# poora ladder worst case + thoda buffer; jobs.requeue_stale isse pehle nahi chhedta
+HLS_LOCK_TIMEOUT = TRANSCODE_TIMEOUT * len(HLS_LADDER) + 5 * 60
+
+IMAGE_EXT = {"jpg", "jpeg", "png", "webp", "gif"}
+
+JOB_KIND = "reel_media"
+HLS_JOB_KIND = "reel_hls"
+
+
+# -------------------------
+# UPLOAD
+# -------------------------
+def video_file(video_path):
+    return os.path.join(MEDIA_ROOT, video_path)
+
+
+def is_image(filename):
+    return filename.rsplit(".", 1)[-1].lower() in IMAGE_EXT
+
+
+def enqueue(c, reel_id, filename):
+    """Reel insert ke saath hi (same transaction) job daalo."""
+    if is_image(filename):
+        # photo reel: ffmpeg ki zarurat nahi
+        c.execute("UPDATE reels SET media_status='ready' WHERE id=?", (reel_id,))
+        return None
+
+    c.execute("UPDATE reels SET media_status='processing' WHERE id=?", (reel_id,))
+    return jobs.enqueue(c, JOB_KIND, {"reel_id": reel_id})
+
+
+# -------------------------
+# FFPROBE / FFMPEG
+# -------------------------
+def probe(path):
+    """(duration, width, height) — kuch na mile to None."""
+    out = subprocess.run(
+        [FFPROBE, "-v", "error",
+         "-select_streams", "v:0",
+         "-show_entries", "stream=width,height:format=duration",
+         "-of", "json", path],
+        capture_output=True, timeout=PROBE_TIMEOUT, check=True
+    )
+    info = json.loads(out.stdout or b"{}")
+
+    stream = (info.get("streams") or [{}])[0]
+    duration = info.get("format", {}).get("duration")
+
+    return (
+        float(duration) if duration else None,
+        stream.get("width"),
+        stream.get("height")
+    )
+
+
+def make_thumbnail(path, thumb_path, duration=None):
+    # 1 second se chhoti video -> pehla frame
+    seek = "1" if not duration or duration > 1 else "0"
+
+    subprocess.run(
+        [FFMPEG, "-y", "-v", "error",
+         "-ss", seek, "-i", path,
+         "-frames:v", "1", thumb_path],
+        capture_output=True, timeout=THUMB_TIMEOUT, check=True
+    )
+
+    if not os.path.exists(thumb_path):
+        raise jobs.RetryLater("ffmpeg ne thumbnail nahi banaya")
+
+
+# -------------------------
+# JOB HANDLER
+# -------------------------
+def process_reel(payload):
+    reel_id = payload["reel_id"]
+
+    conn = db.connect()
+    c = conn.cursor()
+    c.execute("SELECT video_path, thumbnail FROM reels WHERE id=?", (reel_id,))
+    row = c.fetchone()
+    conn.close()
+
+    # reel beech me delete ho gayi
+    if not row:
+        return
+
+    video_path, thumbnail = row
+    path = video_file(video_path)
+
+    duration, width, height = probe(path)
+
+    thumb_name = thumbnail or f"{uuid.uuid4().hex}.jpg"
+    make_thumbnail(path, os.path.join(THUMB_FOLDER, thumb_name), duration)
+
+    conn = db.connect()
+    c = conn.cursor()
+    c.execute("""
+        UPDATE reels SET
+            thumbnail=?, duration=?, width=?, height=?, media_status='ready',
+            hls_status='processing'
+        WHERE id=?
+    """, (thumb_name, duration, width, height, reel_id))
+
+    # thumbnail ready -> ab transcoding (lamba kaam, alag job)
+    jobs.enqueue(c, HLS_JOB_KIND, {"reel_id": reel_id})
+
+    conn.commit()
+    conn.close()
+
+
+def mark_failed(payload):
+    conn = db.connect()
+    c = conn.cursor()
+    c.execute("UPDATE reels SET media_status='failed' WHERE id=?", (payload.get("reel_id"),))
+    conn.commit()
+    conn.close()
+
+
+# -------------------------
+# HLS LADDER
+# -------------------------
+def short_side(width, height):
+    return min(width, height) if width and height else height
+
+
+def ladder_for(width, height):
+    short = short_side(width, height)
+    rungs = [r for r in HLS_LADDER if not short or r[0] <= short]
+    # chhoti video bhi kam se kam sabse neeche wali rendition paaye
+    return rungs or HLS_LADDER[:1]
+
+
+def is_portrait(width, height):
+    return bool(width and height and width < height)
+
+
+def rendition_size(rung, width, height):
+    """Rung (short side) -> (w, h), aspect ratio same, dono even."""
+    if not width or not height:
+        return rung * 9 // 16 // 2 * 2, rung
+    long = int(round(max(width, height) * rung / min(width, height) / 2)) * 2
+    return (rung, long) if is_portrait(width, height) else (long, rung)
+
+
+def transcode_rendition(src, out_dir, rung, v_kbps, a_kbps, portrait=False):
+    name = f"{rung}p"
+
+    # short side = rung, doosri side aspect se (even)
+    scale = f"scale={rung}:-2" if portrait else f"scale=-2:{rung}"
+
+    subprocess.run(
+        [FFMPEG, "-y", "-v", "error", "-i", src,
+         "-map", "0:v:0", "-map", "0:a:0?",
+         "-vf", scale,
+         "-c:v", "libx264", "-preset", "veryfast", "-profile:v", "main",
+         "-b:v", f"{v_kbps}k", "-maxrate", f"{int(v_kbps * 1.2)}k",
+         "-bufsize", f"{v_kbps * 2}k",
+         # har segment keyframe se shuru, taaki renditions switch ho saken
+         "-g", "48", "-keyint_min", "48", "-sc_threshold", "0",
+         "-c:a", "aac", "-b:a", f"{a_kbps}k", "-ac", "2",
+         "-hls_time", str(HLS_SEGMENT_SECONDS),
+         "-hls_playlist_type", "vod",
+         "-hls_segment_filename", os.path.join(out_dir, f"{name}_%03d.ts"),
+         os.path.join(out_dir, f"{name}.m3u8")],
+        capture_output=True, timeout=TRANSCODE_TIMEOUT, check=True
+    )
+
+    return name
+
+
+def write_master(out_dir, rungs, width, height):
+    lines = ["#EXTM3U", "#EXT-X-VERSION:3"]
+
+    for rung, v_kbps, a_kbps in rungs:
+        w, h = rendition_size(rung, width, height)
+        lines.append(
+            f"#EXT-X-STREAM-INF:BANDWIDTH={(v_kbps + a_kbps) * 1000},RESOLUTION={w}x{h}"
+        )
+        lines.append(f"{rung}p.m3u8")
+
+    with open(os.path.join(out_dir, "master.m3u8"), "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def process_hls(payload):
+    reel_id = payload["reel_id"]
+
+    conn = db.connect()
+    c = conn.cursor()
+    c.execute("SELECT video_path, width, height FROM reels WHERE id=?", (reel_id,))
+    row = c.fetchone()
+    conn.close()
+
+    if not row:
+        return
+
+    video_path, width, height = row
+    src = video_file(video_path)
+
+    final_dir = os.path.join(HLS_FOLDER, str(reel_id))
+
+    # crash hue purane attempts saaf (jo abhi chal sakta hai use nahi chhedna)
+    remove_hls_tmp(reel_id, older_than=HLS_LOCK_TIMEOUT)
+
+    # har attempt ka apna tmp dir: requeue hua duplicate ek doosre ki files nahi mitata
+    tmp_dir = f"{final_dir}.{uuid.uuid4().hex[:8]}.tmp"
+    os.makedirs(tmp_dir)
+
+    rungs = ladder_for(width, height)
+    portrait = is_portrait(width, height)
+
+    try:
+        for rung, v_kbps, a_kbps in rungs:
+            transcode_rendition(src, tmp_dir, rung, v_kbps, a_kbps, portrait)
+
+        write_master(tmp_dir, rungs, width, height)
+
+        # poora ladder ready hone ke baad hi dikhe
+        shutil.rmtree(final_dir, ignore_errors=True)
+        os.replace(tmp_dir, final_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    conn = db.connect()
+    c = conn.cursor()
+    c.execute("""
+        UPDATE reels SET hls_status='ready', hls_path=?, hls_renditions=?
+        WHERE id=?
+    """, (f"{HLS_URL}/{reel_id}/master.m3u8", ",".join(str(r[0]) for r in rungs), reel_id))
+    conn.commit()
+    conn.close()
+
+
+def mark_hls_failed(payload):
+    # original file se chalta rahega
+    conn = db.connect()
+    c = conn.cursor()
+    c.execute("UPDATE reels SET hls_status='failed' WHERE id=?", (payload.get("reel_id"),))
+    conn.commit()
+    conn.close()
+
+    remove_hls_tmp(payload.get("reel_id"))
+
+
+def remove_hls_tmp(reel_id, older_than=0):
+    cutoff = time.time() - older_than
+    for path in glob.glob(os.path.join(HLS_FOLDER, f"{reel_id}.*.tmp")):
+        try:
+            if os.path.getmtime(path) <= cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+        except OSError:
+            pass
+
+
+def remove_hls(reel_id):
+    shutil.rmtree(os.path.join(HLS_FOLDER, str(reel_id)), ignore_errors=True)
+
+
+jobs.register(JOB_KIND, process_reel, on_give_up=mark_failed)
+jobs.register(HLS_JOB_KIND, process_hls, on_give_up=mark_hls_failed, lock_timeout=HLS_LOCK_TIMEOUT)
+
+
+# -------------------------
+# PURANI REELS KE LIYE LADDER
+# -------------------------
+def backfill_hls(limit=100):
+    conn = db.connect()
+    c = conn.cursor()
+
+    c.execute("""
+        SELECT id, video_path FROM reels
+        WHERE media_status='ready' AND hls_status IS NULL
+        ORDER BY id DESC
+        LIMIT ?
+    """, (limit,))
+
+    queued = 0
+    for reel_id, video_path in c.fetchall():
+        if is_image(video_path):
+            continue
+        c.execute("UPDATE reels SET hls_status='processing' WHERE id=?", (reel_id,))
+        jobs.enqueue(c, HLS_JOB_KIND, {"reel_id": reel_id})
+        queued += 1
+
+    conn.commit()
+    conn.close()
+    return queued
+
+
+if __name__ == "__main__":
+    print(f"✅ queued {backfill_hls()} reels for HLS")
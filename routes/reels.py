@@ -1,6 +1,10 @@
 import os
-import uuid
 import sqlite3
+import db
+import counters
+import migrations
+from routes import blobs, explore_grid, follow_graph, reel_media, search, timeline, trending
+from routes.reels_feed import REELS_PAGE_SIZE, MAX_REELS_PAGE, load_reel_rows, load_reel_rows_by_ids, assemble_reels
 from datetime import datetime
 from flask import Blueprint, render_template, request, session, redirect, jsonify
 
@@ -21,112 +25,16 @@ ALLOWED_VIDEO_EXT = {"mp4", "webm", "mov", "mkv"}
 # ✅ DB CONNECTION
 # ===============================
 def get_conn():
-    conn = sqlite3.connect("database.db", timeout=20)
-    conn.row_factory = sqlite3.Row
-    return conn
+    return db.connect_rows()
 
 
 # ===============================
 # ✅ DB INIT + AUTO UPGRADE
+# (saara DDL ab migrations.py me hai; app startup pe ek baar chalta hai,
+#  request handlers me call mat karo)
 # ===============================
 def init_reels_db():
-    conn = get_conn()
-    c = conn.cursor()
-
-    # reels table
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS reels (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            caption TEXT,
-            video_path TEXT,
-            likes INTEGER DEFAULT 0,
-            saves INTEGER DEFAULT 0,
-            shares INTEGER DEFAULT 0,
-            comments_count INTEGER DEFAULT 0,
-            views INTEGER DEFAULT 0,
-            created_at TEXT
-        )
-    """)
-
-    # likes table
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS reel_likes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            reel_id INTEGER,
-            user_id INTEGER,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(reel_id, user_id)
-        )
-    """)
-
-    # views table
-    c.execute("""
-    CREATE TABLE IF NOT EXISTS reel_views (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        reel_id INTEGER,
-        user_id INTEGER,
-        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-        UNIQUE(reel_id, user_id)
-    )
-    """)
-
-    # comments table
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS reel_comments (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            reel_id INTEGER,
-            user_id INTEGER,
-            comment TEXT,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    # =========================
-# FOLLOW SYSTEM TABLE
-# =========================
-    c.execute("""
-    CREATE TABLE IF NOT EXISTS follows (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        follower_id INTEGER,
-        following_id INTEGER,
-        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-        UNIQUE(follower_id, following_id)
-    )
-    """)   
-    # saves table
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS reel_saves (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            reel_id INTEGER,
-            user_id INTEGER,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(reel_id, user_id)
-        )
-    """)
-
-    conn.commit()
-
-    # ===============================
-    # AUTO ADD MISSING COLUMNS (SAFE)
-    # ===============================
-    c.execute("PRAGMA table_info(reels)")
-    cols = [r["name"] for r in c.fetchall()]
-
-    if "created_at" not in cols:
-        c.execute("ALTER TABLE reels ADD COLUMN created_at TEXT")
-    if "saves" not in cols:
-        c.execute("ALTER TABLE reels ADD COLUMN saves INTEGER DEFAULT 0")
-    if "shares" not in cols:
-        c.execute("ALTER TABLE reels ADD COLUMN shares INTEGER DEFAULT 0")
-    if "comments_count" not in cols:
-        c.execute("ALTER TABLE reels ADD COLUMN comments_count INTEGER DEFAULT 0")
-    if "views" not in cols:
-        c.execute("ALTER TABLE reels ADD COLUMN views INTEGER DEFAULT 0")
-    if "audio_name" not in cols:
-        c.execute("ALTER TABLE reels ADD COLUMN audio_name TEXT DEFAULT 'Original Audio'")
-
-    conn.commit()
-    conn.close()
+    migrations.ensure_schema()
 
 
 # ===============================
@@ -148,99 +56,102 @@ def get_user_id():
 # ===============================
 @reels_bp.route("/")
 def reels_page():
-    init_reels_db()
+    uid = get_user_id()
+
+    # share link /reels?open=<id> -> window usi reel se shuru
+    open_id = request.args.get("open", type=int)
+    after = open_id + 1 if open_id else None
 
     conn = get_conn()
     c = conn.cursor()
 
-    c.execute("""
-        SELECT reels.id, reels.user_id, reels.caption, reels.video_path,
-       reels.thumbnail,
-               reels.likes, reels.saves, reels.shares, reels.comments_count,reels.views,
-               reels.created_at, reels.audio_name,
-               users.username, users.photo
-        FROM reels
-        JOIN users ON reels.user_id = users.id
-        ORDER BY reels.id DESC
-    """)
-
-    reels = []
-    for r in c.fetchall():
-        created_at = r["created_at"] or ""
-
-        c.execute("""
-            SELECT 1
-            FROM reel_likes
-            WHERE reel_id=? AND user_id=?
-        """, (r["id"], get_user_id()))
+    rows, next_after = load_reel_rows(c, after)
+    reels = assemble_reels(c, rows, uid)
 
-        liked = c.fetchone() is not None
-
-        c.execute("""
-            SELECT 1
-            FROM follows
-            WHERE follower_id=? AND following_id=?
-        """, (get_user_id(), r["user_id"]))
+    c.execute("SELECT photo FROM users WHERE id=?", (uid,))
+    user = c.fetchone()
 
-        is_following = c.fetchone() is not None
+    conn.close()
 
-        c.execute("""
-            SELECT 1
-            FROM reel_saves
-            WHERE reel_id=? AND user_id=?
-        """, (r["id"], get_user_id()))
+    current_user_photo = "/static/default_dp.png"
 
-        saved = c.fetchone() is not None
+    if user and user["photo"]:
+        current_user_photo = user["photo"]
 
-        reels.append({
-            "id": r["id"],
-            "user_id": r["user_id"],
-            "username": r["username"],
-            "profile_photo": r["photo"],
-            "caption": r["caption"] or "",
-            "video_path": r["video_path"],
-            "thumbnail": r["thumbnail"],
-            "likes": r["likes"],
-            "liked": liked,
-            "following": is_following,
-            "saves": r["saves"],
-            "saved": saved,
-            "shares": r["shares"],
-            "comments_count": r["comments_count"],
-            "views": r["views"],
-            "created_at": created_at, "audio_name": r["audio_name"]
-        })
+    return render_template(
+        "reels_feed.html",
+        reels=reels,
+        next_after=next_after,
+        current_user=uid,
+        current_user_photo=current_user_photo
+    )
 
 
+# ===============================
+# ⏭ NEXT REELS (vertical player prefetch)
+# /reels/api/next?after=<id>&limit=N[&audio=name]
+# ===============================
+@reels_bp.route("/api/next")
+def api_next():
     uid = get_user_id()
 
+    after = request.args.get("after", type=int)
+    limit = request.args.get("limit", REELS_PAGE_SIZE, type=int)
+    audio = request.args.get("audio") or None
+
     conn = get_conn()
     c = conn.cursor()
 
-    c.execute("SELECT photo FROM users WHERE id=?", (uid,))
-    user = c.fetchone()
+    rows, next_after = load_reel_rows(c, after, limit, audio)
+    reels = assemble_reels(c, rows, uid)
 
-    current_user_photo = "/static/default_dp.png"
+    conn.close()
 
-    if user and user["photo"]:
-        current_user_photo = user["photo"]
+    # card markup ek hi jagah (reel_card.html), client sirf append karta hai
+    html = "".join(render_template("reel_card.html", reel=r) for r in reels)
+
+    return jsonify({
+        "ok": True,
+        "reels": reels,
+        "html": html,
+        "next_after": next_after
+    })
+
+# ===============================
+# 🔥 TRENDING REELS (hot score order)
+# /reels/api/trending?offset=&limit=
+# ===============================
+@reels_bp.route("/api/trending")
+def api_trending():
+    uid = get_user_id()
+
+    offset = max(0, request.args.get("offset", 0, type=int))
+    limit = max(1, min(request.args.get("limit", REELS_PAGE_SIZE, type=int), MAX_REELS_PAGE))
+
+    conn = get_conn()
+    c = conn.cursor()
+
+    # top-K index walk, phir sirf un reels ki rows
+    hot = trending.top(c, "reel", limit + 1, offset)
+    rows = load_reel_rows_by_ids(c, [rid for rid, _ in hot[:limit]])
+    reels = assemble_reels(c, rows, uid)
 
     conn.close()
 
-    return render_template(
-        "reels_feed.html",
-        reels=reels,
-        current_user=uid,
-        current_user_photo=current_user_photo
-    )
+    html = "".join(render_template("reel_card.html", reel=r) for r in reels)
+
+    return jsonify({
+        "ok": True,
+        "reels": reels,
+        "html": html,
+        "next_offset": offset + limit if len(hot) > limit else None
+    })
 
 # ===============================
 # ⬆️ UPLOAD REEL
 # ===============================
 @reels_bp.route("/upload", methods=["GET", "POST"])
 def upload_reel():
-    init_reels_db()
-
     if "user_id" not in session:
         return redirect("/auth/login")
 
@@ -256,20 +167,9 @@ def upload_reel():
     if not allowed_video(file.filename):
         return "Invalid video format", 400
 
-    ext = file.filename.rsplit(".", 1)[-1].lower()
-    new_name = f"{uuid.uuid4().hex}.{ext}"
-
-    save_path = os.path.join(UPLOAD_FOLDER, new_name)
-    file.save(save_path)
-
-    # AUTO THUMBNAIL
-    thumb_name = f"{uuid.uuid4().hex}.jpg"
-    thumb_path = os.path.join(THUMB_FOLDER, thumb_name)
-
-    os.system(
-        f'ffmpeg -i "{save_path}" -ss 00:00:01 -vframes 1 "{thumb_path}" -y'
-    )
-
+    # content hash naam: same video dobara -> wahi file
+    blob = blobs.store(file)
+    video_path = blobs.upload_rel(blob)
 
     uid = get_user_id()
 
@@ -277,13 +177,22 @@ def upload_reel():
     c = conn.cursor()
 
     c.execute("""
-        INSERT INTO reels (user_id, caption, video_path, thumbnail, audio_name, created_at)
-        VALUES (?,?,?,?,?,?)
-    """, (uid, caption, new_name, thumb_name, "Original Audio", datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        INSERT INTO reels (user_id, caption, video_path, audio_name, created_at)
+        VALUES (?,?,?,?,?)
+    """, (uid, caption, video_path, "Original Audio", datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+    reel_id = c.lastrowid
+
+    blobs.attach(c, "reel", reel_id, blob)
+    search.set_tags(c, "reel", reel_id, caption)
+
+    # thumbnail / duration / size -> background job (jobs.py)
+    reel_media.enqueue(c, reel_id, video_path)
 
     conn.commit()
     conn.close()
 
+    explore_grid.add_reel(reel_id, video_path)
+
     return redirect("/reels")
 
 
@@ -292,14 +201,12 @@ def upload_reel():
 # ===============================
 @reels_bp.route("/like_toggle/<int:reel_id>", methods=["POST"])
 def like_toggle(reel_id):
-    init_reels_db()
-
     if "user_id" not in session:
         return jsonify({"ok": False})
 
     uid = get_user_id()
 
-    conn = sqlite3.connect("database.db", timeout=10)
+    conn = db.connect()
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
 
@@ -313,6 +220,7 @@ def like_toggle(reel_id):
     else:
         c.execute("INSERT OR IGNORE INTO reel_likes (reel_id, user_id) VALUES (?, ?)", (reel_id, uid))
         c.execute("UPDATE reels SET likes = likes + 1 WHERE id=?", (reel_id,))
+        trending.bump_once(c, "reel", reel_id, "like", uid)
         new_state = True
 
     conn.commit()
@@ -375,6 +283,7 @@ def save_toggle(reel_id):
             "UPDATE reels SET saves=saves+1 WHERE id=?",
             (reel_id,)
         )
+        trending.bump_once(c, "reel", reel_id, "save", uid)
 
         saved = True
 
@@ -400,16 +309,19 @@ def save_toggle(reel_id):
 # ===============================
 @reels_bp.route("/share/<int:reel_id>", methods=["POST"])
 def share_reel(reel_id):
-    init_reels_db()
-
     conn = get_conn()
     c = conn.cursor()
 
-    c.execute("UPDATE reels SET shares = shares + 1 WHERE id=?", (reel_id,))
-    conn.commit()
+    c.execute("SELECT 1 FROM reels WHERE id=?", (reel_id,))
+    if not c.fetchone():
+        conn.close()
+        return jsonify({"ok": False}), 404
+
+    # increment write-behind (counters.py), response me pending bhi
+    counters.add_share(reel_id)
 
     c.execute("SELECT shares FROM reels WHERE id=?", (reel_id,))
-    shares = c.fetchone()["shares"]
+    shares = c.fetchone()["shares"] + counters.pending_shares(reel_id)
 
     conn.close()
 
@@ -421,8 +333,6 @@ def share_reel(reel_id):
 # ===============================
 @reels_bp.route("/comment/<int:reel_id>", methods=["POST"])
 def add_comment(reel_id):
-    init_reels_db()
-
     if "user_id" not in session:
         return jsonify({"ok": False, "error": "login required"})
 
@@ -441,6 +351,7 @@ def add_comment(reel_id):
     """, (reel_id, uid, comment))
 
     c.execute("UPDATE reels SET comments_count = comments_count + 1 WHERE id=?", (reel_id,))
+    trending.bump(c, "reel", reel_id, "comment")
 
     conn.commit()
     conn.close()
@@ -453,8 +364,6 @@ def add_comment(reel_id):
 # ===============================
 @reels_bp.route("/comments/<int:reel_id>")
 def get_comments(reel_id):
-    init_reels_db()
-
     conn = get_conn()
     c = conn.cursor()
 
@@ -494,8 +403,6 @@ def get_comments(reel_id):
 # ===============================
 @reels_bp.route("/comment_delete/<int:comment_id>", methods=["POST"])
 def delete_comment(comment_id):
-    init_reels_db()
-
     if "user_id" not in session:
         return jsonify({"ok": False, "error": "login required"})
 
@@ -532,8 +439,6 @@ def delete_comment(comment_id):
 # ===============================
 @reels_bp.route("/delete/<int:reel_id>", methods=["POST"])
 def delete_reel(reel_id):
-    init_reels_db()
-
     if "user_id" not in session:
         return redirect("/auth/login")
 
@@ -556,19 +461,28 @@ def delete_reel(reel_id):
         conn.close()
         return redirect("/reels")
 
-    try:
-        os.remove(os.path.join(UPLOAD_FOLDER, video_path))
-    except:
-        pass
+    # blob shared ho sakta hai -> sirf reference chhodo; purani files seedha hatao
+    if blobs.name_from_url(video_path) is None:
+        try:
+            os.remove(reel_media.video_file(video_path))
+        except:
+            pass
+
+    blobs.release(c, "reel", [reel_id])
+
+    reel_media.remove_hls(reel_id)
 
     c.execute("DELETE FROM reel_likes WHERE reel_id=?", (reel_id,))
     c.execute("DELETE FROM reel_comments WHERE reel_id=?", (reel_id,))
     c.execute("DELETE FROM reel_saves WHERE reel_id=?", (reel_id,))
     c.execute("DELETE FROM reels WHERE id=?", (reel_id,))
+    trending.remove(c, "reel", reel_id)
 
     conn.commit()
     conn.close()
 
+    explore_grid.remove("reel", reel_id)
+
     return redirect("/reels")
 
 ################################
@@ -581,18 +495,18 @@ def reels_by_audio():
     conn = get_conn()
     c = conn.cursor()
 
-    c.execute("""
-        SELECT reels.*, users.username
-        FROM reels
-        JOIN users ON reels.user_id = users.id
-        WHERE audio_name=?
-        ORDER BY reels.id DESC
-    """, (name,))
-
-    reels = c.fetchall()
+    rows, next_after = load_reel_rows(c, audio_name=name)
+    reels = assemble_reels(c, rows, get_user_id())
+
     conn.close()
 
-    return render_template("reels_feed.html", reels=reels, current_user=get_user_id())
+    return render_template(
+        "reels_feed.html",
+        reels=reels,
+        next_after=next_after,
+        audio_name=name,
+        current_user=get_user_id()
+    )
 
 
 #==============================================
@@ -634,14 +548,18 @@ def follow_user(user_id):
 
     if row:
         c.execute("DELETE FROM follows WHERE follower_id=? AND following_id=?", (uid, user_id))
+        timeline.trim(c, uid, user_id)
         following = False
     else:
         c.execute("INSERT INTO follows (follower_id, following_id) VALUES (?,?)", (uid, user_id))
+        timeline.backfill(c, uid, user_id)
         following = True
 
     conn.commit()
     conn.close()
 
+    follow_graph.on_follow(uid, user_id, followed=following)
+
     return jsonify({"ok": True, "following": following})
 
 # =========================
@@ -703,16 +621,6 @@ def share_to_user(reel_id, user_id):
     conn = get_conn()
     c = conn.cursor()
 
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS reel_shares (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            sender_id INTEGER,
-            receiver_id INTEGER,
-            reel_id INTEGER,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-
     c.execute("""
         INSERT INTO reel_shares (
             sender_id,
@@ -737,27 +645,16 @@ def add_view(reel_id):
     conn = get_conn()
     c = conn.cursor()
 
-    c.execute(
-        "SELECT 1 FROM reel_views WHERE reel_id=? AND user_id=?",
-        (reel_id, uid)
-    )
-
+    c.execute("SELECT 1 FROM reels WHERE id=?", (reel_id,))
     if not c.fetchone():
+        conn.close()
+        return jsonify({"ok": False}), 404
 
-        c.execute(
-            "INSERT INTO reel_views (reel_id, user_id) VALUES (?, ?)",
-            (reel_id, uid)
-        )
-
-        c.execute(
-            "UPDATE reels SET views = views + 1 WHERE id=?",
-            (reel_id,)
-        )
-
-        conn.commit()
+    # (reel, user) dedupe + batched insert: counters.py (koi write lock nahi)
+    counters.record_view(c, reel_id, uid)
 
     c.execute("SELECT views FROM reels WHERE id=?", (reel_id,))
-    views = c.fetchone()["views"]
+    views = c.fetchone()["views"] + counters.pending_views(reel_id)
 
     conn.close()
 
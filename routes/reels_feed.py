@@ -0,0 +1,137 @@
+# ===============================
+# 🎬 REELS FEED BUILDER
+# ===============================
+# Pehle reels_page har reel ke liye reel_likes / follows / reel_saves
+# pe alag query chalata tha aur saari reels ek saath load hoti thi.
+# Ab ek window (reels.id cursor) aur poori window ke flags sirf
+# teen IN (...) queries me.
+
+import counters
+
+REELS_PAGE_SIZE = 5
+MAX_REELS_PAGE = 20
+
+
+def _marks(ids):
+    return ",".join("?" * len(ids))
+
+
+# -------------------------
+# WINDOW (keyset: id < after, newest pehle)
+# -------------------------
+def load_reel_rows(c, after=None, limit=REELS_PAGE_SIZE, audio_name=None):
+    limit = max(1, min(int(limit), MAX_REELS_PAGE))
+
+    c.execute("""
+        SELECT reels.id, reels.user_id, reels.caption, reels.video_path,
+               reels.thumbnail,
+               reels.likes, reels.saves, reels.shares, reels.comments_count, reels.views,
+               reels.created_at, reels.audio_name,
+               reels.hls_status, reels.hls_path,
+               users.username, users.photo
+        FROM reels
+        JOIN users ON reels.user_id = users.id
+        WHERE (? IS NULL OR reels.id < ?)
+          AND (? IS NULL OR reels.audio_name = ?)
+        ORDER BY reels.id DESC
+        LIMIT ?
+    """, (after, after, audio_name, audio_name, limit))
+    rows = c.fetchall()
+
+    # poori window bhari -> aage aur reels ho sakti hain
+    next_after = rows[-1]["id"] if len(rows) == limit else None
+
+    return rows, next_after
+
+
+# -------------------------
+# GIVEN IDS (trending order), wahi order wapas
+# -------------------------
+def load_reel_rows_by_ids(c, reel_ids):
+    if not reel_ids:
+        return []
+
+    c.execute(f"""
+        SELECT reels.id, reels.user_id, reels.caption, reels.video_path,
+               reels.thumbnail,
+               reels.likes, reels.saves, reels.shares, reels.comments_count, reels.views,
+               reels.created_at, reels.audio_name,
+               reels.hls_status, reels.hls_path,
+               users.username, users.photo
+        FROM reels
+        JOIN users ON reels.user_id = users.id
+        WHERE reels.id IN ({_marks(reel_ids)})
+    """, list(reel_ids))
+    by_id = {r["id"]: r for r in c.fetchall()}
+
+    return [by_id[rid] for rid in reel_ids if rid in by_id]
+
+
+# -------------------------
+# VIEWER FLAGS  (set of ids)
+# -------------------------
+def _id_set(c, sql, ids, user_id):
+    ids = list(set(ids))
+
+    if not ids or not user_id:
+        return set()
+
+    c.execute(sql.format(marks=_marks(ids)), [user_id] + ids)
+    return {r[0] for r in c.fetchall()}
+
+
+def load_liked(c, reel_ids, user_id):
+    return _id_set(c, """
+        SELECT reel_id FROM reel_likes
+        WHERE user_id=? AND reel_id IN ({marks})
+    """, reel_ids, user_id)
+
+
+def load_saved(c, reel_ids, user_id):
+    return _id_set(c, """
+        SELECT reel_id FROM reel_saves
+        WHERE user_id=? AND reel_id IN ({marks})
+    """, reel_ids, user_id)
+
+
+def load_following(c, owner_ids, user_id):
+    return _id_set(c, """
+        SELECT following_id FROM follows
+        WHERE follower_id=? AND following_id IN ({marks})
+    """, owner_ids, user_id)
+
+
+# -------------------------
+# ROWS -> TEMPLATE / JSON DICTS
+# -------------------------
+def assemble_reels(c, rows, user_id):
+    reel_ids = [r["id"] for r in rows]
+
+    liked = load_liked(c, reel_ids, user_id)
+    saved = load_saved(c, reel_ids, user_id)
+    following = load_following(c, [r["user_id"] for r in rows], user_id)
+
+    reels = [{
+        "id": r["id"],
+        "user_id": r["user_id"],
+        "username": r["username"],
+        "profile_photo": r["photo"],
+        "caption": r["caption"] or "",
+        "video_path": r["video_path"],
+        # ladder ready ho tabhi playlist, warna original file
+        "hls": r["hls_path"] if r["hls_status"] == "ready" else None,
+        "thumbnail": r["thumbnail"],
+        "likes": r["likes"],
+        "liked": r["id"] in liked,
+        "following": r["user_id"] in following,
+        "saves": r["saves"],
+        "saved": r["id"] in saved,
+        "shares": r["shares"],
+        "comments_count": r["comments_count"],
+        "views": r["views"],
+        "created_at": r["created_at"] or "",
+        "audio_name": r["audio_name"]
+    } for r in rows]
+
+    # abhi flush na hue views / shares bhi dikhe
+    return counters.merge_reels(reels)
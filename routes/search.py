@@ -0,0 +1,202 @@
+# ===============================
+# 🔎 SEARCH (SQLite FTS5)
+# ===============================
+# Pehle explore search sirf `username LIKE '%q%'` tha: full scan, koi
+# ranking nahi, captions / hashtags searchable hi nahi.
+#
+# Ab external-content FTS5 tables (migration 012, triggers se sync):
+#   users_fts   (username, bio)                  -> users
+#   posts_fts   (caption, hashtags, location)    -> posts
+#   reels_fts   (caption, audio_name, hashtags)  -> reels
+#   hashtag_uses (tag, owner_kind, owner_id)     -> #tag suggestions
+#
+# Query: har word prefix match ("vis sen" -> "vis"* "sen"*), BM25 rank.
+# Hashtags caption + publish ke "hashtags" field se nikalte hain, bina '#'
+# ke lowercase me posts.hashtags / reels.hashtags me rehte hain.
+
+import re
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+MAX_TERMS = 8
+
+TYPES = ("users", "posts", "reels", "tags")
+
+TAG_RE = re.compile(r"#(\w{1,64})", re.UNICODE)
+TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+# bm25 column weights (pehla column zyada important)
+USER_WEIGHTS = (10.0, 1.0)           # username, bio
+POST_WEIGHTS = (1.0, 4.0, 0.5)       # caption, hashtags, location
+REEL_WEIGHTS = (1.0, 0.5, 4.0)       # caption, audio_name, hashtags
+
+
+# -------------------------
+# HASHTAGS
+# -------------------------
+def extract_tags(caption="", hashtags=""):
+    """caption ke #tags + publish ka hashtags field ('#a #b' ya 'a b') -> ['a', 'b']."""
+    found = TERM_RE.findall(hashtags or "") + TAG_RE.findall(caption or "")
+    return list(dict.fromkeys(t.lower() for t in found))
+
+
+def set_tags(c, owner_kind, owner_id, caption, hashtags=""):
+    """posts / reels row ke hashtags + hashtag_uses (caller ke transaction me)."""
+    tags = extract_tags(caption, hashtags)
+
+    table = "posts" if owner_kind == "post" else "reels"
+    c.execute(f"UPDATE {table} SET hashtags=? WHERE id=?", (" ".join(tags) or None, owner_id))
+
+    c.execute("DELETE FROM hashtag_uses WHERE owner_kind=? AND owner_id=?", (owner_kind, owner_id))
+    c.executemany(
+        "INSERT OR IGNORE INTO hashtag_uses (tag, owner_kind, owner_id) VALUES (?, ?, ?)",
+        [(t, owner_kind, owner_id) for t in tags]
+    )
+    return tags
+
+
+# -------------------------
+# QUERY
+# -------------------------
+def build_query(q):
+    """User input -> safe FTS5 MATCH string (har term quoted + prefix)."""
+    terms = TERM_RE.findall((q or "").lower())[:MAX_TERMS]
+    return " ".join(f'"{t}"*' for t in terms)
+
+
+def _page(limit, offset):
+    limit = max(1, min(int(limit or DEFAULT_LIMIT), MAX_LIMIT))
+    offset = max(0, int(offset or 0))
+    return limit, offset
+
+
+def _weights(w):
+    return ", ".join(str(x) for x in w)
+
+
+# -------------------------
+# SEARCHERS  -> (items, next_offset)
+# ek extra row fetch karke pata chalta hai aage aur hai ya nahi
+# -------------------------
+def _run(c, sql, match, limit, offset):
+    c.execute(sql, (match, limit + 1, offset))
+    rows = c.fetchall()
+    more = len(rows) > limit
+    return rows[:limit], (offset + limit if more else None)
+
+
+def search_users(c, q, limit=DEFAULT_LIMIT, offset=0):
+    match = build_query(q)
+    if not match:
+        return [], None
+    limit, offset = _page(limit, offset)
+
+    rows, next_offset = _run(c, f"""
+        SELECT users.id, users.username, users.photo, users.bio
+        FROM users_fts
+        JOIN users ON users.id = users_fts.rowid
+        WHERE users_fts MATCH ?
+        ORDER BY bm25(users_fts, {_weights(USER_WEIGHTS)}), users.id
+        LIMIT ? OFFSET ?
+    """, match, limit, offset)
+
+    return [{
+        "id": r[0],
+        "username": r[1],
+        "photo": r[2],
+        "bio": r[3] or ""
+    } for r in rows], next_offset
+
+
+def search_posts(c, q, limit=DEFAULT_LIMIT, offset=0):
+    match = build_query(q)
+    if not match:
+        return [], None
+    limit, offset = _page(limit, offset)
+
+    rows, next_offset = _run(c, f"""
+        SELECT posts.id, posts.user_id, users.username, posts.caption, posts.hashtags,
+               (SELECT image_path FROM post_images
+                WHERE post_id=posts.id ORDER BY id LIMIT 1)
+        FROM posts_fts
+        JOIN posts ON posts.id = posts_fts.rowid
+        JOIN users ON users.id = posts.user_id
+        WHERE posts_fts MATCH ?
+        ORDER BY bm25(posts_fts, {_weights(POST_WEIGHTS)}), posts.id DESC
+        LIMIT ? OFFSET ?
+    """, match, limit, offset)
+
+    return [{
+        "id": r[0],
+        "user_id": r[1],
+        "username": r[2],
+        "caption": r[3] or "",
+        "hashtags": (r[4] or "").split(),
+        "media": r[5]
+    } for r in rows], next_offset
+
+
+def search_reels(c, q, limit=DEFAULT_LIMIT, offset=0):
+    match = build_query(q)
+    if not match:
+        return [], None
+    limit, offset = _page(limit, offset)
+
+    rows, next_offset = _run(c, f"""
+        SELECT reels.id, reels.user_id, users.username, reels.caption,
+               reels.audio_name, reels.hashtags, reels.thumbnail
+        FROM reels_fts
+        JOIN reels ON reels.id = reels_fts.rowid
+        JOIN users ON users.id = reels.user_id
+        WHERE reels_fts MATCH ?
+        ORDER BY bm25(reels_fts, {_weights(REEL_WEIGHTS)}), reels.id DESC
+        LIMIT ? OFFSET ?
+    """, match, limit, offset)
+
+    return [{
+        "id": r[0],
+        "user_id": r[1],
+        "username": r[2],
+        "caption": r[3] or "",
+        "audio_name": r[4],
+        "hashtags": (r[5] or "").split(),
+        "thumbnail": f"/static/uploads/reels/thumbs/{r[6]}" if r[6] else None
+    } for r in rows], next_offset
+
+
+def search_tags(c, q, limit=DEFAULT_LIMIT, offset=0):
+    terms = TERM_RE.findall((q or "").lower())
+    if not terms:
+        return [], None
+    limit, offset = _page(limit, offset)
+
+    prefix = terms[0]
+
+    # PRIMARY KEY (tag, ...) pe range scan = prefix match
+    c.execute("""
+        SELECT tag, COUNT(*) AS uses
+        FROM hashtag_uses
+        WHERE tag >= ? AND tag < ?
+        GROUP BY tag
+        ORDER BY uses DESC, tag
+        LIMIT ? OFFSET ?
+    """, (prefix, prefix + "\U0010ffff", limit + 1, offset))
+    rows = c.fetchall()
+
+    more = len(rows) > limit
+    return [{
+        "tag": r[0],
+        "uses": r[1]
+    } for r in rows[:limit]], (offset + limit if more else None)
+
+
+SEARCHERS = {
+    "users": search_users,
+    "posts": search_posts,
+    "reels": search_reels,
+    "tags": search_tags,
+}
+
+
+def search(c, q, kind="users", limit=DEFAULT_LIMIT, offset=0):
+    return SEARCHERS[kind](c, q, limit, offset)
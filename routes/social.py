@@ -1,17 +1,19 @@
-import os
 import json
-import sqlite3
+import db
 from flask import Blueprint, request, session, redirect, url_for, jsonify, render_template, flash
 from werkzeug.utils import secure_filename
+from routes import blobs, explore_grid, follow_graph, post_counters, timeline, trending
 
 social_bp = Blueprint("social", __name__, url_prefix="/social")
 
 UPLOAD_FOLDER = "static/uploads"
 ALLOWED_EXT = {"png", "jpg", "jpeg", "gif", "mp4"}
 
+TRENDING_LIMIT = 50
+
 # -------------------- DB Helper --------------------
 def get_conn():
-    return sqlite3.connect("database.db")
+    return db.connect()
 
 def allowed_file(fname):
     return "." in fname and fname.rsplit(".", 1)[1].lower() in ALLOWED_EXT
@@ -30,24 +32,15 @@ def like_post(post_id):
     conn = get_conn()
     c = conn.cursor()
 
-    c.execute("SELECT id FROM likes WHERE post_id=? AND user_id=?", (post_id, user_id))
-    row = c.fetchone()
-
-    if row:
-        c.execute("DELETE FROM likes WHERE id=?", (row[0],))
-
-        # new updated count
-        c.execute("SELECT COUNT(*) FROM likes WHERE post_id=?", (post_id,))
-        like_count = c.fetchone()[0]
+    # like row + posts.likes ek hi transaction me
+    liked, like_count = post_counters.toggle_like(c, post_id, user_id)
 
+    if not liked:
         conn.commit()
         conn.close()
         return jsonify({"ok": True, "action": "unliked", "count": like_count})
 
     else:
-        c.execute("INSERT INTO likes (post_id, user_id, username) VALUES (?, ?, ?)",
-                  (post_id, user_id, session.get("user_id")))
-
         # owner notification
         c.execute("SELECT user_id FROM posts WHERE id=?", (post_id,))
         owner = c.fetchone()
@@ -58,10 +51,6 @@ def like_post(post_id):
                 (owner[0], user_id, "like", meta)
             )
 
-        # updated count
-        c.execute("SELECT COUNT(*) FROM likes WHERE post_id=?", (post_id,))
-        like_count = c.fetchone()[0]
-
         conn.commit()
         conn.close()
         return jsonify({"ok": True, "action": "liked", "count": like_count})
@@ -82,11 +71,7 @@ def comment_post(post_id):
     conn = get_conn()
     c = conn.cursor()
 
-    c.execute(
-        "INSERT INTO comments (post_id, user_id, username, comment) VALUES (?, ?, ?, ?)",
-        (post_id, session["user_id"], session["user_id"], text)
-    )
-    comment_id = c.lastrowid
+    comment_id = post_counters.add_comment(c, post_id, session["user_id"], text)
 
     # Notify post owner
     c.execute("SELECT user_id FROM posts WHERE id=?", (post_id,))
@@ -126,6 +111,7 @@ def follow_toggle(target_id):
     if row:
         # Unfollow
         c.execute("DELETE FROM follows WHERE id=?", (row[0],))
+        timeline.trim(c, me, target_id)
 
         # Remove old follow request if it exists
         c.execute("""
@@ -135,6 +121,8 @@ def follow_toggle(target_id):
 
         conn.commit()
         conn.close()
+
+        follow_graph.on_follow(me, target_id, followed=False)
         return jsonify({"ok": True, "action": "unfollowed"})
 
 # Check private account
@@ -172,6 +160,7 @@ def follow_toggle(target_id):
             "INSERT INTO follows (follower_id, following_id) VALUES (?, ?)",
             (me, target_id)
         )
+        timeline.backfill(c, me, target_id)
 
         # Notify follow target
         c.execute(
@@ -181,6 +170,8 @@ def follow_toggle(target_id):
 
         conn.commit()
         conn.close()
+
+        follow_graph.on_follow(me, target_id)
         return jsonify({"ok": True, "action": "followed"})
 
 
@@ -202,17 +193,14 @@ def profile(username):
     user_id = u[0]
 
     # Posts
-    c.execute("SELECT id, caption FROM posts WHERE user_id=? ORDER BY id DESC", (user_id,))
+    c.execute("SELECT id, caption, likes FROM posts WHERE user_id=? ORDER BY id DESC", (user_id,))
     rows = c.fetchall()
 
     posts = []
-    for pid, caption in rows:
+    for pid, caption, likes in rows:
         c.execute("SELECT image_path FROM post_images WHERE post_id=?", (pid,))
         images = [x[0] for x in c.fetchall()]
 
-        c.execute("SELECT COUNT(*) FROM likes WHERE post_id=?", (pid,))
-        likes = c.fetchone()[0]
-
         posts.append({"id": pid, "caption": caption, "images": images, "likes": likes})
 
     # Check if requester follows this profile
@@ -245,9 +233,7 @@ def upload_story():
         f = request.files["story"]
 
         if allowed_file(f.filename):
-            filename = secure_filename(f.filename)
-            save_path = os.path.join(UPLOAD_FOLDER, filename)
-            f.save(save_path)
+            blob = blobs.store(f, secure_filename(f.filename))
 
             conn = get_conn()
             c = conn.cursor()
@@ -255,7 +241,8 @@ def upload_story():
             c.execute("""
               INSERT INTO stories (user_id, media_path, expires_at)
               VALUES (?, ?, datetime('now','+1 day'))
-            """, (session["user_id"], save_path))
+            """, (session["user_id"], blobs.url_for(blob)))
+            blobs.attach(c, "story", c.lastrowid, blob)
 
             conn.commit()
             conn.close()
@@ -357,27 +344,59 @@ def explore():
     conn = get_conn()
     c = conn.cursor()
 
-    c.execute("""
-       SELECT posts.id, users.username, posts.caption, COUNT(likes.id) as likecount
-       FROM posts
-       LEFT JOIN likes ON posts.id = likes.post_id
-       JOIN users ON posts.user_id = users.id
-       GROUP BY posts.id
-       ORDER BY likecount DESC, posts.id DESC
-       LIMIT 50
-    """)
+    # hot score ke top-K (routes/trending.py), likes pe GROUP BY nahi
+    hot_posts = trending.top(c, "post", TRENDING_LIMIT)
+    hot_reels = trending.top(c, "reel", TRENDING_LIMIT)
+
+    post_ids = [pid for pid, _ in hot_posts]
+    reel_ids = [rid for rid, _ in hot_reels]
+
+    covers = {}
+    if post_ids:
+        c.execute(f"""
+            SELECT id, (SELECT image_path FROM post_images
+                        WHERE post_id=posts.id ORDER BY id LIMIT 1)
+            FROM posts WHERE id IN ({",".join("?" * len(post_ids))})
+        """, post_ids)
+        covers = dict(c.fetchall())
+
+    videos = {}
+    if reel_ids:
+        c.execute(f"""
+            SELECT id, video_path FROM reels
+            WHERE id IN ({",".join("?" * len(reel_ids))})
+        """, reel_ids)
+        videos = dict(c.fetchall())
 
-    rows = c.fetchall()
     conn.close()
 
-    posts = [{
-        "id": r[0],
-        "user_id": r[1],
-        "caption": r[2],
-        "likes": r[3]
-    } for r in rows]
+    # posts + reels ek hi hot order me
+    ranked = sorted(
+        [("post", pid, score) for pid, score in hot_posts if covers.get(pid)] +
+        [("reel", rid, score) for rid, score in hot_reels if videos.get(rid)],
+        key=lambda x: x[2],
+        reverse=True
+    )[:TRENDING_LIMIT]
+
+    explore_items = [
+        explore_grid.post_tile(item_id, covers[item_id]) if kind == "post"
+        else explore_grid.reel_tile(item_id, videos[item_id])
+        for kind, item_id, _ in ranked
+    ]
+
+    # trending kam pada (naya db / deleted items) -> recent tiles se bharo
+    if len(explore_items) < TRENDING_LIMIT:
+        seen = {(t["type"], t["id"]) for t in explore_items}
+        recent, _, _ = explore_grid.page(0, explore_grid.MAX_PAGE_SIZE)
+        explore_items += [t for t in recent if (t["type"], t["id"]) not in seen][:TRENDING_LIMIT - len(explore_items)]
 
-    return render_template("explore.html", posts=posts)
+    return render_template(
+        "explore.html",
+        users=explore_grid.users(),
+        explore_items=explore_items,
+        current_user=session.get("user_id"),
+        current_user_photo="/static/default_dp.png"
+    )
 
 
 #follow keliye
@@ -389,28 +408,28 @@ def suggestions():
 
     me = session["user_id"]
 
-    conn = get_conn()
-    c = conn.cursor()
-
-    # Already following list
-    c.execute("SELECT following_id FROM follows WHERE follower_id=?", (me,))
-    following_ids = [row[0] for row in c.fetchall()]
-
-    # Suggest users NOT followed + NOT me
-    c.execute("""
-        SELECT id, username FROM users
-        WHERE id != ?
-        AND id NOT IN (
-            SELECT following_id FROM follows WHERE follower_id=?
-        )
-        ORDER BY RANDOM()
-        LIMIT 10
-    """, (me, me))
-
-    rows = c.fetchall()
-    conn.close()
+    # friends-of-friends, mutual count se (routes/follow_graph.py, memory CSR)
+    ranked = follow_graph.suggest(me, request.args.get("limit", follow_graph.DEFAULT_LIMIT, type=int))
+    ids = [uid for uid, _, _ in ranked]
+
+    names = {}
+    if ids:
+        conn = get_conn()
+        c = conn.cursor()
+        c.execute(f"""
+            SELECT id, username, photo FROM users
+            WHERE id IN ({",".join("?" * len(ids))})
+        """, ids)
+        names = {r[0]: (r[1], r[2]) for r in c.fetchall()}
+        conn.close()
 
-    suggestions = [{"id": r[0], "username": r[1]} for r in rows]
+    suggestions = [{
+        "id": uid,
+        "username": names[uid][0],
+        "photo": names[uid][1],
+        "mutuals": mutuals,
+        "follows_you": follows_me
+    } for uid, mutuals, follows_me in ranked if uid in names]
 
     return jsonify({"ok": True, "users": suggestions})
 
@@ -1,16 +1,18 @@
 import sqlite3
+import db
 import os
 import json
 import time
-from flask import Blueprint, render_template, request, redirect, session, url_for, jsonify, flash, send_from_directory
+from flask import Blueprint, render_template, request, redirect, session, url_for, jsonify, flash
+from routes.media import send_media
 from werkzeug.utils import secure_filename
+from routes import blobs, story_store
 
 stories_bp = Blueprint("stories", __name__, url_prefix="/stories")
 
 # ---------------- CONFIG ----------------
 STORY_FOLDER = os.path.join("static", "stories")
 DATA_DIR = "data"
-STORY_FILE = os.path.join(DATA_DIR, "stories.json")
 REPLIES_FILE = os.path.join(DATA_DIR, "story_replies.json")
 
 ALLOWED = {
@@ -26,7 +28,7 @@ ALLOWED = {
     "avi", "mkv", "mpeg",
     "mpg", "wmv"
 }
-EXPIRE_SECONDS = 24 * 60 * 60
+EXPIRE_SECONDS = story_store.EXPIRE_SECONDS
 
 os.makedirs(STORY_FOLDER, exist_ok=True)
 os.makedirs(DATA_DIR, exist_ok=True)
@@ -52,14 +54,6 @@ def write_json(path, data):
         json.dump(data, f, indent=2, ensure_ascii=False)
 
 
-def load_stories():
-    return read_json(STORY_FILE)
-
-
-def save_stories(data):
-    write_json(STORY_FILE, data)
-
-
 def load_replies():
     return read_json(REPLIES_FILE)
 
@@ -69,24 +63,20 @@ def save_replies(data):
 
 
 # ---------------- CLEANUP ----------------
-def cleanup_expired():
-    stories = load_stories()
-    now = now_ts()
-
-    kept = []
+# sirf sweeper.py chalata hai; reads khud expired stories filter karte hain
+def cleanup_expired(limit=500):
+    expired = story_store.expire_stories(limit=limit)
 
-    for s in stories:
-        if now - int(s.get("timestamp", 0)) < EXPIRE_SECONDS:
-            kept.append(s)
-        else:
-            fn = s.get("filename")
-            if fn:
-                try:
-                    os.remove(os.path.join(STORY_FOLDER, fn))
-                except:
-                    pass
+    for fn in expired:
+        # blob file gc hatata hai (shared ho sakti hai)
+        if blobs.is_blob(fn):
+            continue
+        try:
+            os.remove(os.path.join(STORY_FOLDER, fn))
+        except:
+            pass
 
-    save_stories(kept)
+    return len(expired)
 
 
 # ---------------- STORY UPLOAD ----------------
@@ -104,37 +94,18 @@ def add_story():
     if ext not in ALLOWED:
         return "File not allowed", 400
 
-    filename = f"{session['user_id']}_{now_ts()}_{secure_filename(file.filename)}"
-    path = os.path.join(STORY_FOLDER, filename)
-    file.save(path)
-
-    stories = load_stories()
-
-    # Unique Story ID
-    new_id = max([s.get("id", 0) for s in stories], default=0) + 1
-
-    stories.append({
-        "id": new_id,
-        "user_id": str(session["user_id"]),
-        "filename": filename,
-        "timestamp": now_ts(),
-        "viewers": [],
-        "likes": [],
-        "reactions": {}
-    })
+    filename = blobs.store(file, secure_filename(file.filename))
 
-    save_stories(stories)
+    story_store.add_story(session["user_id"], filename)
 
     print("STORY SAVED:", filename)
-    print("STORY SAVED:", stories)
 
     return redirect("/posts/feed")
 
 # ---------------- GROUPED STORIES (INS CORE) ----------------
 @stories_bp.route("/api/groups")
 def groups():
-    cleanup_expired()
-    stories = load_stories()
+    stories = story_store.active_stories(with_activity=False)
 
     grouped = {}
 
@@ -159,16 +130,8 @@ def groups():
 # ---------------- VIEW STORIES ----------------
 @stories_bp.route("/view/<username>")
 def view(username):
-    cleanup_expired()
-
-    stories = load_stories()
-
-    user_stories = [
-        s for s in stories
-        if str(s.get("user_id")) == str(username)
-    ]
-
-    user_stories.sort(key=lambda x: x.get("timestamp", 0))
+    # sirf is user ki stories (user_id, timestamp) index se
+    user_stories = story_store.active_stories(user_id=username)
 
     # NO STORY
     if not user_stories:
@@ -180,13 +143,13 @@ def view(username):
         # other user -> back feed
         return redirect("/posts/feed")
 
-    # mark seen
+    # mark seen (INSERT OR IGNORE -> concurrent workers safe)
     if "user_id" in session:
-        for s in user_stories:
-            if session["user_id"] not in s.get("viewers", []):
-                s.setdefault("viewers", []).append(session["user_id"])
+        story_store.mark_viewed([s["id"] for s in user_stories], session["user_id"])
 
-        save_stories(stories)
+        for s in user_stories:
+            if str(session["user_id"]) not in s["viewers"]:
+                s["viewers"].append(str(session["user_id"]))
 
     replies = [
         r for r in load_replies()
@@ -194,7 +157,7 @@ def view(username):
     ]
 
     # USER INFO
-    conn = sqlite3.connect("database.db")
+    conn = db.connect()
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
 
@@ -215,9 +178,6 @@ def view(username):
         if user["photo"]:
             profile_photo = user["photo"]
 
-    for s in user_stories:
-         s.setdefault("likes", [])
-
     story_users = []
 
     for item in get_storybar_for_user(session.get("user_id")):
@@ -247,31 +207,15 @@ def react():
     data = request.get_json()
     story_id = data.get("story_id")
 
-    stories = load_stories()
-
-    for s in stories:
-
-        if s["id"] == story_id:
-
-            s.setdefault("likes", [])
+    liked = story_store.toggle_like(story_id, session["user_id"])
 
-            uid = str(session["user_id"])
+    if liked is None:
+        return jsonify({"ok": False}), 404
 
-            if uid in s["likes"]:
-                s["likes"].remove(uid)
-                liked = False
-            else:
-                s["likes"].append(uid)
-                liked = True
-
-            save_stories(stories)
-
-            return jsonify({
-                "ok": True,
-                "liked": liked
-            })
-
-    return jsonify({"ok": False}), 404
+    return jsonify({
+        "ok": True,
+        "liked": liked
+    })
 
 # ---------------- REPLY ----------------
 @stories_bp.route("/api/reply", methods=["POST"])
@@ -299,25 +243,27 @@ def reply():
 # ---------------- MEDIA ----------------
 @stories_bp.route("/media/<filename>")
 def media(filename):
-    return send_from_directory(STORY_FOLDER, filename)
+    if blobs.is_blob(filename):
+        return send_media(blobs.BLOB_DIR, blobs.rel_path(filename), immutable=True)
 
-def load_stories_for_feed():
-    cleanup_expired()
-    stories = load_stories()
+    # story 24h hi rehti hai
+    return send_media(STORY_FOLDER, filename, max_age=story_store.EXPIRE_SECONDS, immutable=False)
 
+def load_stories_for_feed():
     return [
         {
-            "id": s.get("id"),
-            "user_id": s.get("user_id"),
-            "filename": s.get("filename"),
-            "timestamp": s.get("timestamp"),
-            "viewers": s.get("viewers", [])
+            "id": s["id"],
+            "user_id": s["user_id"],
+            "filename": s["filename"],
+            "timestamp": s["timestamp"],
+            "viewers": s["viewers"]
         }
-        for s in stories
+        for s in story_store.active_stories()
     ]
 
-    bar = []
 
+def get_storybar_for_user(current_user):
+    stories = story_store.active_stories()
 
     grouped = {}
 
@@ -329,53 +275,28 @@ def load_stories_for_feed():
         if uid not in grouped or s.get("timestamp", 0) > grouped[uid].get("timestamp", 0):
             grouped[uid] = s
 
-    bar = []
+    grouped.pop(str(current_user), None)
 
-    for uid, s in grouped.items():
-
-        # ❌ skip own story
-        if str(uid) == str(current_user):
-            continue
-
-        bar.append({
-            "user_id": uid,
-            "last_img": "/stories/media/" + s.get("filename"),
-            "seen": str(current_user) in [str(x) for x in (s.get("viewers") or [])]
-        })
-
-    return bar
+    # saare story users ek hi query me
+    users = {}
+    if grouped:
+        conn = db.connect_rows()
+        c = conn.cursor()
 
-def get_storybar_for_user(current_user):
-    cleanup_expired()
-    stories = load_stories()
-
-    conn = sqlite3.connect("database.db")
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-
-    grouped = {}
-
-    for s in stories:
-        uid = s.get("user_id")
-        if not uid:
-            continue
+        uids = list(grouped.keys())
+        c.execute(
+            f"SELECT id, username, photo FROM users WHERE id IN ({','.join('?' * len(uids))})",
+            uids
+        )
+        users = {str(u["id"]): u for u in c.fetchall()}
 
-        if uid not in grouped or s.get("timestamp", 0) > grouped[uid].get("timestamp", 0):
-            grouped[uid] = s
+        conn.close()
 
     bar = []
 
     for uid, s in grouped.items():
 
-        if str(uid) == str(current_user):
-            continue
-
-        c.execute(
-            "SELECT username, photo FROM users WHERE id=?",
-            (uid,)
-        )
-
-        u = c.fetchone()
+        u = users.get(uid)
 
         username = str(uid)
         photo = "/static/default_dp.png"
@@ -392,7 +313,6 @@ def get_storybar_for_user(current_user):
             "seen": str(current_user) in [str(x) for x in (s.get("viewers") or [])]
         })
 
-    conn.close()
     return bar
 
 ######################################################
@@ -404,25 +324,15 @@ def delete_story():
     data = request.get_json()
     story_id = data.get("story_id")
 
-    stories = load_stories()
+    filename = story_store.delete_story(story_id, session["user_id"])
 
-    new_stories = []
-    deleted = False
+    if filename and not blobs.is_blob(filename):
+        try:
+            os.remove(os.path.join(STORY_FOLDER, filename))
+        except:
+            pass
 
-    for s in stories:
-        if s["id"] == story_id and s["user_id"] == str(session["user_id"]):
-            deleted = True
-            try:
-                os.remove(os.path.join(STORY_FOLDER, s["filename"]))
-            except:
-                pass
-            continue
-
-        new_stories.append(s)
-
-    save_stories(new_stories)
-
-    return jsonify({"ok": deleted})
+    return jsonify({"ok": filename is not None})
 #################( activity ) ##############
 @stories_bp.route("/activity/<int:story_id>")
 def story_activity(story_id):
@@ -430,14 +340,7 @@ def story_activity(story_id):
     if "user_id" not in session:
         return redirect("/auth/login")
 
-    stories = load_stories()
-
-    story = None
-
-    for s in stories:
-        if s["id"] == story_id:
-            story = s
-            break
+    story = story_store.get_story(story_id)
 
     if not story:
         return "Story not found"
@@ -445,46 +348,32 @@ def story_activity(story_id):
     if story["user_id"] != str(session["user_id"]):
         return "Unauthorized", 403
 
-    conn = sqlite3.connect("database.db")
+    conn = db.connect()
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
 
-    viewers = []
-    likes = []
-
-    for uid in story.get("viewers", []):
+    # viewers + likers ke users ek query me
+    ids = list(dict.fromkeys(story.get("viewers", []) + story.get("likes", [])))
+    users = {}
 
+    if ids:
         c.execute(
-            "SELECT id, username, photo FROM users WHERE id=?",
-            (str(uid),)
+            f"SELECT id, username, photo FROM users WHERE id IN ({','.join('?' * len(ids))})",
+            ids
         )
+        users = {str(u["id"]): u for u in c.fetchall()}
 
-        u = c.fetchone()
-
-        if u:
+    viewers = [{
+        "id": uid,
+        "username": users[uid]["username"],
+        "photo": users[uid]["photo"] or "/static/default_dp.png"
+    } for uid in story.get("viewers", []) if uid in users]
 
-            viewers.append({
-                "id": u["id"],
-                "id": uid,
-                "username": u["username"],
-                "photo": u["photo"] or "/static/default_dp.png"
-            })
-
-    for uid in story.get("likes", []):
-
-        c.execute(
-            "SELECT id, username, photo FROM users WHERE id=?",
-            (str(uid),)
-        )
-
-        u = c.fetchone()
-
-        if u:
-            likes.append({
-                "id": u["id"],
-                "username": u["username"],
-                "photo": u["photo"] or "/static/default_dp.png"
-            })
+    likes = [{
+        "id": users[uid]["id"],
+        "username": users[uid]["username"],
+        "photo": users[uid]["photo"] or "/static/default_dp.png"
+    } for uid in story.get("likes", []) if uid in users]
 
     # remove duplicates
     liked_ids = [str(x["id"]) for x in likes]
@@ -535,13 +424,9 @@ def create_story_page():
 @stories_bp.route("/activity_count/<int:story_id>")
 def activity_count(story_id):
 
-    stories = load_stories()
+    likes, views = story_store.activity_counts(story_id)
 
-    for s in stories:
-        if s["id"] == story_id:
-            return jsonify({
-                "likes": len(s.get("likes", [])),
-                "views": len(s.get("viewers", []))
-            })
-
-    return jsonify({"likes":0,"views":0})
+    return jsonify({
+        "likes": likes,
+        "views": views
+    })
@@ -0,0 +1,352 @@
+import json
+import os
+import time
+
+import db
+from routes import blobs
+
+try:
+    import fcntl
+except ImportError:   # windows dev machine: lock nahi, idempotent import hi kaafi
+    fcntl = None
+
+# ===============================
+# 📦 STORY STORE (SQLite)
+# ===============================
+# Pehle saari stories data/stories.json me thi aur har feed load pe
+# poori file rewrite hoti thi. Ab:
+#   stories      (id, user_id, filename, timestamp, ...)  idx (user_id, timestamp)
+#   story_views  (story_id, viewer_id)                    PRIMARY KEY
+#   story_likes  (story_id, user_id)                      PRIMARY KEY
+#
+# Return shape purane JSON jaisa hi hai (user_id / viewers / likes string me)
+# taaki templates aur callers same rahen.
+#
+# Nayi stories ka filename blob naam hai (routes/blobs.py); delete / expire
+# usi transaction me blob reference chhodte hain.
+
+EXPIRE_SECONDS = 24 * 60 * 60
+
+LEGACY_STORY_FILE = os.path.join("data", "stories.json")
+IMPORT_LOCK_FILE = os.path.join("data", "story_import.lock")
+
+
+def now_ts():
+    return int(time.time())
+
+
+def _marks(ids):
+    return ",".join("?" * len(ids))
+
+
+def _activity(c, table, col, story_ids, order):
+    out = {sid: [] for sid in story_ids}
+
+    if not story_ids:
+        return out
+
+    c.execute(f"""
+        SELECT story_id, {col}
+        FROM {table}
+        WHERE story_id IN ({_marks(story_ids)})
+        ORDER BY story_id, {order}
+    """, story_ids)
+
+    for story_id, uid in c.fetchall():
+        out[story_id].append(str(uid))
+
+    return out
+
+
+def _rows_to_stories(c, rows, with_activity=True):
+    ids = [r[0] for r in rows]
+
+    viewers = _activity(c, "story_views", "viewer_id", ids, "viewed_at") if with_activity else {}
+    likes = _activity(c, "story_likes", "user_id", ids, "created_at") if with_activity else {}
+
+    return [{
+        "id": sid,
+        "user_id": str(uid),
+        "filename": filename,
+        "timestamp": ts,
+        "viewers": viewers.get(sid, []),
+        "likes": likes.get(sid, [])
+    } for sid, uid, filename, ts in rows]
+
+
+# -------------------------
+# ADD
+# -------------------------
+def add_story(user_id, filename, ts=None):
+    ts = ts or now_ts()
+
+    conn = db.connect()
+    c = conn.cursor()
+
+    # media_path / expires_at bhi bharo taaki /social/stories bhi dekh sake
+    c.execute("""
+        INSERT INTO stories (user_id, filename, timestamp, media_path, created_at, expires_at)
+        VALUES (?, ?, ?, ?, datetime(?, 'unixepoch'), datetime(?, 'unixepoch'))
+    """, (user_id, filename, ts, "/stories/media/" + filename, ts, ts + EXPIRE_SECONDS))
+
+    story_id = c.lastrowid
+
+    if blobs.is_blob(filename):
+        blobs.attach(c, "story", story_id, filename)
+
+    conn.commit()
+    conn.close()
+
+    return story_id
+
+
+# -------------------------
+# READ (sirf non-expired)
+# -------------------------
+def active_stories(user_id=None, with_activity=True, now=None):
+    cutoff = (now or now_ts()) - EXPIRE_SECONDS
+
+    conn = db.connect()
+    c = conn.cursor()
+
+    if user_id is None:
+        c.execute("""
+            SELECT id, user_id, filename, timestamp
+            FROM stories
+            WHERE filename IS NOT NULL AND timestamp > ?
+            ORDER BY timestamp, id
+        """, (cutoff,))
+    else:
+        c.execute("""
+            SELECT id, user_id, filename, timestamp
+            FROM stories
+            WHERE user_id=? AND filename IS NOT NULL AND timestamp > ?
+            ORDER BY timestamp, id
+        """, (user_id, cutoff))
+
+    stories = _rows_to_stories(c, c.fetchall(), with_activity)
+
+    conn.close()
+    return stories
+
+
+def get_story(story_id):
+    conn = db.connect()
+    c = conn.cursor()
+
+    c.execute("""
+        SELECT id, user_id, filename, timestamp
+        FROM stories
+        WHERE id=? AND filename IS NOT NULL
+    """, (story_id,))
+
+    rows = c.fetchall()
+    stories = _rows_to_stories(c, rows)
+
+    conn.close()
+    return stories[0] if stories else None
+
+
+# -------------------------
+# VIEW / LIKE
+# -------------------------
+def mark_viewed(story_ids, viewer_id):
+    if not story_ids:
+        return
+
+    conn = db.connect()
+    c = conn.cursor()
+
+    ts = now_ts()
+    c.executemany(
+        "INSERT OR IGNORE INTO story_views (story_id, viewer_id, viewed_at) VALUES (?, ?, ?)",
+        [(sid, viewer_id, ts) for sid in story_ids]
+    )
+
+    conn.commit()
+    conn.close()
+
+
+def toggle_like(story_id, user_id):
+    """True = liked, False = unliked, None = story nahi mili."""
+    conn = db.connect()
+    c = conn.cursor()
+
+    c.execute("SELECT 1 FROM stories WHERE id=? AND filename IS NOT NULL", (story_id,))
+    if not c.fetchone():
+        conn.close()
+        return None
+
+    c.execute("DELETE FROM story_likes WHERE story_id=? AND user_id=?", (story_id, user_id))
+
+    if c.rowcount:
+        liked = False
+    else:
+        c.execute(
+            "INSERT INTO story_likes (story_id, user_id, created_at) VALUES (?, ?, ?)",
+            (story_id, user_id, now_ts())
+        )
+        liked = True
+
+    conn.commit()
+    conn.close()
+    return liked
+
+
+def activity_counts(story_id):
+    conn = db.connect()
+    c = conn.cursor()
+
+    c.execute("SELECT COUNT(*) FROM story_likes WHERE story_id=?", (story_id,))
+    likes = c.fetchone()[0]
+
+    c.execute("SELECT COUNT(*) FROM story_views WHERE story_id=?", (story_id,))
+    views = c.fetchone()[0]
+
+    conn.close()
+    return likes, views
+
+
+# -------------------------
+# DELETE / EXPIRE
+# -------------------------
+def _delete_rows(c, story_ids):
+    marks = _marks(story_ids)
+    c.execute(f"DELETE FROM story_views WHERE story_id IN ({marks})", story_ids)
+    c.execute(f"DELETE FROM story_likes WHERE story_id IN ({marks})", story_ids)
+    c.execute(f"DELETE FROM stories WHERE id IN ({marks})", story_ids)
+    blobs.release(c, "story", story_ids)
+
+
+def delete_story(story_id, user_id):
+    """Owner ki story delete. Filename return (file hatane ke liye) ya None."""
+    conn = db.connect()
+    c = conn.cursor()
+
+    c.execute(
+        "SELECT filename FROM stories WHERE id=? AND user_id=? AND filename IS NOT NULL",
+        (story_id, user_id)
+    )
+    row = c.fetchone()
+
+    if not row:
+        conn.close()
+        return None
+
+    _delete_rows(c, [story_id])
+
+    conn.commit()
+    conn.close()
+    return row[0]
+
+
+def expire_stories(now=None, limit=500):
+    """Expired stories ke rows hatao. Deleted filenames return hote hain."""
+    cutoff = (now or now_ts()) - EXPIRE_SECONDS
+
+    conn = db.connect()
+    c = conn.cursor()
+
+    c.execute("""
+        SELECT id, filename
+        FROM stories
+        WHERE filename IS NOT NULL AND timestamp <= ?
+        ORDER BY timestamp
+        LIMIT ?
+    """, (cutoff, limit))
+    rows = c.fetchall()
+
+    if rows:
+        _delete_rows(c, [r[0] for r in rows])
+        conn.commit()
+
+    conn.close()
+    return [r[1] for r in rows]
+
+
+# ===============================
+# 📥 ONE-SHOT IMPORT (data/stories.json -> SQLite)
+# ===============================
+def import_legacy_json(path=LEGACY_STORY_FILE):
+    """Purani JSON stories import karo; file ko *.imported rename kar dete hain.
+
+    Har gunicorn worker startup pe call karta hai: flock se ek waqt me ek
+    hi importer, aur jo filename pehle se hai woh skip (dobara chale to
+    duplicate nahi)."""
+    if not os.path.exists(path):
+        return 0
+
+    if fcntl is None:
+        return _import_legacy(path)
+
+    os.makedirs(os.path.dirname(IMPORT_LOCK_FILE), exist_ok=True)
+    with open(IMPORT_LOCK_FILE, "a") as handle:
+        # blocking: dusra worker import khatam hone tak ruke, phir file gayab milegi
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            return _import_legacy(path)
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _import_legacy(path):
+    if not os.path.exists(path):
+        return 0
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            legacy = json.load(f)
+    except (OSError, ValueError):
+        return 0
+
+    if not legacy:
+        return 0
+
+    conn = db.connect()
+    c = conn.cursor()
+
+    imported = 0
+
+    for s in legacy:
+        filename = s.get("filename")
+        ts = int(s.get("timestamp", 0))
+
+        if not filename or not s.get("user_id"):
+            continue
+
+        # pichle (adhoore / parallel) run me aa chuki
+        c.execute("SELECT 1 FROM stories WHERE filename=?", (filename,))
+        if c.fetchone():
+            continue
+
+        # purani id free ho to wahi rakho (story_replies.json me reference hai)
+        c.execute("SELECT 1 FROM stories WHERE id=?", (s.get("id"),))
+        keep_id = s.get("id") if s.get("id") and not c.fetchone() else None
+
+        c.execute("""
+            INSERT INTO stories (id, user_id, filename, timestamp, media_path, created_at, expires_at)
+            VALUES (?, ?, ?, ?, ?, datetime(?, 'unixepoch'), datetime(?, 'unixepoch'))
+        """, (keep_id, int(s["user_id"]), filename, ts,
+              "/stories/media/" + filename, ts, ts + EXPIRE_SECONDS))
+        story_id = c.lastrowid
+
+        c.executemany(
+            "INSERT OR IGNORE INTO story_views (story_id, viewer_id, viewed_at) VALUES (?, ?, ?)",
+            [(story_id, int(v), ts) for v in s.get("viewers", [])]
+        )
+        c.executemany(
+            "INSERT OR IGNORE INTO story_likes (story_id, user_id, created_at) VALUES (?, ?, ?)",
+            [(story_id, int(u), ts) for u in s.get("likes", [])]
+        )
+
+        imported += 1
+
+    conn.commit()
+    conn.close()
+
+    os.replace(path, path + ".imported")
+    return imported
+
+
+if __name__ == "__main__":
+    print(f"✅ imported {import_legacy_json()} stories")
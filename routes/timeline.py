@@ -0,0 +1,118 @@
+# ===============================
+# 🏠 HOME TIMELINE (fan-out-on-write)
+# ===============================
+# Pehle /posts/feed sabke posts global order me dikhata tha, follow ka
+# koi filter nahi. Seedha filter lagana =
+#   posts WHERE user_id IN (SELECT following_id ...)   har load pe scan.
+#
+# Ab publish ke waqt hi post har follower (aur khud author) ki timeline
+# me likh dete hain:
+#   timeline (owner_id, post_id, author_id, created_at)
+#   home feed = WHERE owner_id=? AND post_id < ? ORDER BY post_id DESC
+# -> ek indexed range scan, posts.id cursor pe keyset pagination.
+#
+# Bahut followers wale accounts (> FANOUT_LIMIT) ke posts fan-out nahi
+# hote (posts.fanned_out = 0). Read pe woh followed authors ke partial
+# index (idx_posts_pull) se merge hote hain (fan-out-on-read).
+# fanned_out ka default 0 hai, to koi publish path fan_out() bhool bhi
+# jaye to post read path se dikh jata hai.
+#
+#   follow   -> backfill(): author ke recent fanned-out posts
+#   unfollow -> trim(): author ki rows hatao
+#   post delete -> trigger (migration 014)
+
+from routes.feed_assembler import FEED_PAGE_SIZE, MAX_PAGE_SIZE
+
+FANOUT_LIMIT = 5000          # isse zyada followers -> fan-out-on-read
+BACKFILL_LIMIT = 200         # follow pe author ke itne recent posts
+MAX_POST_ID = 2 ** 63 - 1
+
+
+# -------------------------
+# WRITE (caller ke transaction me)
+# -------------------------
+def follower_count(c, user_id):
+    c.execute("SELECT COUNT(*) FROM follows WHERE following_id=?", (user_id,))
+    return c.fetchone()[0]
+
+
+def fan_out(c, post_id, author_id):
+    """Naya post followers + author ki timeline me. Kitni rows likhi (0 = pull)."""
+    if follower_count(c, author_id) > FANOUT_LIMIT:
+        return 0
+
+    c.execute("SELECT created_at FROM posts WHERE id=?", (post_id,))
+    row = c.fetchone()
+    created_at = row[0] if row else None
+
+    c.execute("""
+        INSERT OR IGNORE INTO timeline (owner_id, post_id, author_id, created_at)
+        SELECT follower_id, ?, ?, ? FROM follows WHERE following_id=?
+        UNION
+        SELECT ?, ?, ?, ?
+    """, (post_id, author_id, created_at, author_id,
+          author_id, post_id, author_id, created_at))
+    written = c.rowcount
+
+    c.execute("UPDATE posts SET fanned_out=1 WHERE id=?", (post_id,))
+    return written
+
+
+def backfill(c, owner_id, author_id, limit=BACKFILL_LIMIT):
+    """Follow hua: author ke recent (push wale) posts meri timeline me."""
+    c.execute("""
+        INSERT OR IGNORE INTO timeline (owner_id, post_id, author_id, created_at)
+        SELECT ?, id, user_id, created_at
+        FROM posts
+        WHERE user_id=? AND fanned_out=1
+        ORDER BY id DESC
+        LIMIT ?
+    """, (owner_id, author_id, limit))
+    return c.rowcount
+
+
+def trim(c, owner_id, author_id):
+    """Unfollow hua: author ki rows meri timeline se."""
+    c.execute("DELETE FROM timeline WHERE owner_id=? AND author_id=?", (owner_id, author_id))
+    return c.rowcount
+
+
+# -------------------------
+# READ
+# rows: (id, owner_id, username, photo, caption) -> assemble_posts() jaisa
+# -------------------------
+def load_home_rows(c, user_id, before=None, limit=FEED_PAGE_SIZE):
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    before = before or MAX_POST_ID
+
+    c.execute("""
+        SELECT posts.id, posts.user_id, users.username, users.photo, posts.caption
+        FROM (
+            SELECT * FROM (
+                SELECT post_id AS id FROM timeline
+                WHERE owner_id=? AND post_id < ?
+                ORDER BY post_id DESC
+                LIMIT ?
+            )
+            UNION
+            SELECT * FROM (
+                SELECT id FROM posts
+                WHERE fanned_out=0 AND id < ? AND user_id IN (
+                    SELECT following_id FROM follows WHERE follower_id=?
+                    UNION SELECT ?
+                )
+                ORDER BY id DESC
+                LIMIT ?
+            )
+        ) AS page
+        JOIN posts ON posts.id = page.id
+        JOIN users ON users.id = posts.user_id
+        ORDER BY posts.id DESC
+        LIMIT ?
+    """, (user_id, before, limit, before, user_id, user_id, limit, limit))
+    rows = c.fetchall()
+
+    # poora page mila -> aur posts ho sakte hain
+    next_before = rows[-1][0] if len(rows) == limit else None
+
+    return rows, next_before
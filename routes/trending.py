@@ -0,0 +1,171 @@
+# ===============================
+# 🔥 TRENDING (time-decayed hot score)
+# ===============================
+# Pehle social.explore har request pe
+#   posts LEFT JOIN likes GROUP BY posts.id ORDER BY likecount DESC
+# chalata tha: poore likes pe aggregate, aur purana viral post hamesha
+# upar (likes kabhi decay nahi hote).
+#
+# Ab har engagement event (like, comment, save, share, view) usi
+# transaction me item ka hot score badhata hai:
+#   hot(now) = SUM( weight * exp(-DECAY * (now - event_time)) )
+#
+# Score DB me log-space me, fixed EPOCH ke relative rakha hai:
+#   hot_scores.score = log( SUM weight * exp(DECAY * (event_time - EPOCH)) )
+# -> sab items ek hi factor se decay hote hain, isliye ORDER BY score
+# hi current trending order hai; koi rewrite / overflow nahi.
+# idx_hot_scores_rank (kind, score) pe top-K = K rows ka index walk.
+#
+# Decay pass (sweeper) jinka current hot MIN_SCORE se neeche gir gaya
+# unki rows hata deta hai, par har kind ke top TOP_K hamesha rehte hain:
+# shaant din me bhi explore khaali nahi (sabse kam thande items hi dikhenge).
+#
+# Like / save toggle ho sakte hain: bump_once har (user, item, event) ka
+# sirf pehla event ginta hai (hot_events), warna like / unlike dabate
+# raho aur item top pe. Unlike / unsave score kam nahi karte.
+# Item delete -> remove() (triggers bhi hain, par delete path seedha saaf karta hai).
+
+import math
+import time
+
+import db
+
+HALF_LIFE = 12 * 60 * 60     # 12 ghante me score aadha
+DECAY = math.log(2) / HALF_LIFE
+EPOCH = 1767225600           # 2026-01-01 UTC, fixed reference
+
+WEIGHTS = {
+    "like": 1.0,
+    "comment": 2.0,
+    "save": 3.0,
+    "share": 4.0,
+    "view": 0.1,
+}
+
+KINDS = ("post", "reel")
+
+TOP_K = 100
+MIN_SCORE = 0.05             # isse thanda -> decay pass row hata dega
+
+
+def _log_weight(weight, ts):
+    return math.log(weight) + DECAY * (ts - EPOCH)
+
+
+def _log_add(a, b):
+    hi, lo = max(a, b), min(a, b)
+    return hi + math.log1p(math.exp(lo - hi))
+
+
+def hot(score, now=None):
+    """Stored log-score -> abhi ka hot value."""
+    return math.exp(score - DECAY * ((now or time.time()) - EPOCH))
+
+
+# -------------------------
+# EVENTS (caller ke write transaction me)
+# -------------------------
+def bump(c, kind, item_id, event, n=1, ts=None):
+    weight = WEIGHTS[event] * n
+    if weight <= 0:
+        return
+
+    ts = ts or time.time()
+    add = _log_weight(weight, ts)
+
+    # caller pehle hi write kar chuka (lock uske paas) -> read-modify-write safe
+    c.execute("SELECT score FROM hot_scores WHERE kind=? AND item_id=?", (kind, item_id))
+    row = c.fetchone()
+    score = _log_add(row[0], add) if row else add
+
+    c.execute("""
+        INSERT INTO hot_scores (kind, item_id, score, updated_at)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(kind, item_id) DO UPDATE SET
+            score = excluded.score, updated_at = excluded.updated_at
+    """, (kind, item_id, score, int(ts)))
+
+
+def bump_once(c, kind, item_id, event, user_id, ts=None):
+    """Like / save: har user ka pehla event hi score me (toggle spam nahi)."""
+    c.execute("""
+        INSERT OR IGNORE INTO hot_events (kind, item_id, event, user_id)
+        VALUES (?, ?, ?, ?)
+    """, (kind, item_id, event, user_id))
+
+    if c.rowcount:
+        bump(c, kind, item_id, event, ts=ts)
+
+
+def remove(c, kind, item_id):
+    """Item delete hua: trending slot khaali (caller ke transaction me)."""
+    c.execute("DELETE FROM hot_scores WHERE kind=? AND item_id=?", (kind, item_id))
+    c.execute("DELETE FROM hot_events WHERE kind=? AND item_id=?", (kind, item_id))
+
+
+def bump_many(c, kind, counts, event, ts=None):
+    """{item_id: n} -> ek event type ke batch (counters.flush)."""
+    for item_id, n in counts.items():
+        bump(c, kind, item_id, event, n, ts)
+
+
+# -------------------------
+# TOP-K
+# -------------------------
+def top(c, kind, limit=TOP_K, offset=0):
+    """[(item_id, hot), ...] sabse garam pehle."""
+    c.execute("""
+        SELECT item_id, score FROM hot_scores
+        WHERE kind=?
+        ORDER BY score DESC
+        LIMIT ? OFFSET ?
+    """, (kind, limit, offset))
+
+    now = time.time()
+    return [(item_id, hot(score, now)) for item_id, score in c.fetchall()]
+
+
+# -------------------------
+# DECAY PASS (sweeper)
+# -------------------------
+def decay(now=None, keep=TOP_K):
+    """Thande items hatao (top `keep` chhod ke). Kitni rows gayi."""
+    cutoff = math.log(MIN_SCORE) + DECAY * ((now or time.time()) - EPOCH)
+
+    conn = db.connect()
+    c = conn.cursor()
+
+    removed = 0
+    for kind in KINDS:
+        # top-K ka sabse neecha score; usse upar wale kabhi nahi hatte
+        c.execute("""
+            SELECT score FROM hot_scores
+            WHERE kind=?
+            ORDER BY score DESC
+            LIMIT 1 OFFSET ?
+        """, (kind, keep - 1))
+        floor = c.fetchone()
+
+        if floor is None:
+            continue
+
+        c.execute("DELETE FROM hot_scores WHERE kind=? AND score < ?", (kind, min(cutoff, floor[0])))
+        removed += c.rowcount
+
+    conn.commit()
+    conn.close()
+    return removed
+
+
+def stats():
+    conn = db.connect()
+    c = conn.cursor()
+    c.execute("SELECT kind, COUNT(*) FROM hot_scores GROUP BY kind")
+    counts = dict(c.fetchall())
+    conn.close()
+
+    return {
+        "items": counts,
+        "half_life_s": HALF_LIFE,
+        "min_score": MIN_SCORE,
+    }
@@ -0,0 +1,200 @@
+# ===============================
+# 🔤 USERNAME PREFIX INDEX (process-local)
+# ===============================
+# Register page har keystroke pe /auth/check_username maarta hai, jo
+# `lower(username)=lower(?)` chalata tha — expression pe koi index nahi,
+# har baar poori users table scan.
+#
+# Ab har process ke paas memory me sorted array:
+#   _keys   [(normalized, user_id), ...]   bisect -> taken / prefix O(log n)
+#   _names  user_id -> (normalized, username)
+#
+# Startup pe load(); register / profile rename ke commit ke baad
+# add() / rename() se current rehta hai. Dusre worker ka rename yahan
+# REFRESH_INTERVAL tak nahi dikhta, isliye pakka faisla (signup / rename
+# save) taken(c, ...) karta hai: index "free" bole to DB se confirm
+# (migration 013 ka lower(username) expression index).
+#
+# Refresh keystroke request pe nahi: _ensure background task chalata hai
+# (follow_graph jaisa), ek waqt me ek hi; tab tak purane arrays se jawab.
+
+import bisect
+import threading
+import time
+
+import db
+from socketio_init import socketio
+
+REFRESH_INTERVAL = 60        # seconds, dusre processes ke changes ke liye
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+_lock = threading.Lock()
+
+_keys = []                   # sorted (normalized, user_id)
+_names = {}                  # user_id -> (normalized, username)
+_loaded_at = 0
+_reloading = False           # single-flight: background reload chal raha hai
+
+metrics = {
+    "loads": 0,
+    "load_errors": 0,
+    "lookups": 0,
+    "db_fallbacks": 0,
+}
+
+
+def normalize(name):
+    """SQLite lower() jaisa: sirf strip + lowercase."""
+    return (name or "").strip().lower()
+
+
+# -------------------------
+# LOAD
+# -------------------------
+def load():
+    global _keys, _names, _loaded_at
+
+    conn = db.connect()
+    c = conn.cursor()
+    c.execute("SELECT id, username FROM users WHERE username IS NOT NULL")
+    rows = c.fetchall()
+    conn.close()
+
+    names = {uid: (normalize(name), name) for uid, name in rows}
+    keys = sorted((key, uid) for uid, (key, _) in names.items())
+
+    with _lock:
+        _keys, _names = keys, names
+        _loaded_at = time.time()
+        metrics["loads"] += 1
+
+    return len(keys)
+
+
+def _reload():
+    global _reloading
+
+    try:
+        load()
+    except Exception as e:
+        metrics["load_errors"] += 1
+        print("USERNAME INDEX LOAD ERROR:", e)
+    finally:
+        _reloading = False
+
+
+def _ensure():
+    global _reloading
+
+    if time.time() - _loaded_at <= REFRESH_INTERVAL:
+        return
+
+    with _lock:
+        if _reloading:
+            return
+        _reloading = True
+
+    # server abhi init nahi (CLI / startup) -> yahin load
+    if socketio.server is None:
+        _reload()
+    else:
+        socketio.start_background_task(_reload)
+
+
+# -------------------------
+# HOOKS (commit ke baad call karo)
+# -------------------------
+def _remove(uid):
+    old = _names.pop(uid, None)
+    if old is None:
+        return
+    i = bisect.bisect_left(_keys, (old[0], uid))
+    if i < len(_keys) and _keys[i] == (old[0], uid):
+        del _keys[i]
+
+
+def add(uid, username):
+    """Naya user / rename: index me (purani entry ho to hata ke)."""
+    if not username:
+        return
+
+    key = normalize(username)
+
+    with _lock:
+        _remove(uid)
+        _names[uid] = (key, username)
+        bisect.insort(_keys, (key, uid))
+
+
+def rename(uid, username):
+    add(uid, username)
+
+
+def remove(uid):
+    with _lock:
+        _remove(uid)
+
+
+# -------------------------
+# LOOKUPS
+# -------------------------
+def is_taken(username, exclude_id=None):
+    """Sirf memory: keystroke check ke liye (ho sakta hai REFRESH_INTERVAL purana)."""
+    _ensure()
+    key = normalize(username)
+
+    with _lock:
+        metrics["lookups"] += 1
+        i = bisect.bisect_left(_keys, (key,))
+        while i < len(_keys) and _keys[i][0] == key:
+            if _keys[i][1] != exclude_id:
+                return True
+            i += 1
+
+    return False
+
+
+def taken(c, username, exclude_id=None):
+    """Pakka check (signup / rename save): index miss ho to DB se confirm."""
+    if is_taken(username, exclude_id):
+        return True
+
+    metrics["db_fallbacks"] += 1
+    c.execute(
+        "SELECT id FROM users WHERE lower(username)=lower(?) AND id IS NOT ?",
+        (username.strip(), exclude_id)
+    )
+    return c.fetchone() is not None
+
+
+def prefix(q, limit=DEFAULT_LIMIT):
+    """'vis' -> [{'id', 'username'}, ...] alphabetical, top-k."""
+    _ensure()
+    key = normalize(q)
+    if not key:
+        return []
+
+    limit = max(1, min(int(limit or DEFAULT_LIMIT), MAX_LIMIT))
+
+    with _lock:
+        metrics["lookups"] += 1
+        i = bisect.bisect_left(_keys, (key,))
+        out = []
+        while i < len(_keys) and len(out) < limit and _keys[i][0].startswith(key):
+            uid = _keys[i][1]
+            out.append({"id": uid, "username": _names[uid][1]})
+            i += 1
+
+    return out
+
+
+def stats():
+    with _lock:
+        return {
+            **metrics,
+            "usernames": len(_keys),
+            "reloading": _reloading,
+            "age_s": int(time.time() - _loaded_at) if _loaded_at else None,
+            "refresh_interval_s": REFRESH_INTERVAL,
+        }
@@ -1,9 +1,9 @@
 from flask import Blueprint, render_template, session
 import sqlite3
+import db
 
 posts_bp = Blueprint("posts_bp", __name__, template_folder="../templates")
 
-DB_NAME = "database.db"
 
 @posts_bp.route("/feed")
 def feed():
@@ -13,7 +13,7 @@ def feed():
     photo = "/static/default_dp.png"
 
     if current:
-        conn = sqlite3.connect(DB_NAME)
+        conn = db.connect()
         conn.row_factory = sqlite3.Row
         c = conn.cursor()
 
@@ -0,0 +1,128 @@
+# socket_backplane.py
+# ===============================
+# 📡 SOCKET.IO BACKPLANE (SQLite stand-in)
+# ===============================
+# Multi-process me ek worker ka emit baaki workers ke clients tak
+# message queue (pub/sub) se pahunchta hai. Production me Redis:
+#   SOCKETIO_MESSAGE_QUEUE=redis://localhost:6379/0
+#
+# Redis na ho (tests, ek host pe 2-3 workers) to yeh manager wahi kaam
+# database.db ki socket_events table se karta hai:
+#   SOCKETIO_MESSAGE_QUEUE=sqlite
+#
+#   publish: event row insert (background writer, request ke transaction
+#            ke bahar -> apne hi lock pe nahi atakta; khaali outbox pe
+#            writer event pe soya rehta hai, poll nahi karta)
+#   listen : har POLL_INTERVAL naye rows (id > last) padho
+#   sweeper: RETENTION se purane rows hatata hai
+#
+# Sirf ek host ke processes ke liye hai (ek hi db file); kai hosts = Redis.
+
+import json
+import os
+import time
+from collections import deque
+
+import socketio
+
+import db
+
+POLL_INTERVAL = int(os.environ.get("SOCKETIO_POLL_MS", 50)) / 1000.0
+RETENTION = 60               # seconds, itne purane events sweeper hatata hai
+BATCH = 500
+
+
+class SQLiteManager(socketio.PubSubManager):
+    name = "sqlite"
+
+    def __init__(self, channel="inschat", write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self._outbox = deque()
+        self._wake = None
+        self._writer = None
+
+    # -------------------------
+    # PUBLISH
+    # -------------------------
+    def _write(self, messages):
+        conn = db.connect()
+        c = conn.cursor()
+        ts = int(time.time())
+        c.executemany(
+            "INSERT INTO socket_events (channel, payload, created_at) VALUES (?, ?, ?)",
+            [(self.channel, json.dumps(m), ts) for m in messages]
+        )
+        conn.commit()
+        conn.close()
+
+    def _publish(self, data):
+        # CLI emitter (python sweeper.py): seedha likho
+        if self.write_only:
+            self._write([data])
+            return
+
+        if self._writer is None:
+            # async_mode ke hisaab se event (threading / gevent / eventlet)
+            self._wake = self.server.eio.create_event()
+            self._writer = self.server.start_background_task(self._write_loop)
+
+        self._outbox.append(data)
+        self._wake.set()
+
+    def _write_loop(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+
+            while self._outbox:
+                batch = []
+                while self._outbox and len(batch) < BATCH:
+                    batch.append(self._outbox.popleft())
+
+                try:
+                    self._write(batch)
+                except Exception as e:
+                    # agli baar dobara (order same rehta hai)
+                    self._outbox.extendleft(reversed(batch))
+                    print("SOCKET BACKPLANE WRITE ERROR:", e)
+                    self.server.sleep(POLL_INTERVAL)
+
+    # -------------------------
+    # LISTEN
+    # -------------------------
+    def _listen(self):
+        conn = db.connect()
+        c = conn.cursor()
+        c.execute("SELECT COALESCE(MAX(id), 0) FROM socket_events")
+        last_id = c.fetchone()[0]
+        conn.close()
+
+        while True:
+            conn = db.connect()
+            c = conn.cursor()
+            c.execute("""
+                SELECT id, payload FROM socket_events
+                WHERE id > ? AND channel=?
+                ORDER BY id
+                LIMIT ?
+            """, (last_id, self.channel, BATCH))
+            rows = c.fetchall()
+            conn.close()
+
+            for event_id, payload in rows:
+                last_id = event_id
+                yield payload
+
+            if len(rows) < BATCH:
+                self.server.sleep(POLL_INTERVAL)
+
+
+def prune(retention=RETENTION):
+    """Sweeper: purane events hatao. Kitne gaye."""
+    conn = db.connect()
+    c = conn.cursor()
+    c.execute("DELETE FROM socket_events WHERE created_at < ?", (int(time.time()) - retention,))
+    n = c.rowcount
+    conn.commit()
+    conn.close()
+    return n
@@ -1,6 +1,77 @@
+import os
+
 from flask_socketio import SocketIO
 
+# ===============================
+# 📡 MULTI-PROCESS SOCKET.IO
+# ===============================
+# SOCKETIO_MESSAGE_QUEUE
+#   (khaali)               ek hi process: emit sirf usi process ke clients tak
+#   redis://host:6379/0    production: sab workers / hosts Redis pub/sub se
+#   sqlite                 local stand-in: ek host ke processes socket_events
+#                          table se (socket_backplane.py), tests / chhota deploy
+# SOCKETIO_CHANNEL         ek Redis pe do apps hon to alag naam
+# SOCKETIO_ASYNC_MODE      threading / gevent / eventlet (gunicorn.conf.py set karta hai)
+#
+# Env init_app ke time padha jata hai (app.py ka load_dotenv import ke baad chalta hai).
+#
+#   app.py       -> socketio_init.init_app(app)
+#   python sweeper.py / jobs.py -> socketio_init.init_emitter()   (sirf emit)
+
 socketio = SocketIO(
     cors_allowed_origins="*",
     manage_session=True
 )
+
+
+def message_queue():
+    return os.environ.get("SOCKETIO_MESSAGE_QUEUE", "").strip()
+
+
+def channel():
+    return os.environ.get("SOCKETIO_CHANNEL", "inschat")
+
+
+def queue_options(write_only=False):
+    url = message_queue()
+    if not url:
+        return {}
+
+    if url == "sqlite":
+        from socket_backplane import SQLiteManager
+        return {"client_manager": SQLiteManager(channel=channel(), write_only=write_only)}
+
+    # redis:// , kafka:// , amqp:// -> flask-socketio khud manager chunta hai
+    return {"message_queue": url, "channel": channel()}
+
+
+def init_app(app):
+    options = queue_options()
+
+    # auto-detect gevent worker me bhi eventlet utha leta (dono installed)
+    async_mode = os.environ.get("SOCKETIO_ASYNC_MODE")
+    if async_mode:
+        options["async_mode"] = async_mode
+
+    socketio.init_app(app, **options)
+
+
+def init_emitter():
+    """Web server ke bina process (CLI): emits queue se clients tak."""
+    if not message_queue():
+        return False
+
+    socketio.init_app(None, **queue_options(write_only=True))
+    return True
+
+
+def stats():
+    server = socketio.server
+    url = message_queue()
+    return {
+        "message_queue": url.split("@")[-1] or None,   # password log na ho
+        "manager": getattr(server.manager, "name", "memory") if server else None,
+        "channel": channel() if url else None,
+        "async_mode": server.eio.async_mode if server else None,
+        "pid": os.getpid(),
+    }
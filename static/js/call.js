@@ -2,7 +2,8 @@
 const socket = window.socket || io({
   reconnection: true,
   reconnectionAttempts: Infinity,
-  reconnectionDelay: 1000
+  reconnectionDelay: 1000,
+  transports: ["websocket"]   // polling ko sticky session chahiye, websocket ko nahi
 });
 
 window.socket = socket;
@@ -0,0 +1,204 @@
+// ===============================
+// 📜 FEED INFINITE SCROLL
+// /posts/api/feed?before=<id> se agla page laata hai
+// card markup templates/post_card.html jaisa hi hai
+// ===============================
+(function(){
+
+const list = document.getElementById("feed-list");
+const sentinel = document.getElementById("feed-sentinel");
+
+if(!list || !sentinel) return;
+
+let before = sentinel.dataset.before;
+let loading = false;
+
+function esc(v){
+    return String(v == null ? "" : v)
+        .replace(/&/g, "&amp;")
+        .replace(/</g, "&lt;")
+        .replace(/>/g, "&gt;")
+        .replace(/"/g, "&quot;")
+        .replace(/'/g, "&#39;");
+}
+
+const IMG_SIZES = "(min-width: 640px) 600px, 100vw";
+
+function imagesHtml(post){
+
+    const imgs = post.image_variants || (post.images || []).map(src => ({ src, srcset: "" }));
+
+    if(imgs.length > 1){
+        return `
+        <div class="carousel">
+          <div id="track-${post.id}" class="carousel-track no-scrollbar">
+            ${imgs.map(v => `
+            <img src="${esc(v.src)}"
+                 srcset="${esc(v.srcset)}"
+                 sizes="${IMG_SIZES}"
+                 ondblclick="doubleTapLike(${post.id})"
+                 ontouchend="onImageTap(${post.id})">`).join("")}
+          </div>
+          <button class="carousel-btn left" onclick="scrollByTrack('${post.id}', -1)">‹</button>
+          <button class="carousel-btn right" onclick="scrollByTrack('${post.id}', +1)">›</button>
+        </div>`;
+    }
+
+    if(imgs.length === 1){
+        return `
+        <img src="${esc(imgs[0].src)}"
+             srcset="${esc(imgs[0].srcset)}"
+             sizes="${IMG_SIZES}"
+             class="w-full h-auto block"
+             ondblclick="doubleTapLike(${post.id})"
+             ontouchend="onImageTap(${post.id})">`;
+    }
+
+    return `<div class="p-12 text-center text-gray-400">No Image</div>`;
+}
+
+function ownerMenuHtml(post){
+
+    if(String(post.owner_id) !== String(window.me)) return "";
+
+    return `
+        <div class="relative">
+          <button onclick="toggleMenu(${post.id})" class="text-2xl text-gray-600">⋮</button>
+          <div id="menu-${post.id}"
+               class="hidden absolute right-0 top-8 bg-white border rounded-lg shadow-lg w-32 z-50">
+            <a href="/posts/${post.id}" class="block px-4 py-2 hover:bg-gray-100">View</a>
+            <form method="POST" action="/posts/delete/${post.id}"
+                  onsubmit="return confirm('Delete this post?')">
+              <button type="submit"
+                      class="w-full text-left px-4 py-2 text-red-500 hover:bg-gray-100">Delete</button>
+            </form>
+          </div>
+        </div>`;
+}
+
+function renderPostCard(post){
+
+    let ring = "";
+    if(post.has_story && !post.story_seen) ring = "story-active";
+    else if(post.story_seen) ring = "story-seen";
+
+    const liked = post.liked_by_me;
+    const saved = post.saved_by_me;
+
+    const card = document.createElement("div");
+    card.className = "bg-white/95 backdrop-blur-xl rounded-3xl shadow-2xl overflow-hidden border border-white/30";
+
+    card.innerHTML = `
+<div class="flex items-center justify-between px-4 py-3">
+    <a href="/profile/${esc(post.owner_id)}" class="flex items-center space-x-3">
+      <div class="${ring}">
+        <img src="${esc(post.photo_thumb || post.photo)}"
+             class="w-10 h-10 rounded-full object-cover"
+             onerror="this.src='/static/default_dp.png'">
+      </div>
+      <div class="font-semibold hover:text-cyan-400 transition">@${esc(post.username)}</div>
+    </a>
+    ${ownerMenuHtml(post)}
+</div>
+
+<div class="relative">
+  ${imagesHtml(post)}
+
+  <div class="heart" id="heart-${post.id}">
+    <span class="h h1">💞</span>
+  </div>
+
+  <div class="px-4 pt-3">
+    <div class="flex items-center justify-between">
+      <div class="flex items-center gap-4">
+
+        <button id="like-btn-${post.id}" onclick="toggleLike(${post.id}, this)">
+          <svg class="w-8 h-8 transition-all duration-300 hover:scale-125 ${liked ? "text-pink-500" : ""}"
+               viewBox="0 0 24 24"
+               fill="${liked ? "currentColor" : "none"}"
+               stroke="currentColor" stroke-width="1.8"
+               stroke-linecap="round" stroke-linejoin="round">
+            <path d="M12 21 C11.2 20.4 3.5 15.4 3.5 9 C3.5 5.8 5.8 3.5 8.8 3.5 C10.7 3.5 11.8 4.4 12 5.7 C12.2 4.4 13.3 3.5 15.2 3.5 C18.2 3.5 20.5 5.8 20.5 9 C20.5 15.4 12.8 20.4 12 21Z"/>
+          </svg>
+        </button>
+
+        <button onclick="openComment(${post.id})" class="icon-btn">
+          <svg class="w-7 h-7" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="1.8">
+            <path stroke-linecap="round" stroke-linejoin="round"
+                  d="M21 15a4 4 0 01-4 4H8l-5 3V7a4 4 0 014-4h10a4 4 0 014 4z"/>
+          </svg>
+        </button>
+
+        <button onclick="openShare(${post.id})" class="icon-btn">
+          <svg class="w-7 h-7" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="1.8">
+            <path stroke-linecap="round" stroke-linejoin="round" d="M4 12v8a2 2 0 002 2h12a2 2 0 002-2v-8"/>
+            <path stroke-linecap="round" stroke-linejoin="round" d="M16 6l-4-4-4 4M12 2v14"/>
+          </svg>
+        </button>
+
+      </div>
+
+      <button id="save-btn-${post.id}" onclick="toggleSave(${post.id}, this)">
+        <svg class="w-7 h-7 ${saved ? "text-black" : ""}"
+             viewBox="0 0 24 24"
+             fill="${saved ? "currentColor" : "none"}"
+             stroke="currentColor" stroke-width="1.8">
+          <path stroke-linecap="round" stroke-linejoin="round"
+                d="M6 3h12a1 1 0 011 1v17l-7-4-7 4V4a1 1 0 011-1z"/>
+        </svg>
+      </button>
+    </div>
+
+    <div id="likes-count-${post.id}" class="mt-2 font-semibold text-sm">
+      ${post.likes} likes
+    </div>
+  </div>
+</div>`;
+
+    return card;
+}
+
+async function loadMore(){
+
+    if(loading || !before) return;
+    loading = true;
+
+    try{
+
+        const res = await fetch("/posts/api/feed?before=" + encodeURIComponent(before));
+        const data = await res.json();
+
+        if(data.ok){
+            data.posts.forEach(post => {
+                list.insertBefore(renderPostCard(post), sentinel);
+            });
+
+            before = data.next_before ? String(data.next_before) : "";
+        }
+
+    }catch(e){
+        console.log(e);
+    }
+
+    loading = false;
+
+    if(!before && observer) observer.disconnect();
+}
+
+let observer = null;
+
+if("IntersectionObserver" in window){
+    observer = new IntersectionObserver(entries => {
+        if(entries.some(e => e.isIntersecting)) loadMore();
+    }, { rootMargin: "600px" });
+
+    observer.observe(sentinel);
+}else{
+    window.addEventListener("scroll", () => {
+        if(window.innerHeight + window.scrollY >= document.body.offsetHeight - 600){
+            loadMore();
+        }
+    });
+}
+
+})();
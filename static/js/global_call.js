@@ -5,7 +5,8 @@ if (typeof io !== "undefined" && window.me) {
     window.socket = window.socket || io({
         reconnection: true,
         reconnectionAttempts: Infinity,
-        reconnectionDelay: 1000
+        reconnectionDelay: 1000,
+        transports: ["websocket"]   // polling ko sticky session chahiye, websocket ko nahi
     });
 
     const globalSocket = window.socket;
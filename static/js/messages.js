@@ -14,7 +14,8 @@ document.addEventListener("DOMContentLoaded", () => {
 window.socket = window.socket || io({
     reconnection: true,
     reconnectionAttempts: Infinity,
-    reconnectionDelay: 1000
+    reconnectionDelay: 1000,
+    transports: ["websocket"]   // polling ko sticky session chahiye, websocket ko nahi
 });
 const socket = window.socket;
 
@@ -85,7 +86,7 @@ let editingMessageId = null;
     }
 
 /* ================= RENDER ================= */
-function renderMessage(m, isMine){
+function renderMessage(m, isMine, older){
     if(!messagesArea || !m) return;
 
     const row = document.createElement("div");
@@ -170,6 +171,13 @@ bubble.addEventListener("touchend", () => {
 
     bubble.appendChild(meta);
     row.appendChild(bubble);
+
+    // purane page ke messages upar lagte hain, scroll nahi hilta
+    if(older){
+        messagesArea.insertBefore(row, messagesArea.firstChild);
+        return;
+    }
+
     messagesArea.appendChild(row);
 
     scrollBottom();
@@ -182,6 +190,54 @@ bubble.addEventListener("touchend", () => {
         });
     }
 
+    /* ================= LOAD OLDER (before_id cursor) ================= */
+    let hasOlder = !!window.hasOlder;
+    let loadingOlder = false;
+    let olderTimer = null;
+    const OLDER_TIMEOUT_MS = 8000;   // reply na aaye (disconnect / server error) to paging phir chalu
+
+    function olderDone(){
+        loadingOlder = false;
+        clearTimeout(olderTimer);
+        olderTimer = null;
+    }
+
+    function oldestId(){
+        const first = messagesArea && messagesArea.querySelector(".msg-row");
+        return first ? Number(first.dataset.id) : null;
+    }
+
+    if(messagesArea){
+        messagesArea.addEventListener("scroll", ()=>{
+            if(!hasOlder || loadingOlder || messagesArea.scrollTop > 80) return;
+
+            const before_id = oldestId();
+            if(!before_id) return;
+
+            loadingOlder = true;
+            olderTimer = setTimeout(olderDone, OLDER_TIMEOUT_MS);
+            socket.emit("load_older", { chat_id, before_id });
+        });
+    }
+
+    socket.on("disconnect", olderDone);
+
+    socket.on("older_messages", d=>{
+        if(!d || d.chat_id !== chat_id) return;
+
+        const prevHeight = messagesArea.scrollHeight;
+
+        // newest -> oldest, har ek top pe insert
+        d.messages.slice().reverse().forEach(m=>{
+            renderMessage(m, m.sender_id === me, true);
+        });
+
+        messagesArea.scrollTop += messagesArea.scrollHeight - prevHeight;
+
+        hasOlder = d.has_more;
+        olderDone();
+    });
+
     /* ================= SEND ================= */
     let pendingAttachment = null;
 
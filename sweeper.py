@@ -0,0 +1,279 @@
+# sweeper.py
+# ===============================
+# 🧹 BACKGROUND EXPIRY SWEEPER
+# ===============================
+# Expiry ka kaam request handlers se hata ke yahan:
+#   - 24h purani stories (rows + files)
+#   - messages.expires_at nikal gaya -> tombstone + "message_deleted" emit
+#   - static/editor_temp ke orphan uploads
+#   - unreferenced blobs (routes/blobs.py) + unke image variants
+#   - posts.likes / comments_count drift (routes/post_counters.py, 15 min)
+#   - thande trending scores (routes/trending.py decay pass)
+#   - socket_events ke purane rows (SOCKETIO_MESSAGE_QUEUE=sqlite backplane)
+#
+# Har run bounded batches me kaam karta hai. Ek host pe sirf ek leader
+# chalta hai (lock file), chahe gunicorn ke kitne bhi workers hon.
+#
+#   app.py -> sweeper.start_background(socketio)   # leader greenlet/thread
+#   python sweeper.py                              # alag process
+#   python sweeper.py --once
+
+import os
+import sys
+import time
+from datetime import datetime
+
+import db
+import socket_backplane
+import socketio_init
+from routes import blobs, chat_state, images, post_counters, trending
+from socketio_init import socketio
+
+try:
+    import fcntl
+except ImportError:   # windows dev machine: lock nahi, seedha chalao
+    fcntl = None
+
+SWEEP_INTERVAL = int(os.environ.get("SWEEP_INTERVAL", 30))   # seconds
+BATCH_SIZE = 500
+
+EDITOR_TEMP_DIR = os.path.join("static", "editor_temp")
+TEMP_MAX_AGE = 6 * 60 * 60   # editor_temp file itni purani = publish nahi hui
+
+LOCK_FILE = os.path.join("data", "sweeper.lock")
+
+metrics = {
+    "runs": 0,
+    "stories_expired": 0,
+    "messages_expired": 0,
+    "temp_files_removed": 0,
+    "blobs_removed": 0,
+    "counters_repaired": 0,
+    "trending_pruned": 0,
+    "socket_events_pruned": 0,
+    "errors": 0,
+    "last_run_at": None,
+    "last_duration_ms": 0,
+    "lag_seconds": 0,
+    "leader": False,
+}
+
+_lock_handle = None
+
+
+def utc_now_str():
+    return datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+
+
+# -------------------------
+# STORIES
+# -------------------------
+def sweep_stories(batch=BATCH_SIZE):
+    from routes.stories import cleanup_expired
+    return cleanup_expired(limit=batch)
+
+
+# -------------------------
+# DISAPPEARING MESSAGES
+# -------------------------
+def sweep_messages(batch=BATCH_SIZE):
+    conn = db.connect()
+    c = conn.cursor()
+
+    c.execute("""
+        SELECT id, chat_id
+        FROM messages
+        WHERE expires_at IS NOT NULL AND expires_at<=? AND deleted=0
+        ORDER BY expires_at
+        LIMIT ?
+    """, (utc_now_str(), batch))
+    rows = c.fetchall()
+
+    if rows:
+        c.executemany(
+            "UPDATE messages SET deleted=1, msg='' WHERE id=?",
+            [(mid,) for mid, _ in rows]
+        )
+        # inbox preview / unread same transaction me
+        chat_state.refresh(c, [chat_id for _, chat_id in rows])
+        conn.commit()
+
+    conn.close()
+
+    # commit ke baad hi clients ko batao
+    for mid, chat_id in rows:
+        socketio.emit(
+            "message_deleted",
+            {"chat_id": chat_id, "message_id": mid},
+            room=f"chat_{chat_id}"
+        )
+
+    return len(rows)
+
+
+# -------------------------
+# EDITOR TEMP UPLOADS
+# -------------------------
+def sweep_editor_temp(batch=BATCH_SIZE, max_age=TEMP_MAX_AGE):
+    if not os.path.isdir(EDITOR_TEMP_DIR):
+        return 0
+
+    cutoff = time.time() - max_age
+    removed = 0
+
+    with os.scandir(EDITOR_TEMP_DIR) as it:
+        for entry in it:
+            if removed >= batch:
+                break
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+            except OSError:
+                pass
+
+    return removed
+
+
+# -------------------------
+# UNREFERENCED BLOBS
+# -------------------------
+def sweep_blobs(batch=BATCH_SIZE):
+    removed = blobs.gc(limit=batch)
+
+    for name in removed:
+        images.remove_variants(blobs.url_for(name))
+
+    return len(removed)
+
+
+# -------------------------
+# LAG (sabse purana expired-but-not-swept item kitna late hai)
+# -------------------------
+def measure_lag():
+    from routes.story_store import EXPIRE_SECONDS
+
+    now = time.time()
+
+    conn = db.connect()
+    c = conn.cursor()
+
+    c.execute("""
+        SELECT MIN(timestamp) FROM stories
+        WHERE filename IS NOT NULL AND timestamp <= ?
+    """, (int(now) - EXPIRE_SECONDS,))
+    oldest_story = c.fetchone()[0]
+
+    c.execute("""
+        SELECT CAST(strftime('%s', MIN(expires_at)) AS INTEGER) FROM messages
+        WHERE expires_at IS NOT NULL AND expires_at<=? AND deleted=0
+    """, (utc_now_str(),))
+    oldest_msg = c.fetchone()[0]
+
+    conn.close()
+
+    lag = 0
+    if oldest_story is not None:
+        lag = max(lag, now - (oldest_story + EXPIRE_SECONDS))
+    if oldest_msg is not None:
+        lag = max(lag, now - oldest_msg)
+
+    return int(lag)
+
+
+def run_once(batch=BATCH_SIZE):
+    started = time.time()
+    swept = {}
+
+    try:
+        metrics["lag_seconds"] = measure_lag()
+
+        swept["stories"] = sweep_stories(batch)
+        swept["messages"] = sweep_messages(batch)
+        swept["temp_files"] = sweep_editor_temp(batch)
+        swept["blobs"] = sweep_blobs(batch)
+
+        reconciled = post_counters.maybe_reconcile()
+        if reconciled:
+            metrics["counters_repaired"] += reconciled[1]
+
+        metrics["trending_pruned"] += trending.decay()
+
+        if socketio_init.message_queue() == "sqlite":
+            metrics["socket_events_pruned"] += socket_backplane.prune()
+
+        metrics["stories_expired"] += swept["stories"]
+        metrics["messages_expired"] += swept["messages"]
+        metrics["temp_files_removed"] += swept["temp_files"]
+        metrics["blobs_removed"] += swept["blobs"]
+
+    except Exception as e:
+        metrics["errors"] += 1
+        print("SWEEPER ERROR:", e)
+
+    metrics["runs"] += 1
+    metrics["last_run_at"] = int(started)
+    metrics["last_duration_ms"] = int((time.time() - started) * 1000)
+
+    return swept
+
+
+# -------------------------
+# LEADER ELECTION (per host)
+# -------------------------
+def acquire_leader():
+    global _lock_handle
+
+    if fcntl is None:
+        return True
+
+    os.makedirs(os.path.dirname(LOCK_FILE), exist_ok=True)
+    handle = open(LOCK_FILE, "a")
+
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return False
+
+    # process chalne tak lock pakde raho
+    _lock_handle = handle
+    return True
+
+
+def _loop():
+    while True:
+        swept = run_once()
+
+        # batch full bhara -> backlog hai, turant agla run
+        if any(n >= BATCH_SIZE for n in swept.values()):
+            socketio.sleep(0)
+        else:
+            socketio.sleep(SWEEP_INTERVAL)
+
+
+def start_background(sio=socketio):
+    """Har worker call kar sakta hai; sirf lock jeetne wala loop chalata hai."""
+    if os.environ.get("SWEEPER", "on") == "off":
+        return False
+
+    if not acquire_leader():
+        return False
+
+    metrics["leader"] = True
+    sio.start_background_task(_loop)
+    return True
+
+
+if __name__ == "__main__":
+    socketio_init.init_emitter()   # message_deleted queue se web workers tak
+
+    if "--once" in sys.argv:
+        print(run_once(), metrics)
+    elif acquire_leader():
+        metrics["leader"] = True
+        while True:
+            print("SWEEP:", run_once(), "lag:", metrics["lag_seconds"])
+            time.sleep(SWEEP_INTERVAL)
+    else:
+        print("another sweeper is already running")